@@ -3,4 +3,11 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'accounts'
\ No newline at end of file
+    name = 'accounts'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from . import signals  # noqa: F401
+        from .audit import flush_if_due
+
+        request_finished.connect(flush_if_due, dispatch_uid='audit_flush_if_due')
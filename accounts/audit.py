@@ -0,0 +1,213 @@
+# accounts/audit.py
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import ActivityLog, User, classify_action
+
+logger = logging.getLogger(__name__)
+
+# How often a flushing worker looks for journals left by crashed workers (seconds)
+RECOVER_EVERY = 60
+
+
+class AuditWriter:
+    """
+    Per-process buffer for ActivityLog rows, written with one bulk_create
+    when AUDIT_BUFFER_SIZE entries are waiting or the oldest has waited
+    AUDIT_FLUSH_INTERVAL seconds (a timer thread covers idle workers).
+
+    Every entry is first appended to this process's journal file
+    (AUDIT_JOURNAL_DIR/<host>-<pid>.ndjson), which is truncated after each
+    successful flush. If the process dies with entries buffered, another
+    worker on the host replays the orphaned journal within RECOVER_EVERY seconds. Delivery is
+    at-least-once: a crash between the insert and the truncate replays rows
+    that were already written.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.pending = []
+        self.oldest = None
+        self.timer = None
+        self.journal = None
+        self.last_recovery = None
+
+    # --- journal ---
+    @property
+    def journal_dir(self):
+        return Path(settings.AUDIT_JOURNAL_DIR)
+
+    def _journal_name(self, pid=None):
+        return f"{socket.gethostname()}-{pid or os.getpid()}.ndjson"
+
+    def _journal(self):
+        if self.journal is None:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            self.journal = open(self.journal_dir / self._journal_name(), 'a', encoding='utf-8')
+        return self.journal
+
+    # --- public API ---
+    def add(self, user_id, action, details=''):
+        action_type, severity = classify_action(action)
+        entry = {
+            'user_id': user_id, 'action': action, 'details': details or '', 'timestamp': timezone.now().isoformat(),
+            'action_type': action_type, 'severity': severity,
+        }
+        with self._lock:
+            journal = self._journal()
+            journal.write(json.dumps(entry) + '\n')
+            journal.flush()
+            self.pending.append(entry)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            if len(self.pending) >= settings.AUDIT_BUFFER_SIZE:
+                self.flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(settings.AUDIT_FLUSH_INTERVAL, self._flush_from_timer)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def is_due(self):
+        return self.oldest is not None and time.monotonic() - self.oldest >= settings.AUDIT_FLUSH_INTERVAL
+
+    def flush(self):
+        """Writes everything buffered. Returns the number of rows inserted."""
+        with self._lock:
+            now = time.monotonic()
+            if self.last_recovery is None or now - self.last_recovery >= RECOVER_EVERY:
+                self.last_recovery = now
+                try:
+                    self.recover()
+                except Exception:
+                    logger.exception("Could not replay orphaned audit journals")
+            if not self.pending:
+                return 0
+            batch = self.pending
+            try:
+                _insert(batch)
+            except Exception:
+                # Keep the entries (they are still in the journal) and retry on the next flush
+                logger.exception("Could not write %d audit entries; will retry", len(batch))
+                return 0
+            self.pending = []
+            self.oldest = None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.journal.seek(0)
+            self.journal.truncate()
+            return len(batch)
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self.timer = None
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own DB connection; do not leak it
+            connection.close()
+
+    def recover(self, include_live=False):
+        """
+        Replays journals left by processes on this host that are no longer
+        running (or every other journal with include_live=True, for use when
+        no server is up). Returns the number of entries recovered.
+        """
+        if not self.journal_dir.exists():
+            return 0
+        host, own = socket.gethostname(), self._journal_name()
+        recovered = 0
+        for path in sorted(self.journal_dir.glob(f"{host}-*.ndjson*")):
+            if path.suffix == '.ndjson':
+                if path.name == own:
+                    continue
+                journal, pid = path.name, int(path.stem.rsplit('-', 1)[1])
+            elif path.suffix == '.replay':
+                # <journal>.<pid>.replay: claimed by a replay that failed (it is
+                # retried here) or whose worker died part-way
+                journal, pid = path.name.rsplit('.', 2)[0], int(path.name.rsplit('.', 2)[1])
+                if pid == os.getpid():
+                    pid = None
+            else:
+                continue
+            if pid and not include_live and _pid_alive(pid):
+                continue
+            # Claim the file first so two workers never replay the same journal
+            claimed = path.with_name(f"{journal}.{os.getpid()}.replay")
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            entries = []
+            for line in claimed.read_text(encoding='utf-8').splitlines():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    pass  # a line cut short by the crash
+            if entries:
+                try:
+                    _insert(entries)
+                except Exception:
+                    # Keep the claimed file; the next pass (or another worker, if this one dies) retries it
+                    logger.exception("Could not replay %d audit entries from %s; will retry", len(entries), journal)
+                    continue
+                recovered += len(entries)
+                logger.warning("Recovered %d audit entries from %s", len(entries), journal)
+            claimed.unlink()
+        return recovered
+
+    def after_fork(self):
+        # A forked worker must not share the parent's buffer, timer or journal
+        self._lock = threading.RLock()
+        self._reset()
+
+
+def _insert(entries):
+    # A user deleted since the entry was buffered would fail the whole batch
+    existing = set(User.objects.filter(pk__in={entry['user_id'] for entry in entries}).values_list('pk', flat=True))
+    logs = []
+    for entry in entries:
+        if entry['user_id'] not in existing:
+            continue
+        if 'action_type' not in entry:  # journaled before entries carried their classification
+            entry['action_type'], entry['severity'] = classify_action(entry['action'])
+        logs.append(ActivityLog(
+            user_id=entry['user_id'], action=entry['action'], details=entry['details'],
+            timestamp=parse_datetime(entry['timestamp']),
+            action_type=entry['action_type'], severity=entry['severity'],
+        ))
+    ActivityLog.objects.bulk_create(logs, batch_size=500)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+writer = AuditWriter()
+atexit.register(writer.flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=writer.after_fork)
+
+
+def flush_if_due(sender=None, **kwargs):
+    """request_finished hook: a busy worker flushes on its own request cycle, after the response."""
+    if writer.is_due():
+        writer.flush()
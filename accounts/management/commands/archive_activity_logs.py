@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import ActivityLog
+from accounts.retention import archive_activity, archive_dir
+
+
+class Command(BaseCommand):
+    help = 'Moves activity log entries older than the retention window into monthly compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ACTIVITY_RETENTION_DAYS,
+                            help='Keep this many days in the database (default: ACTIVITY_RETENTION_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=settings.ACTIVITY_ARCHIVE_CHUNK)
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help='Seconds to sleep between chunks, to leave room for live writes')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the entries that would be moved')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+            count = ActivityLog.objects.filter(timestamp__lt=cutoff).count()
+            self.stdout.write(f"{count} entries older than {cutoff:%Y-%m-%d %H:%M} would be archived.")
+            return
+        moved = archive_activity(options['days'], options['chunk_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} activity log entries to {archive_dir()}."))
@@ -0,0 +1,78 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from accounts.models import SearchDocument, User
+from accounts.search import document_for, search_patients
+from manager.timing import percentile
+from patients.models import Patient
+
+FIRST = ['Kwame', 'Ama', 'Kofi', 'Akosua', 'Yaw', 'Abena', 'Kojo', 'Efua', 'Kwesi', 'Adwoa', 'Fiifi', 'Esi']
+LAST = ['Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Addo', 'Appiah', 'Agyeman', 'Darko', 'Quaye', 'Tetteh']
+
+
+def legacy_search(query):
+    """The previous doctor_patients lookup (phone lives on User)."""
+    return list(Patient.objects.filter(
+        Q(user__first_name__icontains=query) |
+        Q(user__last_name__icontains=query) |
+        Q(patient_id__icontains=query) |
+        Q(user__phone_number__icontains=query)
+    ).distinct().select_related('user')[:50])
+
+
+class Command(BaseCommand):
+    help = 'Generates N patients in a rolled-back transaction and times indexed vs icontains patient search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--legacy', action='store_true', help='Also time the old icontains search')
+
+    def handle(self, *args, **options):
+        total = options['patients']
+        rng = random.Random(11)
+
+        with transaction.atomic():
+            start_pk = (User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+            started = time.perf_counter()
+            for offset in range(0, total, 10_000):
+                users, patients, documents = [], [], []
+                for n in range(offset, min(offset + 10_000, total)):
+                    user = User(
+                        pk=start_pk + n, username=f"bench{n}", role='patient', password='!',
+                        first_name=rng.choice(FIRST), last_name=f"{rng.choice(LAST)}{n % 997}",
+                        email=f"bench{n}@example.com", phone_number=f"02{rng.randrange(10**8):08d}",
+                    )
+                    users.append(user)
+                    patients.append(Patient(user_id=user.pk, patient_id=f"BP-{n:07d}"))
+                    documents.append(SearchDocument(user_id=user.pk, document=document_for(user, f"BP-{n:07d}")))
+                User.objects.bulk_create(users)
+                Patient.objects.bulk_create(patients)
+                SearchDocument.objects.bulk_create(documents)
+            self.stdout.write(f"Generated {total} patients in {time.perf_counter() - started:.0f} s")
+
+            queries = [rng.choice([
+                lambda: rng.choice(FIRST),
+                lambda: f"{rng.choice(FIRST)} {rng.choice(LAST)}{rng.randrange(997)}",
+                lambda: f"BP-{rng.randrange(total):07d}",
+                lambda: f"bench{rng.randrange(total)}@",
+                lambda: f"02{rng.randrange(10**4):04d}",
+            ])() for _ in range(options['queries'])]
+
+            runs = [('index', lambda query: search_patients(query, limit=50))]
+            if options['legacy']:
+                runs.append(('icontains', legacy_search))
+            for label, search in runs:
+                timings, found = [], 0
+                for query in queries:
+                    start = time.perf_counter()
+                    found += len(search(query))
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{label:<10} p50 {percentile(timings, 50):8.2f} ms, p95 {percentile(timings, 95):8.2f} ms, "
+                    f"max {timings[-1]:8.2f} ms, {found / len(queries):.1f} results/query ({connection.vendor})"
+                )
+            transaction.set_rollback(True)
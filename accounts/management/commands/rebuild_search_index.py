@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from accounts.models import SearchDocument, User
+from accounts.search import FTS_TABLE, document_for
+from patients.models import Patient
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the user/patient search index from scratch (after bulk imports, which skip signals)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        patient_ids = dict(Patient.objects.values_list('user_id', 'patient_id'))
+
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            batch, total = [], 0
+            for user in User.objects.order_by().iterator(chunk_size=batch_size):
+                batch.append(SearchDocument(user_id=user.pk, document=document_for(user, patient_ids.get(user.pk))))
+                if len(batch) >= batch_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+            total += len(batch)
+
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} users."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from accounts.audit import writer
+
+
+class Command(BaseCommand):
+    help = 'Writes audit entries left in journal files by workers that stopped before flushing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--include-live', action='store_true',
+                            help='Also replay journals of processes that still appear to run (use only with the server stopped)')
+
+    def handle(self, *args, **options):
+        recovered = writer.recover(include_live=options['include_live'])
+        self.stdout.write(self.style.SUCCESS(f"Recovered {recovered} audit entries."))
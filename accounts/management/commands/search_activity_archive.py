@@ -0,0 +1,41 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from accounts.retention import search_archive
+
+FIELDS = ['id', 'timestamp', 'user_id', 'username', 'action', 'action_type', 'severity', 'details']
+
+
+class Command(BaseCommand):
+    help = 'Searches archived activity log entries (e.g. for a compliance request) and prints them as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--q', help='Text to find in the username or details')
+        parser.add_argument('--user', help='Exact username')
+        parser.add_argument('--action', help='Text to find in the action')
+        parser.add_argument('--from', dest='start', help='First day, YYYY-MM-DD')
+        parser.add_argument('--to', dest='end', help='Last day, YYYY-MM-DD')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+
+    def _date(self, value):
+        if value is None:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        return day
+
+    def handle(self, *args, **options):
+        records = search_archive(
+            query=options['q'], username=options['user'], action=options['action'],
+            start=self._date(options['start']), end=self._date(options['end']),
+        )
+        if options['format'] == 'csv':
+            writer = csv.DictWriter(self.stdout, fieldnames=FIELDS, lineterminator='\n', extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+        else:
+            for record in records:
+                self.stdout.write(json.dumps(record))
@@ -0,0 +1,46 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from hospital.seeding import MAX_PREFIX, HospitalSeeder, rebuild_derived
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with deterministic synthetic staff, patients and clinical history (see hospital.seeding)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=1000)
+        parser.add_argument('--doctors', type=int, help='Default: one per 100 patients')
+        parser.add_argument('--staff', type=int, help='Per role (cashier, lab_tech, nurse, pharmacist). Default: one per 500 patients')
+        parser.add_argument('--visits', type=int, default=3, help='Average appointments per patient')
+        parser.add_argument('--days', type=int, default=365, help='How far back the history goes')
+        parser.add_argument('--today', type=date.fromisoformat, help='Date the history ends on (YYYY-MM-DD). Default: today')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='seed', help=f'Usernames and IDs start with this (at most {MAX_PREFIX} characters)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-derived', action='store_true', help='Do not rebuild the search index, revenue summary and timelines')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not 0 < len(prefix) <= MAX_PREFIX:
+            raise CommandError(f"--prefix must be 1 to {MAX_PREFIX} characters")
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users prefixed '{prefix}-' already exist; pick another --prefix")
+
+        seeder = HospitalSeeder(
+            seed=options['seed'], prefix=prefix, batch_size=options['batch_size'],
+            today=options['today'], days=options['days'], stdout=self.stdout,
+        )
+        started = time.perf_counter()
+        counts = seeder.run(options['patients'], options['doctors'], options['staff'], options['visits'])
+        elapsed = time.perf_counter() - started
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f"{label:<28} {count:>10}")
+        total = sum(counts.values())
+        self.stdout.write(f"Wrote {total} rows in {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+
+        if not options['skip_derived']:
+            started = time.perf_counter()
+            rebuild_derived()
+            self.stdout.write(f"Rebuilt search index, revenue summary and timelines in {time.perf_counter() - started:.1f} s")
+        self.stdout.write(self.style.SUCCESS('Done.'))
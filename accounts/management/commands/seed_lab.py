@@ -1,31 +1,31 @@
 from django.core.management.base import BaseCommand
-from accounts.models import LabRequest
+from accounts.models import LabRequest, User
 from patients.models import Patient # Adjust if your app name is different
-from django.contrib.auth.models import User
+from hospital.seeding import TESTS
 import random
 
 class Command(BaseCommand):
-    help = 'Seeds the database with 10 lab requests'
+    help = 'Seeds the database with 10 lab requests (see seed_hospital for a full dataset)'
 
     def handle(self, *args, **kwargs):
         # Get or create a dummy doctor
-        doctor, _ = User.objects.get_or_create(username='dr_tester', last_name='Arhin')
+        doctor, _ = User.objects.get_or_create(
+            username='dr_tester', defaults={'last_name': 'Arhin', 'role': 'doctor'},
+        )
         
         # Ensure we have patients
-        patients = Patient.objects.all()
-        if not patients.exists():
-            self.stdout.write(self.style.ERROR('No patients found. Create patients first!'))
+        patients = list(Patient.objects.all())
+        if not patients:
+            self.stdout.write(self.style.ERROR('No patients found. Create patients first (python manage.py seed_hospital)!'))
             return
 
-        tests = ['Malaria Parasite (MP)', 'Full Blood Count', 'Typhoid Test', 'Urinalysis', 'COVID-19 PCR']
-
         for _ in range(10):
             LabRequest.objects.create(
                 patient=random.choice(patients),
-                test_name=random.choice(tests),
+                test_name=random.choice(TESTS),
                 doctor=doctor,
                 payment_status='paid',
                 is_completed=False
             )
 
-        self.stdout.write(self.style.SUCCESS('Successfully added 10 lab requests to the queue!'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Successfully added 10 lab requests to the queue!'))
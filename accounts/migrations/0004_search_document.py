@@ -0,0 +1,84 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    # External-content FTS5 table over accounts_searchdocument; the trigram
+    # tokenizer makes any 3+ character substring an index lookup
+    """CREATE VIRTUAL TABLE accounts_searchdocument_fts USING fts5(
+        document, content='accounts_searchdocument', content_rowid='user_id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER accounts_searchdocument_ai AFTER INSERT ON accounts_searchdocument BEGIN
+        INSERT INTO accounts_searchdocument_fts(rowid, document) VALUES (new.user_id, new.document);
+    END""",
+    """CREATE TRIGGER accounts_searchdocument_ad AFTER DELETE ON accounts_searchdocument BEGIN
+        INSERT INTO accounts_searchdocument_fts(accounts_searchdocument_fts, rowid, document)
+        VALUES ('delete', old.user_id, old.document);
+    END""",
+    """CREATE TRIGGER accounts_searchdocument_au AFTER UPDATE ON accounts_searchdocument BEGIN
+        INSERT INTO accounts_searchdocument_fts(accounts_searchdocument_fts, rowid, document)
+        VALUES ('delete', old.user_id, old.document);
+        INSERT INTO accounts_searchdocument_fts(rowid, document) VALUES (new.user_id, new.document);
+    END""",
+]
+
+POSTGRES_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # On UPPER(document): Django's icontains compiles to UPPER("document"::text) LIKE UPPER(%s)
+    "CREATE INDEX accounts_searchdocument_trgm ON accounts_searchdocument USING gin (UPPER(document) gin_trgm_ops)",
+]
+
+
+def create_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS accounts_searchdocument_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS accounts_searchdocument_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS accounts_searchdocument_trgm")
+
+
+def backfill(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Patient = apps.get_model('patients', 'Patient')
+    SearchDocument = apps.get_model('accounts', 'SearchDocument')
+    patient_ids = dict(Patient.objects.values_list('user_id', 'patient_id'))
+
+    batch = []
+    for user in User.objects.iterator(chunk_size=2000):
+        parts = [user.first_name, user.last_name, user.username, user.email, user.phone_number,
+                 patient_ids.get(user.pk)]
+        batch.append(SearchDocument(user_id=user.pk, document=' '.join(part for part in parts if part)))
+        if len(batch) >= 2000:
+            SearchDocument.objects.bulk_create(batch)
+            batch = []
+    SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_hot_filter_indexes'),
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('document', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_activitylog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='action_type',
+            field=models.CharField(choices=[('login', 'Logins'), ('role_change', 'Role Changes'), ('verification', 'Verifications'), ('activation', 'Activations'), ('deactivation', 'Deactivations'), ('deletion', 'Deletions'), ('record_access', 'Record Access'), ('other', 'Other')], default='other', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='severity',
+            field=models.CharField(choices=[('danger', 'Critical'), ('warning', 'Warning'), ('success', 'Success'), ('info', 'Info')], default='info', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['action_type', 'timestamp'], name='activitylog_type_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['severity', 'timestamp'], name='activitylog_sev_time_idx'),
+        ),
+    ]
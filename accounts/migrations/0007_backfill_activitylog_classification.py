@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:52
+
+from django.db import migrations, transaction
+
+CHUNK = 5000
+
+
+def classify_action(action):
+    """
+    A frozen copy of accounts.models.classify_action as of this migration, so
+    later changes to the live rules do not change what this backfill wrote.
+    """
+    act = action.lower()
+    if 'deactivate' in act:
+        action_type = 'deactivation'
+    elif 'activate' in act:
+        action_type = 'activation'
+    elif 'login' in act or 'logout' in act:
+        action_type = 'login'
+    elif 'role' in act:
+        action_type = 'role_change'
+    elif 'verif' in act:
+        action_type = 'verification'
+    elif 'delete' in act or 'remove' in act:
+        action_type = 'deletion'
+    elif 'view' in act:
+        action_type = 'record_access'
+    else:
+        action_type = 'other'
+
+    if any(word in act for word in ['deactivate', 'delete', 'remove', 'error']):
+        severity = 'danger'
+    elif any(word in act for word in ['activate', 'verified', 'success', 'login']):
+        severity = 'success'
+    elif 'role' in act or 'change' in act:
+        severity = 'warning'
+    else:
+        severity = 'info'
+    return action_type, severity
+
+
+def backfill(apps, schema_editor):
+    """
+    Classifies existing rows one primary-key range at a time, each range in
+    its own short transaction. Rows are grouped by action so a range costs a
+    few UPDATEs, and actions that classify as the column defaults are skipped.
+    """
+    ActivityLog = apps.get_model('accounts', 'ActivityLog')
+    alias = schema_editor.connection.alias
+    logs = ActivityLog.objects.using(alias)
+    last = logs.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    for start in range(0, last + 1, CHUNK):
+        chunk = logs.filter(pk__gte=start, pk__lt=start + CHUNK)
+        groups = {}
+        for action in chunk.order_by().values_list('action', flat=True).distinct():
+            groups.setdefault(classify_action(action), []).append(action)
+        with transaction.atomic(using=alias):
+            for (action_type, severity), actions in groups.items():
+                if (action_type, severity) == ('other', 'info'):
+                    continue
+                chunk.filter(action__in=actions).update(action_type=action_type, severity=severity)
+
+
+class Migration(migrations.Migration):
+    # Each chunk commits on its own instead of holding one long transaction
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0006_activitylog_classification'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -27,6 +28,20 @@ class User(AbstractUser):
         ordering = ['-created_at']
 
 
+class SearchDocument(models.Model):
+    """
+    One row of flattened search text per user: name, username, email, phone
+    and (for patients) patient_id. accounts/search.py queries it through an
+    FTS5 trigram table on SQLite or a pg_trgm GIN index on Postgres; the
+    signals in accounts/signals.py keep it current.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    document = models.TextField()
+
+    def __str__(self):
+        return self.document
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     is_verified = models.BooleanField(default=False) 
@@ -38,25 +53,80 @@ class Profile(models.Model):
         return f"Profile of {self.user.username}"
 
 
+def classify_action(action):
+    """(action_type, severity) for an audit action, e.g. 'Role Change' -> ('role_change', 'warning')."""
+    act = action.lower()
+    if 'deactivate' in act:
+        action_type = 'deactivation'
+    elif 'activate' in act:
+        action_type = 'activation'
+    elif 'login' in act or 'logout' in act:
+        action_type = 'login'
+    elif 'role' in act:
+        action_type = 'role_change'
+    elif 'verif' in act:
+        action_type = 'verification'
+    elif 'delete' in act or 'remove' in act:
+        action_type = 'deletion'
+    elif 'view' in act:
+        action_type = 'record_access'
+    else:
+        action_type = 'other'
+
+    if any(word in act for word in ['deactivate', 'delete', 'remove', 'error']):
+        severity = 'danger'
+    elif any(word in act for word in ['activate', 'verified', 'success', 'login']):
+        severity = 'success'
+    elif 'role' in act or 'change' in act:
+        severity = 'warning'
+    else:
+        severity = 'info'
+    return action_type, severity
+
+
 class ActivityLog(models.Model):
+    ACTION_TYPES = (
+        ('login', 'Logins'),
+        ('role_change', 'Role Changes'),
+        ('verification', 'Verifications'),
+        ('activation', 'Activations'),
+        ('deactivation', 'Deactivations'),
+        ('deletion', 'Deletions'),
+        ('record_access', 'Record Access'),
+        ('other', 'Other'),
+    )
+    SEVERITY_CHOICES = (
+        ('danger', 'Critical'),
+        ('warning', 'Warning'),
+        ('success', 'Success'),
+        ('info', 'Info'),
+    )
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='logs')
     action = models.CharField(max_length=255)
     details = models.TextField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered entries are written later but keep their own time
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    # Derived from `action` by classify_action() when the entry is written
+    action_type = models.CharField(max_length=20, choices=ACTION_TYPES, default='other')
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES, default='info')
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp'], name='activitylog_timestamp_idx'),
+            models.Index(fields=['action_type', 'timestamp'], name='activitylog_type_time_idx'),
+            models.Index(fields=['severity', 'timestamp'], name='activitylog_sev_time_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.action_type, self.severity = classify_action(self.action)
+        super().save(*args, **kwargs)
 
     @property
     def action_color(self):
-        act = self.action.lower()
-        if any(word in act for word in ['deactivate', 'delete', 'remove', 'error']):
-            return 'danger'
-        if any(word in act for word in ['activate', 'verified', 'success', 'login']):
-            return 'success'
-        if 'role' in act or 'change' in act:
-            return 'warning'
-        return 'info'
+        return self.severity
 
     def __str__(self):
         return f"{self.user.username} - {self.action} at {self.timestamp}"
@@ -160,6 +230,11 @@ class LabRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_status', 'created_at'], name='acc_labreq_pay_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.test_name} - {self.patient.name} ({self.priority})"
 
@@ -0,0 +1,152 @@
+# accounts/retention.py
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import ActivityLog
+
+INDEX_NAME = 'index.json'
+
+
+def archive_dir():
+    return Path(settings.ACTIVITY_ARCHIVE_DIR)
+
+
+def _month_file(month):
+    return f"activity-{month}.ndjson.gz"
+
+
+def load_index():
+    """
+    {'months': {'YYYY-MM': {'file', 'rows', 'first', 'last', 'bytes'}}, 'archived_before': iso}.
+    Rebuilt from the file names (without row counts) if index.json is missing.
+    """
+    path = archive_dir() / INDEX_NAME
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))
+    months = {}
+    for file in sorted(archive_dir().glob('activity-*.ndjson.gz')):
+        month = file.name[len('activity-'):-len('.ndjson.gz')]
+        months[month] = {'file': file.name, 'rows': None, 'first': None, 'last': None, 'bytes': file.stat().st_size}
+    return {'months': months, 'archived_before': None}
+
+
+def _save_index(index):
+    path = archive_dir() / INDEX_NAME
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(index, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _record(row):
+    return {
+        'id': row['pk'], 'user_id': row['user_id'], 'username': row['user__username'],
+        'action': row['action'], 'action_type': row['action_type'], 'severity': row['severity'],
+        'details': row['details'] or '', 'timestamp': row['timestamp'].isoformat(),
+    }
+
+
+def archive_activity(days=None, chunk_size=None, pause=0.0):
+    """
+    Moves ActivityLog rows older than `days` (ACTIVITY_RETENTION_DAYS) into
+    monthly gzip NDJSON files under ACTIVITY_ARCHIVE_DIR, oldest first.
+
+    Works in chunks of `chunk_size` rows: the chunk is appended to its month
+    files (each append is its own gzip member) and fsynced, then deleted by
+    primary key in a short transaction, so the table is never locked for
+    longer than one chunk. A crash between the two leaves rows that are
+    archived again on the next run; read_archive() drops the duplicates.
+    Returns the number of rows moved.
+    """
+    days = settings.ACTIVITY_RETENTION_DAYS if days is None else days
+    chunk_size = chunk_size or settings.ACTIVITY_ARCHIVE_CHUNK
+    cutoff = timezone.now() - timedelta(days=days)
+    archive_dir().mkdir(parents=True, exist_ok=True)
+    index = load_index()
+
+    moved = 0
+    while True:
+        rows = list(
+            ActivityLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp', 'pk')
+            .values('pk', 'user_id', 'user__username', 'action', 'action_type', 'severity', 'details', 'timestamp')[:chunk_size]
+        )
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            month = timezone.localtime(row['timestamp']).strftime('%Y-%m')
+            by_month.setdefault(month, []).append(_record(row))
+        for month, records in by_month.items():
+            path = archive_dir() / _month_file(month)
+            with open(path, 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as out:
+                    out.write(''.join(json.dumps(record) + '\n' for record in records).encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+            entry = index['months'].setdefault(month, {'file': path.name, 'rows': 0, 'first': None, 'last': None})
+            entry['rows'] = (entry['rows'] or 0) + len(records)
+            entry['first'] = min(filter(None, [entry['first'], records[0]['timestamp']]))
+            entry['last'] = max(filter(None, [entry['last'], records[-1]['timestamp']]))
+            entry['bytes'] = path.stat().st_size
+        index['archived_before'] = cutoff.isoformat()
+        _save_index(index)
+
+        with transaction.atomic():
+            ActivityLog.objects.filter(pk__in=[row['pk'] for row in rows]).delete()
+        moved += len(rows)
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+def read_archive(start=None, end=None):
+    """
+    Yields archived records (dicts, oldest month first) whose date falls in
+    [start, end]; either bound may be None. Months outside the range are
+    skipped using the index, without opening their files.
+    """
+    index = load_index()
+    for month in sorted(index['months']):
+        if start and month < start.strftime('%Y-%m'):
+            continue
+        if end and month > end.strftime('%Y-%m'):
+            continue
+        path = archive_dir() / index['months'][month]['file']
+        if not path.exists():
+            continue
+        seen = set()  # a row is always archived into the same month, so duplicates are per file
+        with gzip.open(path, 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                record = json.loads(line)
+                if record['id'] in seen:
+                    continue
+                seen.add(record['id'])
+                day = timezone.localdate(parse_datetime(record['timestamp']))
+                if (start and day < start) or (end and day > end):
+                    continue
+                yield record
+
+
+def search_archive(query=None, username=None, action=None, start=None, end=None):
+    """
+    Archived records matching every given filter, for compliance requests:
+    `query` is a case-insensitive substring of the username or details (as on
+    the manager dashboard), `username` exact, `action` a substring of the action.
+    """
+    query = query.lower() if query else None
+    action = action.lower() if action else None
+    for record in read_archive(start, end):
+        if username and record['username'] != username:
+            continue
+        if action and action not in record['action'].lower():
+            continue
+        if query and query not in (record['username'] or '').lower() and query not in record['details'].lower():
+            continue
+        yield record
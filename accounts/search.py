@@ -0,0 +1,93 @@
+# accounts/search.py
+from django.db import connection
+from .models import SearchDocument, User
+
+# Virtual table created by migration 0004_search_document (SQLite only)
+FTS_TABLE = 'accounts_searchdocument_fts'
+
+# Trigram indexes cannot match terms shorter than this
+MIN_TERM = 3
+
+# Most matches a search pages through (manager user search); the rest are
+# left for a more precise query
+RANK_WINDOW = 500
+
+
+def document_for(user, patient_id=None):
+    """The text a user is found by. Order does not matter; it is substring matched."""
+    parts = [user.first_name, user.last_name, user.username, user.email, user.phone_number, patient_id]
+    return ' '.join(part for part in parts if part)
+
+
+def index_user(user):
+    """Writes (or rewrites) the search row for one user."""
+    from patients.models import Patient
+    patient_id = Patient.objects.filter(user_id=user.pk).values_list('patient_id', flat=True).first()
+    SearchDocument.objects.update_or_create(user_id=user.pk, defaults={'document': document_for(user, patient_id)})
+
+
+def _terms(query):
+    return [term for term in query.split() if term]
+
+
+def _fts_expression(terms):
+    # Each term is a quoted string, so user input never becomes FTS5 syntax
+    return ' AND '.join('"%s"' % term.replace('"', '""') for term in terms)
+
+
+def search_user_ids(query, limit=20, patients_only=False):
+    """
+    User ids whose search document contains every word of `query`, best
+    match first. Served from the FTS5 trigram index on SQLite and the pg_trgm
+    GIN index on Postgres; other backends fall back to icontains.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    indexed = [term for term in terms if len(term) >= MIN_TERM]
+
+    if connection.vendor == 'sqlite' and indexed:
+        sql = (
+            f"SELECT f.rowid FROM {FTS_TABLE} f"
+            + (" JOIN patients_patient p ON p.user_id = f.rowid" if patients_only else "")
+            + f" WHERE {FTS_TABLE} MATCH %s"
+            # Short terms cannot use the trigram index; check them on the matched rows
+            + "".join(" AND f.document LIKE %s" for term in terms if len(term) < MIN_TERM)
+            # Every match is ranked before the limit, so the first `limit` are the best ones
+            + " ORDER BY f.rank LIMIT %s"
+        )
+        params = [_fts_expression(indexed)]
+        params += [f"%{term}%" for term in terms if len(term) < MIN_TERM]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    documents = SearchDocument.objects.all()
+    if patients_only:
+        documents = documents.filter(user__patient_profile__isnull=False)
+    for term in terms:
+        documents = documents.filter(document__icontains=term)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+        documents = documents.annotate(rank=TrigramSimilarity('document', query)).order_by('-rank')
+    else:
+        documents = documents.order_by('user_id')
+    return list(documents.values_list('user_id', flat=True)[:limit])
+
+
+def _in_rank_order(objects, ids, key):
+    position = {pk: index for index, pk in enumerate(ids)}
+    return sorted(objects, key=lambda obj: position[key(obj)])
+
+
+def search_users(query, limit=20):
+    ids = search_user_ids(query, limit)
+    return _in_rank_order(User.objects.filter(pk__in=ids), ids, lambda user: user.pk)
+
+
+def search_patients(query, limit=20):
+    """patients.Patient rows (with user loaded) matching `query`, best match first."""
+    from patients.models import Patient
+    ids = search_user_ids(query, limit, patients_only=True)
+    patients = Patient.objects.filter(user_id__in=ids).select_related('user')
+    return _in_rank_order(patients, ids, lambda patient: patient.user_id)
@@ -0,0 +1,41 @@
+# accounts/signals.py
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from patients.models import Patient
+from .models import SearchDocument, User
+from .search import document_for, index_user
+from .utils import log_action
+
+# User fields that appear in the search document
+SEARCH_FIELDS = {'first_name', 'last_name', 'username', 'email', 'phone_number'}
+
+
+@receiver(post_save, sender=User)
+def reindex_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins save last_login only; skip saves that cannot change the document
+    if raw or (update_fields is not None and not SEARCH_FIELDS & set(update_fields)):
+        return
+    index_user(instance)
+
+
+@receiver(post_save, sender=Patient)
+def reindex_patient(sender, instance, raw=False, **kwargs):
+    # patient_id lives on the Patient row
+    if raw:
+        return
+    index_user(instance.user)
+
+
+@receiver(post_delete, sender=Patient)
+def unindex_patient(sender, instance, **kwargs):
+    # Update only: when the whole user is being deleted its search row goes too,
+    # and recreating it here would break the cascade
+    user = User.objects.filter(pk=instance.user_id).first()
+    if user is not None:
+        SearchDocument.objects.filter(user_id=user.pk).update(document=document_for(user))
+
+
+@receiver(user_logged_in)
+def audit_login(sender, request, user, **kwargs):
+    log_action(user, "Login", f"Signed in from {request.META.get('REMOTE_ADDR', 'unknown')}")
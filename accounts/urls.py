@@ -21,7 +21,6 @@ urlpatterns = [
 
     # --- PHARMACY ROUTES ---
     path('pharmacy/dashboard/', views.pharmacy_dashboard, name='pharmacy_dashboard'),
-    path('pharmacy/dispense/<int:prescription_id>/', views.dispense_medication, name='dispense_medication'),
 
     # --- CASHIER & BILLING ROUTES ---
     path('cashier/dashboard/', views.cashier_dashboard, name='cashier_dashboard'),
@@ -47,6 +46,7 @@ urlpatterns = [
     path('manager/user-status/<int:user_id>/<str:action>/', views.update_user_status, name='update_user_status'),
 
     path('manager/export-pdf/', views.export_activity_pdf, name='export_activity_pdf'),
+    path('manager/inquiries/', views.manage_inquiries, name='manage_inquiries'),
 
 
     path('privacy-policy/', views.privacy_policy, name='privacy_policy'),
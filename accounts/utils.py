@@ -1,11 +1,14 @@
 # utils.py
-from .models import ActivityLog
+from django.db import transaction
+from .audit import writer
+
 
 def log_action(user, action, details=""):
+    """
+    Records an audit entry. Entries are buffered and written in batches (see
+    accounts/audit.py), so auditing adds no database round trip to the request.
+    Inside a transaction the entry is queued only once it commits, as before.
+    """
     # Ensure we don't crash if user is somehow None
     if user and user.is_authenticated:
-        ActivityLog.objects.create(
-            user=user, 
-            action=action, 
-            details=details
-        )
\ No newline at end of file
+        transaction.on_commit(lambda: writer.add(user.pk, action, details))
@@ -1,16 +1,17 @@
+import io
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate, logout
 from django.contrib import messages
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from .models import User, Profile
 from .forms import UserRegistrationForm, UserLoginForm
 from .utils import log_action
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseForbidden
 from django.template.loader import get_template
 from xhtml2pdf import pisa
-from .models import ActivityLog
+from .models import ActivityLog, classify_action
 from cashier.models import Bill, Payment
 from manager.models import Ward
 from manager.models import HospitalSetting
@@ -18,8 +19,23 @@ from accounts.models import MedicalRecord, Medicine
 from django.db.models import F
 from .models import LabRequest, Reagent
 from patients.models import Patient
+from patients.forms import PatientPickForm
 from django.contrib import messages
 from .models import ContactMessage
+from django.conf import settings
+from django.db import transaction
+from django.utils.html import escape, strip_tags
+from manager.models import EmailLog
+from hospital.utils import day_range, month_range
+from hospital.pagination import KeysetPaginator, RankedPaginator
+from hospital.dashboard_cache import dashboard_context
+from hospital import kpis
+from hospital.http import get_session
+from hospital.pdf import pdf_response
+from .search import RANK_WINDOW, search_user_ids
+from cashier import paystack
+from pharmacy.stock import consume_reagent
+from labs.utils import LAB_RESULTS, lab_report_key
 
 
 
@@ -65,23 +81,17 @@ def contact(request):
         subject = request.POST.get('subject')
         message_body = request.POST.get('message')
 
-        # 1. Save to Database for record keeping
-        ContactMessage.objects.create(
-            name=name, email=user_email, 
-            subject=subject, message=message_body
-        )
-
-        # 2. Email for the Admin (You)
+        # 1. Email for the Admin (You)
         admin_subject = f"🚨 New HMS Inquiry: {subject}"
         admin_msg = f"Inquiry from: {name}\nEmail: {user_email}\n\nMessage:\n{message_body}"
 
-        # 3. Email for the Patient (Auto-Responder)
+        # 2. Email for the Patient (Auto-Responder)
         # We can use an HTML template for a "branded" look
         patient_subject = "We've Received Your Inquiry - HMS Core"
         html_content = f"""
             <div style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
-                <h2 style="color: #00d2ff;">Hello {name},</h2>
-                <p>Thank you for reaching out to <strong>HMS Core</strong>. This is an automated confirmation that we have received your message regarding <strong>{subject}</strong>.</p>
+                <h2 style="color: #00d2ff;">Hello {escape(name)},</h2>
+                <p>Thank you for reaching out to <strong>HMS Core</strong>. This is an automated confirmation that we have received your message regarding <strong>{escape(subject)}</strong>.</p>
                 <p>Our administration team or specialized staff will review your inquiry and get back to you within 24 hours.</p>
                 <hr style="border: none; border-top: 1px solid #eee;">
                 <p style="font-size: 0.9em; color: #777;"><em>Please do not reply to this email. For emergencies, please call our 24/7 line.</em></p>
@@ -89,19 +99,18 @@ def contact(request):
         """
         text_content = strip_tags(html_content)
 
-        try:
-            # Send to Admin
-            send_mail(admin_subject, admin_msg, settings.DEFAULT_FROM_EMAIL, [settings.ADMIN_EMAIL])
-
-            # Send to Patient (Auto-Responder)
-            msg = EmailMultiAlternatives(patient_subject, text_content, settings.DEFAULT_FROM_EMAIL, [user_email])
-            msg.attach_alternative(html_content, "text/html")
-            msg.send()
+        # 3. Save the inquiry and queue both emails in one transaction; the
+        # send_queued_emails worker delivers them outside this request.
+        with transaction.atomic():
+            ContactMessage.objects.create(
+                name=name, email=user_email, 
+                subject=subject, message=message_body
+            )
+            EmailLog.queue(settings.ADMIN_EMAIL, admin_subject, admin_msg)
+            if user_email:
+                EmailLog.queue(user_email, patient_subject, text_content, html_body=html_content)
 
-            messages.success(request, "Your message was sent! Check your inbox for a confirmation.")
-        except Exception as e:
-            # If email fails (e.g., wrong SMTP config), the message is still saved in DB
-            messages.info(request, "Message saved. Our team will contact you soon.")
+        messages.success(request, "Your message was sent! Check your inbox for a confirmation.")
 
         return redirect('contact')
 
@@ -192,6 +201,17 @@ def dashboard_redirect(request):
     messages.warning(request, f"No dashboard found for role: {role or 'None'}. Please contact Admin.")
     return redirect('profile')
 # --- MANAGER & ANALYTICS ---
+def _manager_stats():
+    users = kpis.user_counts()
+    return {
+        'stat_items': [
+            ('Total Users', users['total'], 'fa-users', 'primary'),
+            ('Doctors', users['doctors'], 'fa-user-md', 'success'),
+            ('Patients', users['patients'], 'fa-user-injured', 'info'),
+            ('Support Staff', users['support_staff'], 'fa-user-tie', 'warning'),
+        ],
+    }
+
 @login_required
 def manager_dashboard(request):
     if not (request.user.role == 'manager' or request.user.is_superuser):
@@ -199,7 +219,11 @@ def manager_dashboard(request):
 
     # 1. Capture the search and filter inputs from the URL
     query = request.GET.get('q')
-    action_filter = request.GET.get('action')
+    type_filter = request.GET.get('type')
+    severity_filter = request.GET.get('severity')
+    if not type_filter and request.GET.get('action'):
+        # Old ?action=Login links: map the free text onto its stored type
+        type_filter = classify_action(request.GET['action'])[0]
     
     # 2. Start with all logs
     logs = ActivityLog.objects.all().select_related('user')
@@ -211,23 +235,27 @@ def manager_dashboard(request):
             Q(details__icontains=query)
         )
         
-    # 4. Apply Action Filter (if the user clicked a dropdown item)
-    if action_filter:
-        logs = logs.filter(action__icontains=action_filter)
+    # 4. Apply Type / Severity Filters (indexed equality lookups)
+    type_labels = dict(ActivityLog.ACTION_TYPES)
+    severity_labels = dict(ActivityLog.SEVERITY_CHOICES)
+    if type_filter in type_labels:
+        logs = logs.filter(action_type=type_filter)
+    if severity_filter in severity_labels:
+        logs = logs.filter(severity=severity_filter)
 
     # 5. Order and limit results
     logs = logs.order_by('-timestamp')[:50]
 
     context = {
-        'stat_items': [
-            ('Total Users', User.objects.count(), 'fa-users', 'primary'),
-            ('Doctors', User.objects.filter(role='doctor').count(), 'fa-user-md', 'success'),
-            ('Patients', User.objects.filter(role='patient').count(), 'fa-user-injured', 'info'),
-            ('Support Staff', User.objects.filter(role__in=['pharmacy', 'cashier', 'lab']).count(), 'fa-user-tie', 'warning'),
-        ],
+        **dashboard_context('manager', request.user.role, _manager_stats),
         'logs': logs,
         'query': query, # Keeps the text in the search bar after you click search
-        'current_filter': action_filter or "Filter by Action", # Updates the dropdown button label
+        'type_filter': type_filter,
+        'severity_filter': severity_filter,
+        'action_types': ActivityLog.ACTION_TYPES,
+        'severities': ActivityLog.SEVERITY_CHOICES,
+        # Updates the dropdown button label
+        'current_filter': type_labels.get(type_filter) or severity_labels.get(severity_filter) or "Filter by Action",
     }
     return render(request, 'manager/dashboard.html', context)
 
@@ -236,10 +264,19 @@ def manage_users(request):
     if not (request.user.is_superuser or request.user.role == 'manager'):
         return redirect('dashboard')
     query = request.GET.get('search', '')
-    users = User.objects.all().order_by('-date_joined')
+    # The list shows each user's verification badge
+    users = User.objects.select_related('profile')
+    truncated = False
     if query:
-        users = users.filter(username__icontains=query) | users.filter(email__icontains=query)
-    return render(request, 'manager/manage_users.html', {'users': users})
+        # Best match first, paged over the ranked matches
+        ids = search_user_ids(query, limit=RANK_WINDOW)
+        truncated = len(ids) == RANK_WINDOW
+        users = RankedPaginator(users, ids).page_from_request(request)
+    else:
+        users = KeysetPaginator(users, '-date_joined').page_from_request(request)
+    return render(request, 'manager/manage_users.html', {
+        'users': users, 'page': users, 'truncated': truncated, 'match_limit': RANK_WINDOW,
+    })
 
 @login_required
 def verify_user(request, user_id):
@@ -276,15 +313,31 @@ def create_prescription(request):
         messages.success(request, f"Prescription issued! Sent to Billing.")
         return redirect('doctor_dashboard')
 
-    patients = User.objects.filter(role='patient')
-    return render(request, 'doctor/create_prescription.html', {'patients': patients})
+    return render(request, 'doctors/create_prescription.html', {'patient_form': PatientPickForm()})
 
 @login_required
 def request_lab_test(request):
     if request.user.role != 'doctor' and not request.user.is_superuser:
         return redirect('home')
-    patients = User.objects.filter(role='patient')
-    return render(request, 'doctor/request_test.html', {'patients': patients})
+
+    patient_form = PatientPickForm(request.POST or None)
+    if request.method == 'POST' and patient_form.is_valid() and request.POST.get('test_name'):
+        patient = patient_form.cleaned_data['patient']
+        LabRequest.objects.create(
+            patient=patient,
+            doctor=request.user,
+            test_name=request.POST['test_name'],
+            priority=request.POST.get('priority', 'normal'),
+            clinical_notes=request.POST.get('clinical_notes', ''),
+            payment_status='pending' # Flows to billing first
+        )
+        messages.success(request, f"Lab order for {request.POST['test_name']} sent to billing.")
+        return redirect('doctor_dashboard')
+
+    return render(request, 'doctors/request_test.html', {
+        'patient_form': patient_form,
+        'priorities': LabRequest.PRIORITY_CHOICES,
+    })
 
 @login_required
 def patient_history(request, patient_id):
@@ -295,6 +348,19 @@ def patient_history(request, patient_id):
     return render(request, 'doctor/patient_history.html', {'patient': patient})
 
 # --- CASHIER & BILLING VIEWS ---
+def _cashier_stats():
+    bills = kpis.bill_counts()
+    payments = kpis.payment_totals()
+    return {
+        # General Billing Stats (Consultations, etc.)
+        'total_bills': bills['total'],
+        'pending_general_count': bills['pending'],
+        'lab_pending_count': LabRequest.objects.filter(payment_status='pending').count(),
+        # Financial Totals (Summing successful payments)
+        'today_payments': payments['today'],
+        'month_payments': payments['month'],
+    }
+
 @login_required
 def cashier_dashboard(request):
     """Unified Cashier Dashboard for General Billing and Lab Payments"""
@@ -303,38 +369,18 @@ def cashier_dashboard(request):
         messages.error(request, 'Access denied. This area is for cashier staff only.')
         return redirect('dashboard')
     
-    today = timezone.now().date()
-    this_month_start = today.replace(day=1)
-    
-    # 2. General Billing Stats (Consultations, etc.)
-    total_bills = Bill.objects.count()
-    pending_general_bills = Bill.objects.filter(status='pending').count()
+    # 2. KPI cards (cached, see hospital/dashboard_cache.py)
+    stats = dashboard_context('cashier', request.user.role, _cashier_stats)
     
     # 3. Lab-Specific Billing
     pending_lab_bills = LabRequest.objects.filter(payment_status='pending').order_by('-created_at')
-    lab_pending_count = pending_lab_bills.count()
-    
-    # 4. Financial Totals (Summing successful payments)
-    today_payments = Payment.objects.filter(
-        transaction_date__date=today,
-        status='success'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    month_payments = Payment.objects.filter(
-        transaction_date__date__gte=this_month_start,
-        status='success'
-    ).aggregate(total=Sum('amount'))['total'] or 0
 
-    # 5. Recent Activity Lists
+    # 4. Recent Activity Lists
     recent_bills = Bill.objects.select_related('patient__user').all().order_by('-created_at')[:10]
     
     context = {
-        'total_bills': total_bills,
-        'pending_general_count': pending_general_bills,
+        **stats,
         'pending_lab_bills': pending_lab_bills,
-        'lab_pending_count': lab_pending_count,
-        'today_payments': today_payments,
-        'month_payments': month_payments,
         'recent_bills': recent_bills,
     }
     return render(request, 'cashier/dashboard.html', context)
@@ -345,12 +391,14 @@ def daily_report(request):
     if request.user.role not in ['cashier', 'manager']:
         return redirect('dashboard')
 
-    today = timezone.now().date()
+    today = timezone.localdate()
+    today_start, today_end = day_range(today)
     
     # Filter payments processed today
     payments = Payment.objects.filter(
-        transaction_date__date=today,
-        status='success'
+        status='success',
+        transaction_date__gte=today_start,
+        transaction_date__lt=today_end
     ).select_related('bill__patient__user')
 
     # Summary grouped by payment method
@@ -388,38 +436,42 @@ def process_payment(request, bill_id):
     return redirect('cashier_dashboard')
 
 # --- LABORATORY VIEWS ---
+def _lab_stats():
+    month_start, month_end = month_range()
+    stats = LabRequest.objects.filter(
+        created_at__gte=month_start,
+        created_at__lt=month_end
+    ).values('test_name').annotate(total=Count('id')).order_by('-total')
+    
+    chart_labels = [item['test_name'] for item in stats]
+    chart_data = [item['total'] for item in stats]
+    return {
+        'chart_labels': chart_labels,
+        'chart_data': chart_data,
+        # FIX: Calculate sum here to avoid the 'sum' filter error in template
+        'total_monthly_tests': sum(chart_data),
+        'current_month_name': timezone.now().strftime('%B'),
+    }
+
 @login_required
 def lab_dashboard(request):
     # 1. Active Queue: Paid but not finished
-    queue = LabRequest.objects.filter(
+    queue = list(LabRequest.objects.filter(
         payment_status='paid', 
         is_completed=False
-    ).order_by('-created_at')
+    ).select_related('patient__user').order_by('-created_at'))
     
     # 2. Recently Completed: For printing/emailing
     recent_completions = LabRequest.objects.filter(
         is_completed=True
     ).order_by('-updated_at')[:5]
     
-    # 3. Analytics: Monthly Test Distribution
-    stats = LabRequest.objects.filter(
-        created_at__month=timezone.now().month
-    ).values('test_name').annotate(total=Count('id')).order_by('-total')
-    
-    chart_labels = [item['test_name'] for item in stats]
-    chart_data = [item['total'] for item in stats]
-
-    # FIX: Calculate sum here to avoid the 'sum' filter error in template
-    total_monthly_tests = sum(chart_data)
-
     context = {
+        # Analytics: Monthly Test Distribution (cached, see hospital/dashboard_cache.py)
+        **dashboard_context('lab', request.user.role, _lab_stats),
         'queue': queue,
         'recent_completions': recent_completions,
-        'waiting_count': queue.count(),
-        'chart_labels': chart_labels,
-        'chart_data': chart_data,
-        'total_monthly_tests': total_monthly_tests,
-        'current_month_name': timezone.now().strftime('%B')
+        'waiting_count': len(queue),
     }
     return render(request, 'lab/dashboard.html', context)
 
@@ -437,11 +489,6 @@ def pharmacy_dashboard(request):
     context = {'total_drugs': 1240, 'low_stock': 8, 'today_sales': 4200, 'pending_count': 15}
     return render(request, 'pharmacy/dashboard.html', context)
 
-@login_required
-def dispense_medication(request, prescription_id):
-    messages.success(request, f"Medication #{prescription_id} dispensed.")
-    return redirect('pharmacy_dashboard')
-
 # --- PATIENT VIEWS ---
 @login_required
 def patient_dashboard(request):
@@ -541,19 +588,10 @@ def export_activity_pdf(request):
     logs = ActivityLog.objects.all().select_related('user')[:50] 
     template_path = 'manager/activity_report_pdf.html'
     context = {'logs': logs, 'title': 'System Activity Report'}
-    
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="activity_report.pdf"'
-    
+
     template = get_template(template_path)
     html = template.render(context)
-
-    # create a pdf
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    
-    if pisa_status.err:
-       return HttpResponse('Error creating PDF report <pre>' + html + '</pre>')
-    return response
+    return pdf_response(request, html, "activity_report.pdf", as_attachment=True)
 
 
 def privacy_policy(request):
@@ -603,7 +641,7 @@ def send_hospital_sms(phone_number, message):
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = get_session().get(url, params=params)
         return response.json()
     except Exception as e:
         print(f"Arkesel Error: {e}")
@@ -615,47 +653,24 @@ def verify_paystack_payment(request):
     bill_id = request.POST.get('bill_id')
     bill = get_object_or_404(Bill, id=bill_id)
 
-    # 1. Server-side Verification with Paystack
-    secret_key = settings.PAYSTACK_SECRET_KEY
-    url = f"https://api.paystack.co/transaction/verify/{reference}"
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json",
-    }
-
+    # 1. Server-side Verification with Paystack (idempotent on the reference)
     try:
-        response = requests.get(url, headers=headers)
-        res_data = response.json()
-        
-        # Check if payment was truly successful on Paystack's end
-        if res_data['status'] and res_data['data']['status'] == 'success':
-            
-            # 2. Update Bill Status
-            bill.status = 'paid'
-            bill.save()
-
-            # 3. Create Record in your database
-            Payment.objects.create(
-                bill=bill,
-                amount=bill.total_amount,
-                status='success',
-                payment_reference=reference,
-                payment_method='paystack'
-            )
+        payment, created = paystack.verify_and_record(bill.id, reference, processed_by=request.user)
 
-            # 4. Trigger Arkesel SMS Receipt
+        if created:
+            # 2. Trigger Arkesel SMS Receipt
             patient_name = bill.patient.user.first_name
             phone = bill.patient.user.phone_number
-            msg = f"Receipt: Hello {patient_name}, payment of GHS {bill.total_amount} for Bill {bill.bill_number} received. Thank you."
-            
+            msg = f"Receipt: Hello {patient_name}, payment of GHS {payment.amount} for Bill {bill.bill_number} received. Thank you."
+
             send_hospital_sms(phone, msg)
 
             messages.success(request, "Payment successful! Receipt sent via SMS.")
         else:
-            messages.error(request, "Payment verification failed. Please contact support.")
-            
-    except Exception as e:
-        messages.error(request, f"An error occurred: {str(e)}")
+            messages.info(request, "This payment has already been recorded.")
+
+    except paystack.PaystackError as e:
+        messages.error(request, f"Payment verification failed: {str(e)}")
 
     return redirect('bill_detail', bill_id=bill.id)
 
@@ -718,24 +733,28 @@ def pharmacy_dashboard(request):
     if request.user.role not in ['pharmacy', 'staff', 'manager'] and not request.user.is_superuser:
         return redirect('home')
     
-    # 1. Get Pending Prescriptions
-    prescriptions = MedicalRecord.objects.filter(pharmacy_status='pending').order_by('-visit_date')
+    # 1. Get Pending Prescriptions (the queue shows each patient's name)
+    prescriptions = list(
+        MedicalRecord.objects.filter(pharmacy_status='pending').select_related('patient').order_by('-visit_date')
+    )
     
     # 2. Get Inventory Items
     inventory = Medicine.objects.all()
     
-    # 3. Calculate Stats
-    low_stock_items = Medicine.objects.filter(quantity__lte=F('reorder_level'))
-
-    stock_out_count = Medicine.objects.filter(quantity=0).count()
+    # 3. Calculate Stats (one pass over the inventory)
+    stock = Medicine.objects.aggregate(
+        total=Count('id'),
+        low=Count('id', filter=Q(quantity__lte=F('reorder_level'))),
+        out=Count('id', filter=Q(quantity=0)),
+    )
     
     context = {
         'prescriptions': prescriptions,
-        'pending_count': prescriptions.count(),
+        'pending_count': len(prescriptions),
         'inventory': inventory,
-        'total_drugs': Medicine.objects.count(),
-        'low_stock': low_stock_items.count(),
-        'stock_out': stock_out_count,
+        'total_drugs': stock['total'],
+        'low_stock': stock['low'],
+        'stock_out': stock['out'],
         # For 'Today's Sales', you can later aggregate from a 'Sale' model
         'today_sales': "0.00", 
     }
@@ -747,7 +766,7 @@ def update_prescription_status(request, record_id):
         record = get_object_or_404(MedicalRecord, id=record_id)
         record.pharmacy_status = 'completed'
         record.save()
-        messages.success(request, f"Prescription for {record.patient.user.get_full_name()} marked as dispensed.")
+        messages.success(request, f"Prescription for {record.patient.get_full_name() or record.patient.username} marked as dispensed.")
     
     return redirect('pharmacy_dashboard')
 
@@ -782,10 +801,7 @@ def submit_lab_result(request, test_id):
         reagent = Reagent.objects.filter(name__icontains=lab_request.test_name).first()
         
         if reagent:
-            if reagent.stock_quantity > 0:
-                reagent.stock_quantity -= 1
-                reagent.save()
-            else:
+            if not consume_reagent(reagent):
                 messages.warning(request, f"Inventory Warning: No stock left for {reagent.name}, but results were saved.")
         
         # 3. Update Lab Request Data
@@ -799,7 +815,7 @@ def submit_lab_result(request, test_id):
         lab_request.save()
         
         # 4. Final Success Feedback
-        messages.success(request, f"Results for {lab_request.patient.name} submitted and inventory updated.")
+        messages.success(request, f"Results for {lab_request.patient.user.get_full_name()} submitted and inventory updated.")
         return redirect('lab_dashboard')
     
     # Fallback for GET requests
@@ -869,7 +885,7 @@ def create_lab_order(request, patient_id):
 @login_required
 def download_lab_pdf(request, lab_id):
     """Generates a professional PDF report for a lab result."""
-    lab = get_object_or_404(LabRequest, id=lab_id)
+    lab = get_object_or_404(LabRequest.objects.select_related('patient__user', 'doctor'), id=lab_id)
     
     # 1. Security: Only the patient owner or medical staff (doctors/lab techs/admins)
     is_staff = request.user.role in ['doctor', 'lab_tech', 'admin']
@@ -882,30 +898,29 @@ def download_lab_pdf(request, lab_id):
     if request.user.role == 'patient' and not lab.is_completed:
         return HttpResponse("This report is not yet ready for download.", status=400)
 
-    # 3. Render HTML to PDF
-    template = get_template('lab/result_pdf.html')
-    # Use lab.patient.name or fallback to username if name is blank
-    patient_name = lab.patient.name if lab.patient.name else lab.patient.user.username
-    
-    context = {
-        'lab': lab,
-        'patient_name': patient_name,
-        'report_date': lab.updated_at,
-    }
-    
-    html = template.render(context)
-    result = io.BytesIO()
-    
-    # Generate PDF
-    pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
-    
-    if not pdf.err:
-        response = HttpResponse(result.getvalue(), content_type='application/pdf')
-        filename = f"Lab_Result_{patient_name}_{lab.test_name}.pdf".replace(" ", "_")
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
-    
-    return HttpResponse("An error occurred while generating your PDF report.", status=500)
+    # 3. Render HTML to PDF (once per version of the results, then served from disk)
+    patient_name = lab.patient.user.get_full_name() or lab.patient.user.username
+
+    def build():
+        template = get_template('lab/result_pdf.html')
+        html = template.render({
+            'lab': lab,
+            'patient_name': patient_name,
+            'report_date': lab.updated_at,
+        })
+        result = io.BytesIO()
+        pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
+        if pdf.err:
+            raise ValueError("PDF rendering failed")
+        return result.getvalue()
+
+    try:
+        path, key = LAB_RESULTS.get_or_build(lab.id, lab_report_key(lab), build)
+    except ValueError:
+        return HttpResponse("An error occurred while generating your PDF report.", status=500)
+
+    filename = f"Lab_Result_{patient_name}_{lab.test_name}.pdf".replace(" ", "_")
+    return LAB_RESULTS.serve(request, path, key, filename, as_attachment=True)
 
 
 
@@ -931,16 +946,19 @@ def contact_page(request):
 
 
 
-# In your manager dashboard view
+@login_required
 def manage_inquiries(request):
+    if not (request.user.is_superuser or request.user.role == 'manager'):
+        return redirect('dashboard')
     # Get unread count for the notification badge
     unread_count = ContactMessage.objects.filter(is_read=False).count()
     
-    # Get all inquiries for the table
-    inquiries = ContactMessage.objects.all()
+    # Get one page of inquiries for the table
+    inquiries = KeysetPaginator(ContactMessage.objects.all(), '-created_at').page_from_request(request)
     
     return render(request, 'manager/inquiries.html', {
         'inquiries': inquiries,
+        'page': inquiries,
         'unread_count': unread_count
     })
 
@@ -3,3 +3,19 @@ from django.apps import AppConfig
 
 class AppointmentsConfig(AppConfig):
     name = 'appointments'
+
+    def ready(self):
+        from hospital.queues import WorkQueue, register
+        from .models import Appointment
+
+        # Nurses' triage list and each doctor's ready-for-consultation list
+        register(WorkQueue(
+            'triage', Appointment, 'nurses/triage_row.html',
+            in_queue=lambda appt: appt.status == 'pending',
+            roles=['staff', 'manager'], context_name='appt',
+        ))
+        register(WorkQueue(
+            'doctor', Appointment, 'doctors/queue_row.html',
+            in_queue=lambda appt: appt.status == 'ready',
+            roles=['doctor'], owner_field='doctor_id', context_name='appt',
+        ))
@@ -28,5 +28,11 @@ class Appointment(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Doctor work queues: filter(doctor=..., status=...).order_by('appointment_time')
+            models.Index(fields=['doctor', 'status', 'appointment_time'], name='appt_doctor_status_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.patient.user.get_full_name()} - {self.appointment_date}"
\ No newline at end of file
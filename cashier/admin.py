@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Bill, Payment
+from .models import Bill, Payment, DailyRevenueSummary
 
 @admin.register(Bill)
 class BillAdmin(admin.ModelAdmin):
@@ -11,4 +11,9 @@ class BillAdmin(admin.ModelAdmin):
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ['payment_reference', 'bill', 'amount', 'payment_method', 'status', 'transaction_date']
     list_filter = ['status', 'payment_method', 'transaction_date']
-    search_fields = ['payment_reference', 'paystack_reference', 'bill__bill_number']
\ No newline at end of file
+    search_fields = ['payment_reference', 'paystack_reference', 'bill__bill_number']
+
+@admin.register(DailyRevenueSummary)
+class DailyRevenueSummaryAdmin(admin.ModelAdmin):
+    list_display = ['day', 'department', 'payment_method', 'total_amount', 'payment_count']
+    list_filter = ['department', 'payment_method', 'day']
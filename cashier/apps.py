@@ -3,4 +3,17 @@ from django.apps import AppConfig
 
 class CashierConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'cashier'
\ No newline at end of file
+    name = 'cashier'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from hospital.queues import WorkQueue, register
+        from accounts.models import LabRequest
+
+        # Dashboard payment queue: unpaid lab tests. The pharmacy payment list
+        # is not pushed.
+        register(WorkQueue(
+            'cashier_lab', LabRequest, 'cashier/lab_payment_row.html',
+            in_queue=lambda lab: lab.payment_status == 'pending',
+            roles=['cashier', 'manager'], context_name='lab',
+        ))
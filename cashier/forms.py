@@ -1,15 +1,11 @@
 from django import forms
 from .models import Bill, Payment
-from patients.models import Patient
+from patients.forms import PatientChoiceField, PatientPicker
 
 class BillForm(forms.ModelForm):
     """Bill creation form"""
     
-    patient = forms.ModelChoiceField(
-        queryset=Patient.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'}),
-        empty_label="Select a patient"
-    )
+    patient = PatientChoiceField(widget=PatientPicker(attrs={'class': 'form-control'}))
     
     class Meta:
         model = Bill
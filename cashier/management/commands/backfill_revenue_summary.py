@@ -0,0 +1,56 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from cashier.models import Payment, DailyRevenueSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the DailyRevenueSummary rollup from the Payment table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Defaults to all history.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Defaults to today.')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        # One grouped pass over the payments instead of one aggregate per day
+        rows = Payment.objects.filter(status='success').annotate(
+            day=TruncDate('transaction_date'),
+            department=DailyRevenueSummary.department_expression(),
+        )
+        summaries = DailyRevenueSummary.objects.all()
+        if start:
+            rows = rows.filter(day__gte=start)
+            summaries = summaries.filter(day__gte=start)
+        if end:
+            rows = rows.filter(day__lte=end)
+            summaries = summaries.filter(day__lte=end)
+
+        grouped = rows.order_by().values('day', 'department', 'payment_method').annotate(
+            total=Sum('amount'), count=Count('id')
+        )
+
+        with transaction.atomic():
+            summaries.delete()
+            created = DailyRevenueSummary.objects.bulk_create(
+                [
+                    DailyRevenueSummary(
+                        day=row['day'],
+                        department=row['department'],
+                        payment_method=row['payment_method'],
+                        total_amount=row['total'],
+                        payment_count=row['count'],
+                    )
+                    for row in grouped.iterator()
+                ],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(created)} daily revenue rows."))
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.utils import timezone
+from hospital import pdf
+from manager.timing import percentile
+
+
+class Command(BaseCommand):
+    help = 'Compares receipt PDF throughput rendered in-request vs through the PDF render pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receipts', type=int, default=40)
+        parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous requests (web threads)')
+
+    def handle(self, *args, **options):
+        total, concurrency = options['receipts'], options['concurrency']
+        template = get_template('cashier/receipt_pdf.html')
+        html = template.render({
+            'item': SimpleNamespace(test_name='Full Blood Count', patient=SimpleNamespace(patient_id='HMS-000001')),
+            'item_type': 'Laboratory Test',
+            'amount': '2500.00',
+            'patient': 'Bench Patient',
+            'cashier': SimpleNamespace(get_full_name='Bench Cashier', username='bench'),
+            'date': timezone.now(),
+            'receipt_no': 'RCP-L-000001',
+        })
+
+        # Start the pool and import xhtml2pdf in every worker before timing
+        workers = settings.PDF_RENDER_WORKERS or 1
+        settings.PDF_RENDER_QUEUE = max(settings.PDF_RENDER_QUEUE, total)
+        for future in [pdf.submit(html) for _ in range(workers)]:
+            future.result()
+        pdf.html_to_pdf(html)
+
+        self.stdout.write(f"{total} receipts, {concurrency} concurrent requests, {workers} pool workers")
+        for label, render in [('in-request', pdf.html_to_pdf), ('pool', pdf.render_pdf)]:
+            latencies = []
+
+            def one_request(_):
+                start = time.perf_counter()
+                render(html)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as threads:
+                list(threads.map(one_request, range(total)))
+            elapsed = time.perf_counter() - start
+
+            latencies.sort()
+            self.stdout.write(
+                f"{label:<11} {total / elapsed:6.1f} receipts/s, "
+                f"p50 {percentile(latencies, 50):7.1f} ms, p95 {percentile(latencies, 95):7.1f} ms"
+            )
+        pdf._reset_pool()
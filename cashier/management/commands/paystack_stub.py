@@ -0,0 +1,100 @@
+import hashlib
+import hmac
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from hospital.http import get_session
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs a local Paystack stand-in that replays verify responses, or pushes a '
+        'signed charge.success webhook. Set PAYSTACK_BASE_URL=http://127.0.0.1:<port> to use it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fixtures', help='JSON file mapping reference -> full Paystack verify response')
+        parser.add_argument('--amount', type=int, default=10000, help='Default charge amount in pesewas')
+        parser.add_argument('--status', default='success', help='Default transaction status (success, failed, abandoned)')
+        parser.add_argument('--delay', type=float, default=0, help='Seconds to stall each response (exercises the read timeout)')
+        parser.add_argument('--send-webhook', metavar='URL', help='POST one signed charge.success event to URL and exit')
+        parser.add_argument('--reference', default='STUB_REF_1')
+        parser.add_argument('--bill-id', type=int)
+
+    def handle(self, *args, **options):
+        if options['send_webhook']:
+            return self.send_webhook(options)
+
+        fixtures = {}
+        if options['fixtures']:
+            try:
+                with open(options['fixtures']) as f:
+                    fixtures = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not load fixtures: {e}")
+
+        def default_response(reference):
+            return {
+                'status': True,
+                'message': 'Verification successful',
+                'data': {'reference': reference, 'status': options['status'], 'amount': options['amount'], 'currency': settings.PAYSTACK_CURRENCY},
+            }
+
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                prefix = '/transaction/verify/'
+                if not self.path.startswith(prefix):
+                    return self.reply(404, {'status': False, 'message': 'Not found'})
+                reference = self.path[len(prefix):]
+                if options['delay']:
+                    time.sleep(options['delay'])
+                self.reply(200, fixtures.get(reference) or default_response(reference))
+
+            def reply(self, code, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                stdout.write(format % args)
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(self.style.SUCCESS(f"Paystack stub listening on http://127.0.0.1:{options['port']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def send_webhook(self, options):
+        if not options['bill_id']:
+            raise CommandError('--bill-id is required with --send-webhook')
+        if not settings.PAYSTACK_SECRET_KEY:
+            raise CommandError('PAYSTACK_SECRET_KEY must be set to sign the webhook')
+        event = {
+            'event': 'charge.success',
+            'data': {
+                'reference': options['reference'],
+                'status': 'success',
+                'amount': options['amount'],
+                'currency': settings.PAYSTACK_CURRENCY,
+                'metadata': {'bill_id': options['bill_id']},
+            },
+        }
+        body = json.dumps(event).encode()
+        signature = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+        response = get_session().post(
+            options['send_webhook'],
+            data=body,
+            headers={'Content-Type': 'application/json', 'X-Paystack-Signature': signature},
+        )
+        self.stdout.write(f"Webhook answered {response.status_code}")
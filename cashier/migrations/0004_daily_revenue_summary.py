@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashier', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('department', models.CharField(choices=[('general', 'General Billing'), ('lab', 'Laboratory'), ('pharmacy', 'Pharmacy'), ('other', 'Other')], max_length=20)),
+                ('payment_method', models.CharField(choices=[('cash', 'Cash'), ('card', 'Card'), ('paystack', 'Paystack Online'), ('bank_transfer', 'Bank Transfer'), ('insurance', 'Insurance')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily revenue summaries',
+                'ordering': ['-day'],
+                'unique_together': {('day', 'department', 'payment_method')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashier', '0005_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('paystack_reference__gt', '')), fields=('paystack_reference',), name='unique_paystack_reference'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Case, F, Sum, Value, When
 from django.conf import settings
+from django.utils import timezone
 
 # Use string references to avoid circular imports
 # 'patients.Patient' points to Patient model in patients app
@@ -54,6 +56,9 @@ class Bill(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='bill_status_created_idx'),
+        ]
 
 
 class Payment(models.Model):
@@ -124,6 +129,100 @@ class Payment(models.Model):
     
     class Meta:
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['status', 'transaction_date'], name='payment_status_date_idx'),
+        ]
+        constraints = [
+            # One Payment per Paystack charge, however many times it is verified
+            models.UniqueConstraint(
+                fields=['paystack_reference'],
+                condition=models.Q(paystack_reference__gt=''),
+                name='unique_paystack_reference',
+            ),
+        ]
+
+    @property
+    def revenue_department(self):
+        """Department this payment is credited to in the revenue rollup"""
+        reference = self.payment_reference or ''
+        if self.lab_request_id or reference.startswith('LAB-'):
+            return 'lab'
+        if reference.startswith('PHARM'):
+            return 'pharmacy'
+        if self.bill_id:
+            return 'general'
+        return 'other'
+
+
+class DailyRevenueSummary(models.Model):
+    """
+    Rollup of successful payments per day, department and payment method.
+    Kept up to date by the Payment signals in cashier/signals.py so reports
+    read O(days) rows instead of scanning the Payment table.
+    """
+    DEPARTMENT_CHOICES = (
+        ('general', 'General Billing'),
+        ('lab', 'Laboratory'),
+        ('pharmacy', 'Pharmacy'),
+        ('other', 'Other'),
+    )
+
+    day = models.DateField()
+    department = models.CharField(max_length=20, choices=DEPARTMENT_CHOICES)
+    payment_method = models.CharField(max_length=20, choices=Payment.PAYMENT_METHOD_CHOICES)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ('day', 'department', 'payment_method')
+        verbose_name_plural = "Daily revenue summaries"
+
+    def __str__(self):
+        return f"{self.day} {self.department}/{self.payment_method}: {self.total_amount}"
+
+    @staticmethod
+    def department_expression():
+        """SQL equivalent of Payment.revenue_department, used by the backfill"""
+        return Case(
+            When(lab_request__isnull=False, then=Value('lab')),
+            When(payment_reference__startswith='LAB-', then=Value('lab')),
+            When(payment_reference__startswith='PHARM', then=Value('pharmacy')),
+            When(bill__isnull=False, then=Value('general')),
+            default=Value('other'),
+            output_field=models.CharField(),
+        )
+
+    @classmethod
+    def apply(cls, day, department, payment_method, amount, count):
+        """Add (or with negative values, remove) a payment from the rollup"""
+        row, created = cls.objects.get_or_create(
+            day=day, department=department, payment_method=payment_method
+        )
+        cls.objects.filter(pk=row.pk).update(
+            total_amount=F('total_amount') + amount,
+            payment_count=F('payment_count') + count,
+        )
+
+    @classmethod
+    def record_payment(cls, payment, sign=1):
+        if payment.status != 'success':
+            return
+        cls.apply(
+            timezone.localdate(payment.transaction_date),
+            payment.revenue_department,
+            payment.payment_method,
+            sign * payment.amount,
+            sign,
+        )
+
+    @classmethod
+    def total_between(cls, start, end=None):
+        """Total successful revenue for start <= day <= end (open-ended if end is None)"""
+        rows = cls.objects.filter(day__gte=start)
+        if end is not None:
+            rows = rows.filter(day__lte=end)
+        return rows.aggregate(total=Sum('total_amount'))['total'] or 0
 
 
 
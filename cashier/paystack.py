@@ -0,0 +1,90 @@
+# cashier/paystack.py
+import hashlib
+import hmac
+from decimal import Decimal
+import requests
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from hospital.http import get_session
+from .models import Bill, Payment
+
+
+class PaystackError(Exception):
+    pass
+
+
+def verify_transaction(reference):
+    """Asks Paystack for the state of a transaction and returns its `data` block."""
+    url = f"{settings.PAYSTACK_BASE_URL.rstrip('/')}/transaction/verify/{reference}"
+    headers = {'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}'}
+    try:
+        response = get_session().get(url, headers=headers)
+        payload = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise PaystackError(f"Could not reach Paystack: {e}") from e
+    if not payload.get('status') or not payload.get('data'):
+        raise PaystackError(payload.get('message') or 'Paystack rejected the verification request.')
+    return payload['data']
+
+
+def signature_is_valid(body, signature):
+    """Paystack signs webhook bodies with HMAC-SHA512 of the secret key."""
+    if not signature or not settings.PAYSTACK_SECRET_KEY:
+        return False
+    expected = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def record_payment(bill_id, reference, data, processed_by=None):
+    """
+    Applies a successful Paystack charge to a bill exactly once.
+    Returns (payment, created). Replays of the same reference, whether from a
+    double-submitted form or a repeated webhook, return the existing Payment.
+
+    A charge in another currency is refused. One for less than the bill still
+    owes is recorded, but leaves the bill partially paid.
+    """
+    existing = Payment.objects.filter(paystack_reference=reference).first()
+    if existing:
+        return existing, False
+    if data.get('status') != 'success':
+        raise PaystackError(f"Transaction {reference} is {data.get('status')}.")
+    if data.get('currency') != settings.PAYSTACK_CURRENCY:
+        raise PaystackError(f"Transaction {reference} was charged in {data.get('currency')}, not {settings.PAYSTACK_CURRENCY}.")
+    try:
+        # Paystack amounts are in the currency's subunit (pesewas)
+        amount = Decimal(str(data['amount'])) / 100
+    except (KeyError, ArithmeticError) as e:
+        raise PaystackError(f"Transaction {reference} has no valid amount.") from e
+    if not amount > 0:
+        raise PaystackError(f"Transaction {reference} is for {amount}.")
+
+    try:
+        with transaction.atomic():
+            bill = Bill.objects.select_for_update().get(pk=bill_id)
+            payment = Payment.objects.create(
+                bill=bill,
+                patient=bill.patient,
+                amount=amount,
+                payment_method='paystack',
+                status='success',
+                payment_reference=reference,
+                paystack_reference=reference,
+                processed_by=processed_by,
+            )
+            paid = bill.payments.filter(status='success').aggregate(total=Sum('amount'))['total']
+            bill.status = 'paid' if paid >= bill.total_amount else 'partially_paid'
+            bill.save()
+    except IntegrityError:
+        # Lost a race with another request for the same reference
+        return Payment.objects.get(paystack_reference=reference), False
+    return payment, True
+
+
+def verify_and_record(bill_id, reference, processed_by=None):
+    """Blocking verify used by the checkout callback; skips Paystack when already recorded."""
+    existing = Payment.objects.filter(paystack_reference=reference).first()
+    if existing:
+        return existing, False
+    return record_payment(bill_id, reference, verify_transaction(reference), processed_by)
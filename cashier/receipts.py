@@ -0,0 +1,115 @@
+# cashier/receipts.py
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import Future
+from django.conf import settings
+from django.template.loader import get_template
+from hospital.pdf import RenderError, html_to_pdf, submit
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+
+def receipt_payments(start, end, cashier=None):
+    """Successful payments in [start, end), with everything a receipt shows loaded in one query."""
+    payments = Payment.objects.filter(
+        status='success', transaction_date__gte=start, transaction_date__lt=end
+    ).select_related(
+        'bill__patient__user', 'lab_request__patient__user', 'patient__user', 'processed_by'
+    ).order_by('transaction_date', 'id')
+    if cashier is not None:
+        payments = payments.filter(processed_by=cashier)
+    return payments
+
+
+def receipt_context(payment):
+    """Context for cashier/receipt_body.html, shared by single receipts and bundles."""
+    item = payment.bill or payment.lab_request
+    patient = payment.patient or getattr(item, 'patient', None)
+    return {
+        'item': item,
+        'item_type': 'Laboratory Test' if payment.lab_request_id else 'Medical Services/Consultation',
+        'cashier': payment.processed_by,
+        'receipt_no': f"RCP-{payment.id:06d}",
+        'date': payment.transaction_date,
+        'amount': payment.amount,
+        'patient': patient.user.get_full_name() if patient else '',
+    }
+
+
+def receipt_bundle_html(payments):
+    """One document, one page per receipt: a single xhtml2pdf pass with fonts and styles loaded once."""
+    return get_template('cashier/receipt_bundle_pdf.html').render({
+        'receipts': [receipt_context(payment) for payment in payments],
+    })
+
+
+class _Chunks:
+    """Write-only file object for ZipFile; drain() hands the bytes written so far to the response."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _start_render(html):
+    """
+    A Future for one receipt's PDF: submitted to the render pool, or rendered
+    here when the pool is disabled (PDF_RENDER_WORKERS=0), as pdf_response does.
+    """
+    future = Future()
+    if not settings.PDF_RENDER_WORKERS:
+        try:
+            future.set_result(html_to_pdf(html))
+        except RenderError as e:
+            future.set_exception(e)
+        return future
+    try:
+        return submit(html)
+    except RenderError as e:  # Including RenderQueueFull
+        future.set_exception(e)
+        return future
+
+
+def _add_receipt(archive, payment_id, future):
+    try:
+        archive.writestr(f"Receipt_{payment_id}.pdf", future.result(settings.PDF_RENDER_WAIT))
+    except Exception as e:
+        logger.warning("Receipt %s left out of bundle: %r", payment_id, e)
+        archive.writestr(f"Receipt_{payment_id}.error.txt", f"Could not render this receipt: {e!r}\n")
+
+
+def stream_receipt_zip(payments):
+    """
+    Yields a ZIP of one PDF per receipt as each one is rendered, so the
+    download starts straight away. The template is parsed once for the batch.
+    Receipts are rendered in the PDF pool, a worker's worth at a time ahead of
+    the one being written, and added in order.
+    """
+    template = get_template('cashier/receipt_pdf.html')
+    sink = _Chunks()
+    in_flight = deque()
+    ahead = max(settings.PDF_RENDER_WORKERS, 1)
+    # PDFs are already compressed; storing them keeps the archive cheap to build
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for payment in payments:
+            in_flight.append((payment.id, _start_render(template.render(receipt_context(payment)))))
+            if len(in_flight) >= ahead:
+                _add_receipt(archive, *in_flight.popleft())
+                yield sink.drain()
+        while in_flight:
+            _add_receipt(archive, *in_flight.popleft())
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,28 @@
+# cashier/signals.py
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Payment, DailyRevenueSummary
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment(sender, instance, raw=False, **kwargs):
+    # Keep the stored version so post_save can reverse what it contributed
+    instance._previous_payment = None
+    if instance.pk and not raw:
+        instance._previous_payment = Payment.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Payment)
+def update_revenue_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_payment', None)
+    if previous is not None:
+        # Refunds, failures and edits: take the old contribution out first
+        DailyRevenueSummary.record_payment(previous, sign=-1)
+    DailyRevenueSummary.record_payment(instance)
+
+
+@receiver(post_delete, sender=Payment)
+def remove_from_revenue_summary(sender, instance, **kwargs):
+    DailyRevenueSummary.record_payment(instance, sign=-1)
@@ -10,6 +10,7 @@ urlpatterns = [
     path('bill/<int:bill_id>/', views.bill_detail, name='bill_detail'),
     path('bill/<int:bill_id>/process-payment/', views.process_payment, name='process_payment'),
     path('verify-paystack/', views.verify_paystack_payment, name='verify_paystack_payment'),
+    path('paystack/webhook/', views.paystack_webhook, name='paystack_webhook'),
     
     # Lab Queue & Payments
     path('mark-as-paid/<int:lab_id>/', views.mark_as_paid, name='mark_as_paid'),
@@ -21,6 +22,7 @@ urlpatterns = [
     path('bills/', views.all_bills, name='all_bills'),
     path('payments/', views.all_payments, name='all_payments'),
     path('report/daily/', views.daily_report, name='daily_report'),
+    path('report/daily/receipts/', views.receipt_bundle, name='receipt_bundle'),
 
     # Receipt Generation (PDFs)
     path('payment/<int:payment_id>/receipt/', views.print_receipt, name='print_receipt'),
@@ -1,27 +1,46 @@
-import io
+import json
+import logging
 import uuid
-import requests
+from datetime import timedelta
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
 from django.db.models import Sum, Count
 from django.utils import timezone
-from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.template.loader import get_template
-from xhtml2pdf import pisa
 
 # Local imports
-from .models import Bill, Payment
+from .models import Bill, Payment, DailyRevenueSummary
 from .forms import BillForm, PaymentForm
+from . import paystack
+from .receipts import receipt_bundle_html, receipt_context, receipt_payments, stream_receipt_zip
+from hospital.utils import day_range
+from hospital.pagination import KeysetPaginator
+from hospital.dashboard_cache import dashboard_context
+from hospital import kpis
+from hospital.pdf import pdf_response
 
-
+logger = logging.getLogger(__name__)
 
 
 def is_cashier(user):
     return user.is_authenticated and (user.role == 'cashier' or user.role == 'manager')
 
 
+def _overview_stats():
+    bills = kpis.bill_counts()
+    return {
+        'total_bills': bills['total'],
+        'pending_bills': bills['pending'],
+        'today_payments': kpis.payment_totals()['today'],
+    }
+
+
 @login_required
 def cashier_dashboard(request):
     """Unified Cashier Dashboard with Stats, Lab Queue, and Pharmacy Queue"""
@@ -29,17 +48,8 @@ def cashier_dashboard(request):
         messages.error(request, 'Access denied. Cashier staff only.')
         return redirect('dashboard')
     
-    today = timezone.now().date()
-    
-    # 1. Financial Stats (KPIs)
-    stats = {
-        'total_bills': Bill.objects.count(),
-        'pending_bills': Bill.objects.filter(status='pending').count(),
-        'today_payments': Payment.objects.filter(
-            transaction_date__date=today, 
-            status='success'
-        ).aggregate(total=Sum('amount'))['total'] or 0,
-    }
+    # 1. Financial Stats (KPIs, cached; see hospital/dashboard_cache.py)
+    stats = dashboard_context('cashier_overview', request.user.role, _overview_stats)
     
     # 2. Recent General Activity
     recent_bills = Bill.objects.select_related('patient__user').order_by('-id')[:10]
@@ -123,51 +133,67 @@ def verify_paystack_payment(request):
     """Verify digital payment via Paystack API"""
     if request.method == 'POST':
         reference = request.POST.get('reference')
-        bill_id = request.POST.get('bill_id')
-        bill = get_object_or_404(Bill, id=bill_id)
-        
-        headers = {'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}'}
-        url = f'https://api.paystack.co/transaction/verify/{reference}'
-        
+        bill = get_object_or_404(Bill, id=request.POST.get('bill_id'))
+
         try:
-            response = requests.get(url, headers=headers)
-            data = response.json()
-            
-            if data['status'] and data['data']['status'] == 'success':
-                Payment.objects.create(
-                    bill=bill,
-                    amount=data['data']['amount'] / 100,
-                    payment_method='paystack',
-                    status='success',
-                    paystack_reference=reference,
-                    processed_by=request.user
-                )
-                bill.status = 'paid'
-                bill.save()
+            payment, created = paystack.verify_and_record(bill.id, reference, processed_by=request.user)
+            if created:
                 messages.success(request, 'Paystack payment verified and applied.')
-        except Exception as e:
+            else:
+                messages.info(request, 'This Paystack payment has already been applied.')
+        except paystack.PaystackError as e:
             messages.error(request, f"Verification error: {str(e)}")
-            
+
         return redirect('bill_detail', bill_id=bill.id)
     return redirect('cashier_dashboard')
 
+@csrf_exempt
+@require_POST
+def paystack_webhook(request):
+    """Asynchronous charge confirmations pushed by Paystack (signed with the secret key)"""
+    if not paystack.signature_is_valid(request.body, request.headers.get('X-Paystack-Signature')):
+        return HttpResponse(status=401)
+    try:
+        event = json.loads(request.body)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    if event.get('event') == 'charge.success':
+        data = event.get('data') or {}
+        bill_id = (data.get('metadata') or {}).get('bill_id')
+        if bill_id and data.get('reference'):
+            try:
+                paystack.record_payment(bill_id, data['reference'], data)
+            except (Bill.DoesNotExist, ValueError, KeyError, ArithmeticError, paystack.PaystackError) as e:
+                # Not retryable: a 500 would only have Paystack redeliver it
+                logger.warning("Paystack charge %s for bill %s not applied: %r", data['reference'], bill_id, e)
+    # Always acknowledge, otherwise Paystack keeps retrying the delivery
+    return HttpResponse(status=200)
+
 @login_required
 def all_bills(request):
     """List of all generated bills"""
-    bills = Bill.objects.all().order_by('-id')
-    return render(request, 'cashier/all_bills.html', {'bills': bills})
+    bills = KeysetPaginator(
+        Bill.objects.select_related('patient__user'), '-created_at'
+    ).page_from_request(request)
+    return render(request, 'cashier/all_bills.html', {'bills': bills, 'page': bills})
 
 @login_required
 def all_payments(request):
     """Log of all payment transactions"""
-    payments = Payment.objects.all().order_by('-transaction_date')
-    return render(request, 'cashier/all_payments.html', {'payments': payments})
+    payments = KeysetPaginator(
+        Payment.objects.select_related('bill__patient__user'), '-transaction_date'
+    ).page_from_request(request)
+    return render(request, 'cashier/all_payments.html', {'payments': payments, 'page': payments})
 
 @login_required
 def daily_report(request):
     """End-of-day collection summary"""
-    today = timezone.now().date()
-    payments = Payment.objects.filter(transaction_date__date=today, status='success')
+    today = timezone.localdate()
+    today_start, today_end = day_range(today)
+    payments = Payment.objects.filter(
+        status='success', transaction_date__gte=today_start, transaction_date__lt=today_end
+    ).select_related('bill__patient__user')
     total = payments.aggregate(Sum('amount'))['amount__sum'] or 0
     return render(request, 'cashier/daily_report.html', {
         'payments': payments, 
@@ -213,40 +239,39 @@ def print_lab_receipt(request, lab_id):
     }
     
     html = template.render(context)
-    result = io.BytesIO()
-    pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
-    
-    response = HttpResponse(result.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="receipt_{lab.id}.pdf"'
-    return response
+    return pdf_response(request, html, f"receipt_{lab.id}.pdf")
 
 
 @login_required
 def print_receipt(request, payment_id):
     """Generate PDF Receipt for a general bill payment"""
-    payment = get_object_or_404(Payment, id=payment_id)
-    
-    template = get_template('cashier/receipt_pdf.html')
-    context = {
-        'item': payment.bill,
-        'item_type': 'Medical Services/Consultation',
-        'cashier': payment.processed_by,
-        'receipt_no': f"RCP-{payment.id:06d}",
-        'date': payment.transaction_date,
-        'amount': payment.amount,
-        'patient': payment.bill.patient.user.get_full_name(),
-    }
-    
-    html = template.render(context)
-    result = io.BytesIO()
-    pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
-    
-    if not pdf.err:
-        response = HttpResponse(result.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="Receipt_{payment.id}.pdf"'
+    payment = get_object_or_404(
+        Payment.objects.select_related('bill__patient__user', 'lab_request__patient__user', 'patient__user', 'processed_by'),
+        id=payment_id,
+    )
+    html = get_template('cashier/receipt_pdf.html').render(receipt_context(payment))
+    return pdf_response(request, html, f"Receipt_{payment.id}.pdf")
+
+
+@login_required
+def receipt_bundle(request):
+    """
+    Every successful receipt for a day in one download: ?format=pdf (default)
+    gives a single multi-page PDF, ?format=zip streams one PDF per receipt.
+    ?cashier=me narrows it to the current user's shift.
+    """
+    if not is_cashier(request.user):
+        return HttpResponseForbidden("Only cashiers can download receipt bundles.")
+
+    day = parse_date(request.GET.get('date', '')) or timezone.localdate()
+    cashier = request.user if request.GET.get('cashier') == 'me' else None
+    payments = receipt_payments(*day_range(day), cashier=cashier)
+
+    if request.GET.get('format') == 'zip':
+        response = StreamingHttpResponse(stream_receipt_zip(payments.iterator()), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="receipts_{day:%Y-%m-%d}.zip"'
         return response
-    
-    return HttpResponse("Error generating receipt", status=500)
+    return pdf_response(request, receipt_bundle_html(payments), f"receipts_{day:%Y-%m-%d}.pdf", as_attachment=True)
 
 
 @login_required
@@ -278,31 +303,34 @@ def manager_analytics(request):
     if request.user.role != 'manager':
         return redirect('dashboard')
 
-    # 1. Revenue by Department (Last 30 Days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    
-    lab_rev = Payment.objects.filter(
-        lab_request__isnull=False, status='success', transaction_date__gte=thirty_days_ago
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    pharmacy_rev = Payment.objects.filter(
-        payment_reference__startswith='PHARM', status='success', transaction_date__gte=thirty_days_ago
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    general_rev = Payment.objects.filter(
-        bill__isnull=False, status='success', transaction_date__gte=thirty_days_ago
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    # 2. Daily Revenue Trend (Last 7 Days)
+    # 1. Revenue by Department (Last 30 Days) from the daily rollup
+    today = timezone.localdate()
+    thirty_days_ago = today - timedelta(days=30)
+
+    by_department = dict(
+        DailyRevenueSummary.objects.filter(day__gte=thirty_days_ago)
+        .values('department')
+        .annotate(total=Sum('total_amount'))
+        .values_list('department', 'total')
+    )
+    lab_rev = by_department.get('lab') or 0
+    pharmacy_rev = by_department.get('pharmacy') or 0
+    general_rev = by_department.get('general') or 0
+
+    # 2. Daily Revenue Trend (Last 7 Days) - one grouped query
+    week_start = today - timedelta(days=6)
+    daily_totals = dict(
+        DailyRevenueSummary.objects.filter(day__gte=week_start)
+        .values('day')
+        .annotate(total=Sum('total_amount'))
+        .values_list('day', 'total')
+    )
     days = []
     revenue_trend = []
     for i in range(6, -1, -1):
-        date = timezone.now().date() - timedelta(days=i)
-        daily_sum = Payment.objects.filter(
-            transaction_date__date=date, status='success'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        date = today - timedelta(days=i)
         days.append(date.strftime('%a')) # 'Mon', 'Tue', etc.
-        revenue_trend.append(float(daily_sum))
+        revenue_trend.append(float(daily_totals.get(date) or 0))
 
     context = {
         'lab_rev': float(lab_rev),
@@ -1,6 +1,7 @@
 from django import forms
 from .models import Prescription, PrescriptionItem, MedicalRecord
 from .models import Prescription, PrescriptionItem
+from patients.forms import PatientPicker
 
 
 class MedicalRecordForm(forms.ModelForm):
@@ -37,7 +38,7 @@ class PrescriptionForm(forms.ModelForm):
         widgets = {
             'diagnosis': forms.Textarea(attrs={'rows': 2, 'class': 'form-control', 'placeholder': 'Diagnosis for pharmacist...'}),
             'clinical_notes': forms.Textarea(attrs={'rows': 2, 'class': 'form-control', 'placeholder': 'Special instructions...'}),
-            'patient': forms.Select(attrs={'class': 'form-control select2'}),
+            'patient': PatientPicker(attrs={'class': 'form-control'}),
         }
 
 # --- DYNAMIC PRESCRIPTION ROWS ---
@@ -2,14 +2,17 @@ import io
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.http import FileResponse
 from reportlab.pdfgen import canvas
-from django.db.models import Q
 
 # Import models
-from .models import Doctor, MedicalRecord, Prescription, PrescriptionItem, LabRequest
-from patients.models import Patient
+from .models import Doctor, Prescription, PrescriptionItem, LabRequest
+from patients.models import Patient, TimelineEvent
+from patients.timeline import latest_events, timeline_page
+from accounts.search import search_patients
+from accounts.utils import log_action
 from appointments.models import Appointment
 from .forms import MedicalRecordForm, PrescriptionForm, PrescriptionItemFormSet
 
@@ -46,10 +49,22 @@ def doctor_dashboard(request):
         status='ready'
     ).select_related('patient__user').order_by('appointment_time')
 
+    # Today's progress, counted in one query rather than in the template
+    today = timezone.localdate()
+    counts = Appointment.objects.filter(doctor=request.user).aggregate(
+        all_completed=Count('id', filter=Q(status='completed')),
+        today=Count('id', filter=Q(appointment_date=today)),
+        today_completed=Count('id', filter=Q(appointment_date=today, status='completed')),
+    )
+
     context = {
         'doctor': doctor_profile,
         'ready_patients': ready_patients,
-        'total_completed': Appointment.objects.filter(doctor=request.user, status='completed').count(),
+        'total_completed': counts['all_completed'],
+        'today': today,
+        'todays_count': counts['today'],
+        'completed_appointments': counts['today_completed'],
+        'pending_count': counts['today'] - counts['today_completed'],
     }
     return render(request, 'doctors/dashboard.html', context)
 
@@ -58,7 +73,9 @@ def doctor_dashboard(request):
 @login_required
 @doctor_required
 def consultation_session(request, appointment_id):
-    appointment = get_object_or_404(Appointment, id=appointment_id, doctor=request.user)
+    appointment = get_object_or_404(
+        Appointment.objects.select_related('patient__user'), id=appointment_id, doctor=request.user
+    )
     patient = appointment.patient
     doctor_profile = get_object_or_404(Doctor, user=request.user)
     
@@ -67,8 +84,8 @@ def consultation_session(request, appointment_id):
         appointment.status = 'consulting'
         appointment.save()
     
-    # Get latest vitals for the sidebar
-    latest_vitals = Vitals.objects.filter(patient=patient).order_by('-recorded_at').first()
+    # Latest vitals and recent visits for the sidebar, from the patient's timeline
+    latest_vitals = latest_events(patient, 'vitals')
     
     if request.method == 'POST':
         form = MedicalRecordForm(request.POST)
@@ -79,7 +96,7 @@ def consultation_session(request, appointment_id):
             # 1. Save Medical Record
             record = form.save(commit=False)
             record.patient = patient
-            record.doctor = doctor_profile
+            record.doctor = request.user
             record.appointment = appointment
             record.save()
             
@@ -87,7 +104,6 @@ def consultation_session(request, appointment_id):
             if record.ordered_tests:
                 LabRequest.objects.create(
                     medical_record=record,
-                    patient=patient,
                     test_name=f"Consultation Panel: {record.diagnosis[:50]}",
                     status='pending'
                 )
@@ -121,8 +137,8 @@ def consultation_session(request, appointment_id):
         'formset': formset,
         'appointment': appointment,
         'patient': patient,
-        'vitals': latest_vitals,
-        'history': MedicalRecord.objects.filter(patient=patient).order_by('-visit_date')[:5]
+        'vitals': latest_vitals[0].data if latest_vitals else None,
+        'history': latest_events(patient, 'visit', limit=5),
     }
     return render(request, 'doctors/consultation.html', context)
 
@@ -171,14 +187,16 @@ def generate_prescription_pdf(request, prescription_id):
 @login_required
 @doctor_required
 def patient_detail(request, patient_id):
-    """Full Electronic Health Record View."""
-    patient = get_object_or_404(Patient, id=patient_id)
+    """Full Electronic Health Record View: the patient's timeline, newest first, one page at a time."""
+    patient = get_object_or_404(Patient.objects.select_related('user'), id=patient_id)
+    log_action(request.user, "Viewed EHR", f"Opened health record of {patient.patient_id}")
+    kinds = dict(TimelineEvent.KIND_CHOICES)
+    kind = request.GET.get('kind') if request.GET.get('kind') in kinds else None
     context = {
         'patient': patient,
-        'records': MedicalRecord.objects.filter(patient=patient).order_by('-visit_date'),
-        'prescriptions': Prescription.objects.filter(patient=patient).order_by('-created_at'),
-        'lab_results': LabRequest.objects.filter(patient=patient, status='completed').order_by('-updated_at'),
-        'vitals_history': Vitals.objects.filter(patient=patient).order_by('-recorded_at')
+        'page': timeline_page(request, patient, kinds=[kind] if kind else None),
+        'kinds': TimelineEvent.KIND_CHOICES,
+        'kind': kind,
     }
     return render(request, 'doctors/patient_ehr.html', context)
 
@@ -198,16 +216,11 @@ def doctor_appointments(request):
 def doctor_patients(request):
     query = request.GET.get('q')
     if query:
-        # Search by name, patient_id, or phone number
-        patients = Patient.objects.filter(
-            Q(user__first_name__icontains=query) | 
-            Q(user__last_name__icontains=query) |
-            Q(patient_id__icontains=query) |
-            Q(phone_number__icontains=query)
-        ).distinct()
+        # Search by name, patient_id, phone number or email (ranked, via the search index)
+        patients = search_patients(query, limit=50)
     else:
         # Show patients the doctor has recently interacted with
-        patients = Patient.objects.filter(appointments__doctor=request.user).distinct()[:20]
+        patients = Patient.objects.filter(all_appointments__doctor=request.user).select_related('user').distinct()[:20]
 
     return render(request, 'doctors/patients_list.html', {
         'patients': patients,
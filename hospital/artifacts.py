@@ -0,0 +1,87 @@
+# hospital/artifacts.py
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def digest(*parts):
+    """Short content hash of whatever determines a rendered document."""
+    raw = '\x1f'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:20]
+
+
+class ArtifactCache:
+    """
+    Rendered documents (PDFs) stored on disk under MEDIA_ROOT/artifacts/<namespace>/
+    as <object id>-<digest><suffix>. The digest covers everything the document
+    depends on, so a changed source yields a new file name and an old file can
+    never be served for new data. Repeat downloads are a file read.
+
+    Usage:
+        path, key = LAB_REPORTS.get_or_build(test.id, digest(test.findings, test.updated_at),
+                                             lambda: render_pdf(test))
+        return LAB_REPORTS.serve(request, path, key, 'Lab_Report.pdf')
+    """
+
+    def __init__(self, namespace, suffix='.pdf', content_type='application/pdf'):
+        self.namespace = namespace
+        self.suffix = suffix
+        self.content_type = content_type
+
+    @property
+    def root(self):
+        return Path(settings.MEDIA_ROOT) / 'artifacts' / self.namespace
+
+    def path(self, object_id, key):
+        return self.root / f"{object_id}-{key}{self.suffix}"
+
+    def get_or_build(self, object_id, key, build):
+        """Returns (path, key), calling build() for the bytes only on a miss."""
+        path = self.path(object_id, key)
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename, so concurrent readers never see a partial PDF
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(build())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self.invalidate(object_id, keep=key)
+        return path, key
+
+    def read(self, object_id, key, build):
+        path, _ = self.get_or_build(object_id, key, build)
+        return path.read_bytes()
+
+    def invalidate(self, object_id, keep=None):
+        """Deletes stored versions for object_id (all of them, or all but `keep`)."""
+        if not self.root.exists():
+            return
+        for stale in self.root.glob(f"{object_id}-*{self.suffix}"):
+            if keep is None or stale.name != self.path(object_id, keep).name:
+                stale.unlink(missing_ok=True)
+
+    def serve(self, request, path, key, filename, as_attachment=False):
+        """FileResponse with ETag/Last-Modified; answers 304 when the client copy is current."""
+        etag = f'"{key}"'
+        last_modified = int(path.stat().st_mtime)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = FileResponse(
+            path.open('rb'), as_attachment=as_attachment, filename=filename, content_type=self.content_type,
+        )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
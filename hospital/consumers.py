@@ -0,0 +1,25 @@
+# hospital/consumers.py
+from asgiref.sync import async_to_sync
+from channels.generic.websocket import JsonWebsocketConsumer
+from .queues import QUEUES
+
+
+class WorkQueueConsumer(JsonWebsocketConsumer):
+    """Streams row changes for one work queue: ws/queues/<name>/"""
+
+    def connect(self):
+        queue = QUEUES.get(self.scope['url_route']['kwargs']['name'])
+        user = self.scope.get('user')
+        if queue is None or user is None or not queue.can_subscribe(user):
+            self.close()
+            return
+        self.group_name = queue.group_for_user(user)
+        async_to_sync(self.channel_layer.group_add)(self.group_name, self.channel_name)
+        self.accept()
+
+    def disconnect(self, code):
+        if getattr(self, 'group_name', None):
+            async_to_sync(self.channel_layer.group_discard)(self.group_name, self.channel_name)
+
+    def queue_change(self, event):
+        self.send_json({'queue': event['queue'], 'key': event['key'], 'html': event['html']})
@@ -0,0 +1,145 @@
+# hospital/dashboard_cache.py
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# A recompute still running after this long is presumed dead; another worker may take over
+LOCK_TIMEOUT = 60
+
+# How often a worker waiting on a cold key checks whether the result has landed (seconds)
+WAIT_STEP = 0.05
+
+
+def _key(name, role):
+    return f"dashboard:{name}:{role or '-'}"
+
+
+def _lock_path(backend, lock):
+    # Beside the cache's own files (which end in .djcache, so clear() and
+    # culling leave it alone), hence shared by every worker sharing the cache
+    os.makedirs(backend._dir, exist_ok=True)
+    return os.path.join(backend._dir, hashlib.md5(lock.encode()).hexdigest() + '.lock')
+
+
+def _acquire(lock):
+    """
+    Takes `lock` for LOCK_TIMEOUT seconds and returns a token for _release(),
+    or None if another worker holds it. FileBasedCache.add() is a read then a
+    write, so two workers can both win it; on that backend the lock is a file
+    created with O_CREAT | O_EXCL instead. The other backends' add() is atomic.
+    """
+    token = uuid.uuid4().hex
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        return token if backend.add(lock, token, LOCK_TIMEOUT) else None
+
+    path = _lock_path(backend, lock)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+                    return None
+                os.unlink(path)  # Its holder is presumed dead; try once more
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(token)
+        return token
+    return None
+
+
+def _release(lock, token):
+    """Drops `lock` if it is still ours: after LOCK_TIMEOUT another worker may hold it."""
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        if backend.get(lock) == token:
+            backend.delete(lock)
+        return
+    path = _lock_path(backend, lock)
+    try:
+        with open(path) as f:
+            if f.read() != token:
+                return
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _store(key, value):
+    ttl = settings.DASHBOARD_CACHE_TTL
+    cache.set(key, (time.time() + ttl, value), ttl + settings.DASHBOARD_CACHE_STALE)
+    return value
+
+
+def _refresh(key, compute, token):
+    try:
+        _store(key, compute())
+    except Exception:
+        logger.exception("Could not refresh dashboard cache %s", key)
+    finally:
+        _release(f"{key}:lock", token)
+
+
+def _refresh_in_background(key, compute, token):
+    def run():
+        try:
+            _refresh(key, compute, token)
+        finally:
+            # The thread has its own DB connection; do not leak it
+            connection.close()
+    threading.Thread(target=run, name=f"refresh {key}", daemon=True).start()
+
+
+def dashboard_context(name, role, compute):
+    """
+    compute()'s result (a picklable dict of aggregates) cached per dashboard
+    and role for DASHBOARD_CACHE_TTL seconds.
+
+    Once an entry is older than that it is still served, for up to
+    DASHBOARD_CACHE_STALE more seconds, while one worker recomputes it in a
+    background thread (stale-while-revalidate). Misses are single-flight: the
+    worker that takes the cache lock computes, and the others wait up to
+    DASHBOARD_CACHE_WAIT seconds for its result instead of running the same
+    queries. Set DASHBOARD_CACHE_TTL=0 to always compute.
+    """
+    if settings.DASHBOARD_CACHE_TTL <= 0:
+        return compute()
+
+    key = _key(name, role)
+    lock = f"{key}:lock"
+    entry = cache.get(key)
+    if entry is not None:
+        fresh_until, value = entry
+        if time.time() >= fresh_until:
+            token = _acquire(lock)
+            if token:
+                _refresh_in_background(key, compute, token)
+        return value
+
+    token = _acquire(lock)
+    if token:
+        try:
+            return _store(key, compute())
+        finally:
+            _release(lock, token)
+
+    deadline = time.monotonic() + settings.DASHBOARD_CACHE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    # The worker holding the lock is slow or gone; do not leave the page hanging
+    return compute()
@@ -0,0 +1,53 @@
+# hospital/http.py
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+
+
+class TimeoutSession(requests.Session):
+    """A Session that never waits forever: every request gets a (connect, read) timeout."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session():
+    session = TimeoutSession(timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT))
+    # Only idempotent calls are retried, and only on connection failures and
+    # gateway errors; a slow upstream still fails fast on the read timeout.
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_SIZE,
+        pool_maxsize=settings.HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """
+    Process-wide pooled session for outbound calls (Paystack, SMS gateway).
+    Keep-alive connections are reused across requests instead of paying a
+    TCP + TLS handshake on every call.
+    """
+    global _session
+    if _session is None:
+        _session = build_session()
+    return _session
@@ -0,0 +1,79 @@
+# hospital/kpis.py
+# --- Dashboard KPI cards ---
+# Each function returns every card a dashboard needs from one model in a
+# single aggregate() pass, using conditional aggregates instead of one
+# .count() / .aggregate() query per card:
+#     User.objects.aggregate(total=Count('id'), doctors=Count('id', filter=Q(role='doctor')))
+# Sums come back as 0 rather than None when no rows match.
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from accounts.models import User
+from appointments.models import Appointment
+from cashier.models import Bill, DailyRevenueSummary, Payment
+from .utils import day_range, month_range
+
+SUPPORT_ROLES = ['pharmacy', 'cashier', 'lab']
+STAFF_ROLES = ['cashier', 'staff']
+
+
+def _zero_sums(totals, *keys):
+    for key in keys:
+        totals[key] = totals[key] or 0
+    return totals
+
+
+def user_counts():
+    """total, doctors, patients (role), patient_profiles (rows in patients.Patient), support_staff, staff"""
+    return User.objects.aggregate(
+        total=Count('id'),
+        doctors=Count('id', filter=Q(role='doctor')),
+        patients=Count('id', filter=Q(role='patient')),
+        # One-to-one, so the join cannot inflate the other counts
+        patient_profiles=Count('patient_profile'),
+        support_staff=Count('id', filter=Q(role__in=SUPPORT_ROLES)),
+        staff=Count('id', filter=Q(role__in=STAFF_ROLES)),
+    )
+
+
+def bill_counts():
+    """total, pending, pending_amount"""
+    totals = Bill.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        pending_amount=Sum('total_amount', filter=Q(status='pending')),
+    )
+    return _zero_sums(totals, 'pending_amount')
+
+
+def payment_totals(day=None):
+    """today and month: successful payment totals for `day` (today by default) and its month"""
+    today_start, today_end = day_range(day)
+    month_start, month_end = month_range(day)
+    # Only this month's rows are read, through payment_status_date_idx
+    totals = Payment.objects.filter(
+        status='success', transaction_date__gte=month_start, transaction_date__lt=month_end,
+    ).aggregate(
+        today=Sum('amount', filter=Q(transaction_date__gte=today_start, transaction_date__lt=today_end)),
+        month=Sum('amount'),
+    )
+    return _zero_sums(totals, 'today', 'month')
+
+
+def appointment_counts(day=None):
+    """total, today, pending (awaiting vitals)"""
+    day = day or timezone.localdate()
+    return Appointment.objects.aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(appointment_date=day)),
+        pending=Count('id', filter=Q(status='pending')),
+    )
+
+
+def revenue_totals(day=None):
+    """total and month revenue from the daily summaries (see DailyRevenueSummary)"""
+    day = day or timezone.localdate()
+    totals = DailyRevenueSummary.objects.aggregate(
+        total=Sum('total_amount'),
+        month=Sum('total_amount', filter=Q(day__gte=day.replace(day=1))),
+    )
+    return _zero_sums(totals, 'total', 'month')
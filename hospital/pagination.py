@@ -0,0 +1,150 @@
+# hospital/pagination.py
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to move forwards/backwards."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class RankedPaginator:
+    """
+    Pages a list of primary keys that is already in rank order (search
+    results), loading only the current page's rows. The cursor is the offset
+    into the list, and pages render with the same template as KeysetPaginator.
+
+    Usage:
+        ids = search_user_ids(query, limit=RANK_WINDOW)
+        page = RankedPaginator(User.objects.all(), ids).page_from_request(request)
+    """
+    cursor_param = 'cursor'
+
+    def __init__(self, queryset, ids, per_page=50):
+        self.queryset = queryset
+        self.ids = list(ids)
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        try:
+            start = max(int(cursor), 0)
+        except (TypeError, ValueError):
+            start = 0
+        ids = self.ids[start:start + self.per_page]
+        rows = self.queryset.in_bulk(ids)
+        end = start + self.per_page
+        return KeysetPage(
+            [rows[pk] for pk in ids if pk in rows],
+            next_cursor=str(end) if end < len(self.ids) else None,
+            previous_cursor=str(max(start - self.per_page, 0)) if start > 0 else None,
+        )
+
+    def page_from_request(self, request):
+        return self.page(request.GET.get(self.cursor_param))
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) pagination over a single ordering field, with the primary
+    key as a tie-breaker. Instead of OFFSET, each page filters on the last row
+    seen, so page N costs the same as page 1 and rides the ordering index.
+
+    Usage:
+        page = KeysetPaginator(Payment.objects.all(), '-transaction_date').page_from_request(request)
+        # template: {% for p in page %} ... {% include 'shared/keyset_pagination.html' %}
+    """
+    cursor_param = 'cursor'
+    direction_param = 'dir'
+
+    def __init__(self, queryset, ordering, per_page=50):
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.per_page = per_page
+        self.field = queryset.model._meta.get_field(self.field_name)
+
+    # --- cursor encoding ---
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field.attname)
+        if hasattr(value, 'isoformat'):
+            # Full precision: DjangoJSONEncoder would round datetimes to milliseconds
+            value = value.isoformat()
+        raw = json.dumps([value, obj.pk], cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns (value, pk) or None if the cursor is missing or tampered with."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk = json.loads(raw)
+            return self.field.to_python(value), int(pk)
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    # --- querying ---
+    def _ordered(self, forward):
+        # Walking backwards flips the ordering; the page is re-reversed afterwards
+        descending = self.descending if forward else not self.descending
+        prefix = '-' if descending else ''
+        return self.queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk'), descending
+
+    def _after(self, queryset, descending, value, pk):
+        op = 'lt' if descending else 'gt'
+        # The redundant lte/gte bound lets the database seek into the index
+        # instead of walking it from the first row up to the cursor
+        return queryset.filter(
+            Q(**{f'{self.field_name}__{op}e': value}),
+            Q(**{f'{self.field_name}__{op}': value}) |
+            Q(**{self.field_name: value, f'pk__{op}': pk})
+        )
+
+    def page(self, cursor=None, backwards=False):
+        position = self.decode_cursor(cursor)
+        forward = not (backwards and position)
+        queryset, descending = self._ordered(forward)
+        if position:
+            queryset = self._after(queryset, descending, *position)
+
+        # Fetch one extra row to find out whether another page exists
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if forward:
+            next_cursor = self.encode_cursor(rows[-1]) if rows and has_more else None
+            previous_cursor = self.encode_cursor(rows[0]) if rows and position else None
+        else:
+            rows.reverse()
+            next_cursor = self.encode_cursor(rows[-1]) if rows else None
+            previous_cursor = self.encode_cursor(rows[0]) if rows and has_more else None
+
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def page_from_request(self, request):
+        return self.page(
+            request.GET.get(self.cursor_param),
+            backwards=request.GET.get(self.direction_param) == 'prev',
+        )
@@ -0,0 +1,215 @@
+# hospital/pdf.py
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, HttpResponse, JsonResponse, Http404
+from django.shortcuts import render
+from django.urls import reverse
+
+
+class RenderError(Exception):
+    pass
+
+
+class RenderQueueFull(RenderError):
+    pass
+
+
+def html_to_pdf(html):
+    """
+    Runs inside a pool worker. It only needs the HTML string, so templates are
+    still rendered in the request (where the ORM objects live) and only the
+    CPU-heavy xhtml2pdf step leaves the web worker.
+    """
+    from xhtml2pdf import pisa
+    result = io.BytesIO()
+    status = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
+    if status.err:
+        raise RenderError(f"xhtml2pdf reported {status.err} error(s)")
+    return result.getvalue()
+
+
+# --- the pool (one per web worker process, started on first use) ---
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            # spawn: workers start clean instead of forking a threaded web process
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            # Bounded queue: running jobs plus PDF_RENDER_QUEUE waiting ones
+            _slots = threading.BoundedSemaphore(settings.PDF_RENDER_WORKERS + settings.PDF_RENDER_QUEUE)
+        return _pool, _slots
+
+
+def _reset_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = _slots = None
+
+
+def submit(html):
+    """Queues HTML for rendering and returns a Future. Raises RenderQueueFull when saturated."""
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise RenderQueueFull("PDF renderer queue is full.")
+    try:
+        future = pool.submit(html_to_pdf, html)
+    except BrokenProcessPool:
+        slots.release()
+        _reset_pool()
+        raise RenderError("PDF renderer restarted, please retry.")
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda f: slots.release())
+    return future
+
+
+def render_pdf(html, timeout=None):
+    """Blocking render through the pool; raises concurrent.futures.TimeoutError past the deadline."""
+    return submit(html).result(timeout)
+
+
+# --- job handles (on disk, so any web worker can answer a poll) ---
+def _job_dir():
+    return Path(settings.MEDIA_ROOT) / 'artifacts' / 'pdf_jobs'
+
+
+def _write_json(path, data):
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _sweep_jobs():
+    cutoff = time.time() - settings.PDF_JOB_TTL
+    for path in _job_dir().glob('*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def start_job(future, user, filename, as_attachment=False):
+    """Records a pending render and returns its job id; the result lands on disk when done."""
+    job_dir = _job_dir()
+    job_dir.mkdir(parents=True, exist_ok=True)
+    _sweep_jobs()
+    job_id = uuid.uuid4().hex
+    meta_path = job_dir / f"{job_id}.json"
+    meta = {'user_id': user.pk, 'filename': filename, 'as_attachment': as_attachment, 'state': 'pending'}
+    _write_json(meta_path, meta)
+
+    def finished(f):
+        try:
+            pdf = f.result()
+        except Exception as e:
+            _write_json(meta_path, {**meta, 'state': 'failed', 'error': str(e)})
+            return
+        pdf_path = job_dir / f"{job_id}.pdf"
+        tmp = pdf_path.with_suffix('.part')
+        tmp.write_bytes(pdf)
+        os.replace(tmp, pdf_path)
+        _write_json(meta_path, {**meta, 'state': 'done'})
+
+    future.add_done_callback(finished)
+    return job_id
+
+
+def _job_handle(request, job_id, status=202):
+    status_url = reverse('pdf_job', args=[job_id])
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'job': job_id, 'state': 'pending', 'status_url': status_url}, status=status)
+    return render(request, 'shared/pdf_job.html', {'status_url': status_url}, status=status)
+
+
+def _pdf(content, filename, as_attachment):
+    response = HttpResponse(content, content_type='application/pdf')
+    disposition = 'attachment' if as_attachment else 'inline'
+    response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+    return response
+
+
+def pdf_response(request, html, filename, as_attachment=False):
+    """
+    Renders `html` to a PDF off the request thread.
+
+    By default the view waits up to PDF_RENDER_WAIT seconds and returns the PDF.
+    If the deadline passes, or the caller asked for ?async=1 (batch printing),
+    it returns a job handle (202) that polls /pdf-jobs/<id>/ until the file is ready.
+    """
+    if not settings.PDF_RENDER_WORKERS:
+        # Pool disabled: render in-request, as before
+        try:
+            return _pdf(html_to_pdf(html), filename, as_attachment)
+        except RenderError:
+            return HttpResponse("Error generating PDF", status=500)
+
+    try:
+        future = submit(html)
+    except RenderQueueFull:
+        response = HttpResponse("The PDF renderer is busy, please retry shortly.", status=503)
+        response['Retry-After'] = '5'
+        return response
+    except RenderError as e:
+        return HttpResponse(str(e), status=503)
+
+    if request.GET.get('async') != '1':
+        try:
+            return _pdf(future.result(settings.PDF_RENDER_WAIT), filename, as_attachment)
+        except FutureTimeout:
+            pass
+        except BrokenProcessPool:
+            _reset_pool()
+            return HttpResponse("PDF renderer restarted, please retry.", status=503)
+        except Exception:
+            return HttpResponse("Error generating PDF", status=500)
+
+    return _job_handle(request, start_job(future, request.user, filename, as_attachment))
+
+
+@login_required
+def job_view(request, job_id):
+    """Poll target for a job handle: 202 while rendering, the PDF once done."""
+    job_dir = _job_dir()
+    try:
+        job_id = uuid.UUID(hex=job_id).hex
+    except ValueError:
+        raise Http404("Unknown or expired PDF job.")
+    try:
+        meta = json.loads((job_dir / f"{job_id}.json").read_text())
+    except (FileNotFoundError, ValueError):
+        raise Http404("Unknown or expired PDF job.")
+    if meta['user_id'] != request.user.pk:
+        raise Http404("Unknown or expired PDF job.")
+
+    if meta['state'] == 'failed':
+        return HttpResponse("Error generating PDF", status=500)
+    if meta['state'] != 'done':
+        return _job_handle(request, job_id)
+    return FileResponse(
+        (job_dir / f"{job_id}.pdf").open('rb'),
+        as_attachment=meta['as_attachment'],
+        filename=meta['filename'],
+        content_type='application/pdf',
+    )
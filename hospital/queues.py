@@ -0,0 +1,129 @@
+# hospital/queues.py
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.template.loader import render_to_string
+
+logger = logging.getLogger(__name__)
+
+# name -> WorkQueue, filled in by each app's AppConfig.ready()
+QUEUES = {}
+
+
+class WorkQueue:
+    """
+    A dashboard list (triage, a doctor's ready patients, lab queue ...) that is
+    kept current over a WebSocket. When a row enters or changes in the queue,
+    its row template is rendered once and pushed to the queue's group; when it
+    leaves, a removal is pushed. Browsers patch the table instead of reloading
+    the whole dashboard.
+
+    owner_field names the FK that splits the queue per user (e.g. 'doctor_id'),
+    so each doctor only receives their own patients.
+
+    Rows are keyed '<app_label>-<model_name>-<pk>' (see key()); row templates
+    must set the same data-queue-key, since several apps share model names.
+    """
+
+    def __init__(self, name, model, row_template, in_queue, roles, owner_field=None, context_name='item'):
+        self.name = name
+        self.model = model
+        self.row_template = row_template
+        self.in_queue = in_queue
+        self.roles = set(roles)
+        self.owner_field = owner_field
+        self.context_name = context_name
+
+    def group_for(self, owner_id=None):
+        if self.owner_field:
+            return f"queue.{self.name}.{owner_id}"
+        return f"queue.{self.name}"
+
+    def group_for_user(self, user):
+        return self.group_for(user.pk)
+
+    def can_subscribe(self, user):
+        return user.is_authenticated and (user.is_superuser or getattr(user, 'role', None) in self.roles)
+
+    def key(self, instance):
+        meta = self.model._meta
+        return f"{meta.app_label}-{meta.model_name}-{instance.pk}"
+
+    def render_row(self, instance):
+        # Rendered without a request: {% csrf_token %} renders nothing (Django's
+        # NOTPROVIDED sentinel) and the page adds its own token client-side
+        return render_to_string(self.row_template, {self.context_name: instance, 'csrf_token': 'NOTPROVIDED'})
+
+    def publish(self, instance, was_in, previous_owner=None):
+        now_in = self.in_queue(instance)
+        if not (was_in or now_in):
+            return
+        owner = getattr(instance, self.owner_field) if self.owner_field else None
+        key = self.key(instance)
+
+        if was_in and previous_owner != owner:
+            # Reassigned (e.g. to another doctor): drop it from the old owner's list
+            send(self.group_for(previous_owner), self.name, key)
+        send(self.group_for(owner), self.name, key, (lambda: self.render_row(instance)) if now_in else None)
+
+
+def send(group, queue, key, render=None):
+    """
+    Pushes a row change once the surrounding transaction commits. `render`
+    builds the row HTML (None means the row left the queue); it runs after the
+    commit so it sees committed data and can never break the save itself.
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    def push():
+        try:
+            html = render() if render else None
+            async_to_sync(layer.group_send)(group, {'type': 'queue.change', 'queue': queue, 'key': key, 'html': html})
+        except Exception:
+            logger.exception("Could not push %s to work queue %s", key, queue)
+
+    transaction.on_commit(push)
+
+
+def _queues_for(model):
+    return [queue for queue in QUEUES.values() if queue.model is model]
+
+
+def _snapshot(sender, instance, raw=False, **kwargs):
+    instance._queue_membership = {}
+    if raw:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    for queue in _queues_for(sender):
+        if previous is not None:
+            owner = getattr(previous, queue.owner_field) if queue.owner_field else None
+            instance._queue_membership[queue.name] = (queue.in_queue(previous), owner)
+
+
+def _changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    membership = getattr(instance, '_queue_membership', {})
+    for queue in _queues_for(sender):
+        was_in, previous_owner = membership.get(queue.name, (False, None))
+        queue.publish(instance, was_in, previous_owner)
+
+
+def _deleted(sender, instance, **kwargs):
+    for queue in _queues_for(sender):
+        if queue.in_queue(instance):
+            owner = getattr(instance, queue.owner_field) if queue.owner_field else None
+            send(queue.group_for(owner), queue.name, queue.key(instance))
+
+
+def register(queue):
+    QUEUES[queue.name] = queue
+    uid = f"work_queue:{queue.model._meta.label}"
+    pre_save.connect(_snapshot, sender=queue.model, dispatch_uid=uid)
+    post_save.connect(_changed, sender=queue.model, dispatch_uid=uid)
+    post_delete.connect(_deleted, sender=queue.model, dispatch_uid=uid)
+    return queue
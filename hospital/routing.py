@@ -0,0 +1,7 @@
+# hospital/routing.py
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path('ws/queues/<str:name>/', consumers.WorkQueueConsumer.as_asgi()),
+]
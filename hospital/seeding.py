@@ -0,0 +1,438 @@
+# hospital/seeding.py
+# --- Synthetic hospital data ---
+# Generates referentially consistent staff, patients and clinical history for
+# load tests and benchmarks. Everything is drawn from one random.Random(seed)
+# and dated relative to a fixed `today`, so the same arguments produce the same
+# rows:
+#     HospitalSeeder(seed=7, prefix='load', today=date(2026, 1, 31)).run(patients=100_000)
+# Rows are written with batched bulk_create, one transaction per chunk of
+# patients, so memory stays flat at any scale. bulk_create skips signals; call
+# rebuild_derived() afterwards to fill the search index, revenue rollup and
+# patient timelines. Generated rows are linked by the primary keys bulk_create
+# returns, so the backend must support that (SQLite 3.35+, PostgreSQL).
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import (
+    ActivityLog, LabRequest as AccountsLabRequest, MedicalRecord as PharmacyQueueRecord, Medicine,
+    Patient as AccountsPatient, Profile, User, classify_action,
+)
+from appointments.models import Appointment
+from cashier.models import Bill, Payment
+from doctors.models import Doctor, LabRequest as ConsultationLabRequest, MedicalRecord, Prescription, PrescriptionItem
+from inpatient.models import Admission, VitalSign, Ward
+from labs.models import LabRequest
+from manager.models import Staff
+from patients.models import Patient, Vitals
+from pharmacy.models import Medication, Prescription as PharmacyPrescription
+
+FIRST = ['Kwame', 'Ama', 'Kofi', 'Akosua', 'Yaw', 'Abena', 'Kojo', 'Efua', 'Kwesi', 'Adwoa', 'Fiifi', 'Esi', 'Yaa', 'Kwabena']
+LAST = ['Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Addo', 'Appiah', 'Agyeman', 'Darko', 'Quaye', 'Tetteh', 'Arhin']
+BLOOD_GROUPS = ['O+', 'O+', 'O+', 'A+', 'A+', 'B+', 'B+', 'AB+', 'O-', 'A-']
+DIAGNOSES = [
+    'Malaria', 'Hypertension', 'Typhoid fever', 'Upper respiratory tract infection', 'Type 2 diabetes',
+    'Gastritis', 'Urinary tract infection', 'Peptic ulcer disease', 'Acute gastroenteritis', 'Anaemia',
+]
+TESTS = [
+    'Full Blood Count', 'Malaria Parasite (MP)', 'Fasting Blood Sugar', 'Urinalysis', 'Lipid Profile',
+    'Widal Test', 'Liver Function Test', 'Renal Function Test', 'H. pylori Antigen', 'Stool R/E',
+]
+DRUGS = [
+    ('Artemether/Lumefantrine', 'Antimalarial'), ('Amlodipine', 'Antihypertensive'), ('Paracetamol', 'Analgesic'),
+    ('Metformin', 'Antidiabetic'), ('Omeprazole', 'Proton pump inhibitor'), ('Amoxicillin', 'Antibiotic'),
+    ('Ciprofloxacin', 'Antibiotic'), ('Ferrous sulphate', 'Haematinic'), ('ORS', 'Rehydration'), ('Ibuprofen', 'Analgesic'),
+]
+SPECIALIZATIONS = [choice for choice, _ in Doctor.SPECIALIZATION_CHOICES]
+PAYMENT_METHODS = ['cash', 'cash', 'cash', 'card', 'paystack', 'insurance']
+WARDS = [('General', 40), ('ICU', 8), ('Maternity', 20), ('Pediatric', 16)]
+
+# role -> (Staff.department, position). Nurses are kept under a role of their own, as nurses.views expects
+STAFF_ROLES = {
+    'manager': ('administration', 'Hospital Manager'),
+    'cashier': ('reception', 'Cashier'),
+    'lab_tech': ('laboratory', 'Laboratory Technician'),
+    'nurse': ('nursing', 'Staff Nurse'),
+    'pharmacist': ('pharmacy', 'Pharmacist'),
+}
+
+# Longest prefix whose IDs still fit patient_id / bill_number (max_length 20)
+MAX_PREFIX = 10
+
+CONSULTATION_FEE = Decimal('150.00')
+LAB_FEE = Decimal('60.00')
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Lets bulk_create keep the dates it is given instead of auto_now / auto_now_add."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def has_table(model):
+    # Apps without migrations (nurses), or ones not migrated yet, may have no table
+    return model._meta.db_table in connection.introspection.table_names()
+
+
+def rebuild_derived():
+    """Refills the tables that signals keep current and bulk_create does not."""
+    for command in ('rebuild_search_index', 'backfill_revenue_summary', 'rebuild_timeline'):
+        call_command(command, stdout=StringIO())
+
+
+class HospitalSeeder:
+    """
+    Generates a hospital's worth of data. Usernames, patient IDs and bill and
+    payment numbers all start with `prefix`, so several runs can share a
+    database as long as their prefixes differ.
+
+    Each patient gets on average `visits` appointments spread over the last
+    `days` days (plus a few booked for the coming week). What follows from a
+    visit depends on its status, the way it would at the front desk: vitals,
+    a consultation record, prescriptions, lab orders in all three lab tables,
+    bills and their payments, the odd admission, and the audit trail.
+    """
+
+    def __init__(self, seed=0, prefix='seed', batch_size=1000, today=None, days=365, stdout=None):
+        if not 0 < len(prefix) <= MAX_PREFIX:
+            raise ValueError(f"prefix must be 1 to {MAX_PREFIX} characters")
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.today = today or timezone.localdate()
+        self.days = days
+        self.stdout = stdout
+        self.counts = Counter()
+        self.pharmacy = has_table(PharmacyPrescription)
+
+    # --- helpers ---
+    def _bulk(self, model, objects):
+        if objects:
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+            self.counts[model._meta.label] += len(objects)
+        return objects
+
+    def _at(self, days_ago, hour=8, minute=0):
+        day = self.today - timedelta(days=days_ago)
+        return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+    def _person(self, n):
+        first, last = self.rng.choice(FIRST), self.rng.choice(LAST)
+        return {
+            'first_name': first, 'last_name': last, 'email': f"{self.prefix}{n}@example.com",
+            'phone_number': f"0{self.rng.choice([20, 24, 26, 27, 54, 55])}{self.rng.randrange(10 ** 7):07d}",
+        }
+
+    def _log(self, user, action, details, when):
+        action_type, severity = classify_action(action)
+        return ActivityLog(user=user, action=action, details=details, timestamp=when, action_type=action_type, severity=severity)
+
+    # --- generation ---
+    def run(self, patients, doctors=None, staff=None, visits=3):
+        """Writes everything; returns {model label: rows written}."""
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise ImproperlyConfigured(f"{connection.vendor} does not return primary keys from bulk inserts; seed a PostgreSQL or SQLite database")
+        doctors = doctors or max(1, patients // 100)
+        staff = staff or max(1, patients // 500)
+        models = [
+            User, Doctor, Staff, Patient, Appointment, MedicalRecord, Prescription, Vitals, LabRequest,
+            AccountsLabRequest, Bill, Payment, PharmacyPrescription, PharmacyQueueRecord, Admission, VitalSign,
+        ]
+        with explicit_timestamps(*models):
+            with transaction.atomic():
+                self._staff(doctors, staff)
+            for start in range(0, patients, self.batch_size):
+                with transaction.atomic():
+                    self._patients(start, min(start + self.batch_size, patients), visits)
+                if self.stdout:
+                    self.stdout.write(f"  {min(start + self.batch_size, patients)} / {patients} patients")
+        return dict(self.counts)
+
+    def _staff(self, doctors, staff):
+        joined = self._at(self.days + 30)
+        users, n = [], 0
+        for role, count in [('doctor', doctors)] + [(role, 1 if role == 'manager' else staff) for role in STAFF_ROLES]:
+            for _ in range(count):
+                users.append(User(
+                    username=f"{self.prefix}-{role}-{n:05d}", role=role, password='!', date_joined=joined,
+                    created_at=joined, updated_at=joined, **self._person(f"-{role}-{n}"),
+                ))
+                n += 1
+        self._bulk(User, users)
+        self._bulk(Profile, [Profile(user=user, is_verified=True) for user in users])
+
+        self.doctors = [user for user in users if user.role == 'doctor']
+        self.staff = {role: [user for user in users if user.role == role] for role in STAFF_ROLES}
+        doctor_profiles = self._bulk(Doctor, [
+            Doctor(
+                user=user, doctor_id=f"{self.prefix}-D{n:05d}", specialization=self.rng.choice(SPECIALIZATIONS),
+                license_number=f"{self.prefix}-MDC-{n:05d}", qualification='MBChB', consultation_fee=CONSULTATION_FEE,
+                created_at=joined,
+            )
+            for n, user in enumerate(self.doctors)
+        ])
+        self.doctor_profiles = {profile.user_id: profile for profile in doctor_profiles}
+        self._bulk(Staff, [
+            Staff(
+                user=user, staff_id=f"{self.prefix}-S{n:05d}", department=STAFF_ROLES[user.role][0],
+                position=STAFF_ROLES[user.role][1], salary=Decimal(self.rng.randrange(2500, 9000, 250)),
+                joining_date=joined.date(), created_at=joined, updated_at=joined,
+            )
+            for n, user in enumerate(users) if user.role in STAFF_ROLES
+        ])
+        self.wards = self._bulk(Ward, [
+            Ward(name=f"{self.prefix} {category} Ward", category=category, total_beds=beds) for category, beds in WARDS
+        ])
+
+        # One stock catalogue per database; a second run leaves it alone
+        stock = [
+            (name, category, self.rng.choice([0, 8, 40, 120, 500]), Decimal(self.rng.randrange(50, 2500)) / 100,
+             self.today + timedelta(days=self.rng.randrange(30, 720)))
+            for name, category in DRUGS
+        ]
+        if not Medicine.objects.filter(name__in=[name for name, _ in DRUGS]).exists():
+            self._bulk(Medicine, [
+                Medicine(name=name, category=category, quantity=quantity, reorder_level=20, price_per_unit=price, expiry_date=expiry)
+                for name, category, quantity, price, expiry in stock
+            ])
+        if has_table(Medication) and not Medication.objects.filter(name__in=[name for name, _ in DRUGS]).exists():
+            self._bulk(Medication, [
+                Medication(name=name, category=category, current_stock=quantity, reorder_level=20, unit_price=price, expiry_date=expiry)
+                for name, category, quantity, price, expiry in stock
+            ])
+
+    def _patients(self, start, end, visits):
+        rng = self.rng
+        users = []
+        for n in range(start, end):
+            joined = self._at(rng.randrange(self.days + 1))
+            users.append(User(
+                username=f"{self.prefix}-p{n:07d}", role='patient', password='!', date_joined=joined,
+                created_at=joined, updated_at=joined,
+                date_of_birth=self.today - timedelta(days=rng.randrange(365, 85 * 365)), **self._person(n),
+            ))
+        self._bulk(User, users)
+        self._bulk(Profile, [Profile(user=user, is_verified=rng.random() < 0.8, blood_group=rng.choice(BLOOD_GROUPS)) for user in users])
+        patients = self._bulk(Patient, [
+            Patient(user=user, patient_id=f"{self.prefix}-{n:07d}", blood_group=rng.choice(BLOOD_GROUPS))
+            for n, user in zip(range(start, end), users)
+        ])
+        accounts_patients = self._bulk(AccountsPatient, [
+            AccountsPatient(user=user, patient_id=f"{self.prefix}-A{n:07d}") for n, user in zip(range(start, end), users)
+        ])
+
+        # Appointments: days_ago < 0 is booked ahead, 0 is today's clinic
+        appointments = []
+        for patient, user in zip(patients, users):
+            for _ in range(rng.randint(1, 2 * visits - 1)):
+                days_ago = rng.randrange(-7, self.days + 1)
+                if days_ago < 0:
+                    status = 'pending'
+                elif days_ago == 0:
+                    status = rng.choice(['pending', 'ready', 'consulting', 'lab_pending', 'completed'])
+                else:
+                    status = rng.choices(['completed', 'cancelled', 'lab_pending'], [85, 10, 5])[0]
+                hour, minute = rng.randrange(8, 17), rng.choice([0, 15, 30, 45])
+                triaged = status != 'pending' and status != 'cancelled'
+                appointments.append(Appointment(
+                    patient=patient, doctor=rng.choice(self.doctors), appointment_date=self.today - timedelta(days=days_ago),
+                    appointment_time=time(hour, minute), reason=rng.choice(DIAGNOSES), status=status,
+                    temp=Decimal(rng.randrange(360, 395)) / 10 if triaged else None,
+                    bp=f"{rng.randrange(100, 170)}/{rng.randrange(60, 105)}" if triaged else None,
+                    pulse=rng.randrange(58, 120) if triaged else None,
+                    respiratory_rate=rng.randrange(12, 24) if triaged else None,
+                    created_at=self._at(max(days_ago, 0) + rng.randrange(0, 14), 7),
+                ))
+        self._bulk(Appointment, appointments)
+
+        def seen_at(appointment, minutes=0):
+            when = timezone.make_aware(datetime.combine(appointment.appointment_date, appointment.appointment_time))
+            return when + timedelta(minutes=minutes)
+
+        self._bulk(Vitals, [
+            Vitals(
+                patient=appointment.patient, temperature=appointment.temp, bp=appointment.bp, pulse=appointment.pulse,
+                weight=Decimal(rng.randrange(450, 1100)) / 10, recorded_at=seen_at(appointment, 10),
+            )
+            for appointment in appointments if appointment.temp is not None
+        ])
+
+        records = self._bulk(MedicalRecord, [
+            MedicalRecord(
+                appointment=appointment, patient=appointment.patient, doctor=appointment.doctor,
+                diagnosis=rng.choice(DIAGNOSES), clinical_notes=f"Presented with {appointment.reason.lower()}. Examined and counselled.",
+                ordered_tests=appointment.status == 'lab_pending' or rng.random() < 0.35,
+                requires_admission=rng.random() < 0.03, visit_date=seen_at(appointment, 30),
+            )
+            for appointment in appointments if appointment.status in ('consulting', 'lab_pending', 'completed')
+        ])
+        finished = {record.pk: record.appointment.status == 'completed' for record in records}
+
+        # Prescriptions, with the pharmacy's copies of them
+        prescriptions = self._bulk(Prescription, [
+            Prescription(
+                medical_record=record, doctor_profile=self.doctor_profiles[record.doctor_id], patient=record.patient, diagnosis=record.diagnosis,
+                status='dispensed' if finished[record.pk] and rng.random() < 0.9 else 'pending', created_at=record.visit_date,
+            )
+            for record in records if rng.random() < 0.7
+        ])
+        items = []
+        for prescription in prescriptions:
+            for name, _ in rng.sample(DRUGS, rng.randint(1, 3)):
+                items.append(PrescriptionItem(
+                    prescription=prescription, medicine_name=name, dosage=rng.choice(['1 tab', '2 tabs', '500 mg', '10 ml']),
+                    frequency=rng.choice(['OD', 'BD', 'TDS', 'PRN']), duration=f"{rng.choice([3, 5, 7, 14, 30])} days",
+                    quantity=rng.choice([6, 10, 14, 20, 30]),
+                ))
+        self._bulk(PrescriptionItem, items)
+        by_prescription = {}
+        for item in items:
+            by_prescription.setdefault(item.prescription_id, []).append(item)
+        user_of = {patient.pk: user for patient, user in zip(patients, users)}
+        accounts_patient_of = {patient.pk: accounts_patient for patient, accounts_patient in zip(patients, accounts_patients)}
+        self._bulk(PharmacyQueueRecord, [
+            PharmacyQueueRecord(
+                patient=user_of[prescription.patient_id],
+                prescription='\n'.join(f"{item.medicine_name} {item.dosage} {item.frequency} x {item.duration}" for item in by_prescription[prescription.pk]),
+                pharmacy_status='completed' if prescription.status == 'dispensed' else 'pending', visit_date=prescription.created_at,
+            )
+            for prescription in prescriptions
+        ])
+        pharmacy_prescriptions = [
+            PharmacyPrescription(
+                patient=accounts_patient_of[prescription.patient_id], doctor=prescription.medical_record.doctor,
+                medication_name=item.medicine_name, dosage=item.dosage, frequency=item.frequency, duration=item.duration,
+                price=Decimal(item.quantity) * Decimal('2.50'),
+                status='dispensed' if prescription.status == 'dispensed' else rng.choice(['pending', 'paid']),
+                created_at=prescription.created_at, updated_at=prescription.created_at,
+            )
+            for prescription in prescriptions for item in by_prescription[prescription.pk][:1]
+        ]
+        if self.pharmacy:
+            self._bulk(PharmacyPrescription, pharmacy_prescriptions)
+
+        # Lab orders: the consultation's own request, the lab queue, and the lab module's copy
+        ordered = [record for record in records if record.ordered_tests]
+        lab_orders = []
+        for record in ordered:
+            done = finished[record.pk]
+            # Tests are paid for before the lab runs them; unfinished ones may be waiting at either desk
+            paid = done or rng.random() < 0.6
+            lab_orders.append((record, rng.choice(TESTS), done, paid, rng.random() < 0.1))
+        self._bulk(ConsultationLabRequest, [
+            ConsultationLabRequest(
+                medical_record=record, test_name=test, status='completed' if done else 'pending',
+                results='Within normal limits.' if done else '', lab_tech=rng.choice(self.staff['lab_tech']) if done else None,
+                recorded_at=record.visit_date + timedelta(hours=2) if done else None,
+            )
+            for record, test, done, paid, urgent in lab_orders
+        ])
+        self._bulk(AccountsLabRequest, [
+            AccountsLabRequest(
+                patient=record.patient, doctor=record.doctor, test_name=test, priority='emergency' if urgent else 'normal',
+                clinical_notes=record.diagnosis, findings='Within normal limits.' if done else None,
+                payment_status='paid' if paid else 'pending', is_completed=done,
+                created_at=record.visit_date, updated_at=record.visit_date + timedelta(hours=2 if done else 0),
+            )
+            for record, test, done, paid, urgent in lab_orders
+        ])
+        labs = self._bulk(LabRequest, [
+            LabRequest(
+                patient=record.patient, doctor=record.doctor, test_name=test, priority='emergency' if urgent else 'normal',
+                clinical_notes=record.diagnosis, findings='Within normal limits.' if done else None,
+                status='completed' if done else 'pending', is_completed=done,
+                created_at=record.visit_date, updated_at=record.visit_date + timedelta(hours=2 if done else 0),
+            )
+            for record, test, done, paid, urgent in lab_orders
+        ])
+
+        # Bills and payments: a consultation bill per visit, a medicine bill for most prescriptions
+        cashiers = self.staff['cashier']
+        bills = []
+        for record in records:
+            paid = finished[record.pk] and rng.random() < 0.92
+            bills.append(Bill(
+                bill_number=f"{self.prefix}-B{record.pk:08d}", patient=record.patient, bill_type='consultation',
+                description=f"Consultation: {record.diagnosis}", amount=CONSULTATION_FEE, total_amount=CONSULTATION_FEE,
+                status='paid' if paid else 'pending', created_by=rng.choice(cashiers),
+                created_at=record.visit_date, updated_at=record.visit_date,
+            ))
+        for prescription in prescriptions:
+            if rng.random() < 0.5:
+                amount = sum((Decimal(item.quantity) * Decimal('2.50') for item in by_prescription[prescription.pk]), Decimal('0'))
+                bills.append(Bill(
+                    bill_number=f"{self.prefix}-M{prescription.pk:08d}", patient=prescription.patient, bill_type='medicine',
+                    description='Dispensed medicines', amount=amount, total_amount=amount,
+                    status='paid' if prescription.status == 'dispensed' else 'pending', created_by=rng.choice(cashiers),
+                    created_at=prescription.created_at, updated_at=prescription.created_at,
+                ))
+        self._bulk(Bill, bills)
+        payments = [
+            Payment(
+                patient=bill.patient, bill=bill, payment_reference=f"{self.prefix}-PAY-{bill.pk:08d}", amount=bill.total_amount,
+                payment_method=rng.choice(PAYMENT_METHODS), status='success', processed_by=bill.created_by,
+                transaction_date=bill.created_at + timedelta(minutes=rng.randrange(5, 90)),
+            )
+            for bill in bills if bill.status == 'paid'
+        ] + [
+            Payment(
+                patient=lab.patient, lab_request=lab, payment_reference=f"{self.prefix}-LAB-{lab.pk:08d}", amount=LAB_FEE,
+                payment_method=rng.choice(PAYMENT_METHODS), status='success', processed_by=rng.choice(cashiers),
+                transaction_date=lab.created_at + timedelta(minutes=rng.randrange(5, 60)),
+            )
+            for lab, (_, _, _, paid, _) in zip(labs, lab_orders) if paid
+        ]
+        self._bulk(Payment, payments)
+
+        # Admissions, with ward-round vitals; anything older than a week has been discharged
+        admissions = []
+        for record in records:
+            if not record.requires_admission:
+                continue
+            admitted_at = record.visit_date + timedelta(hours=1)
+            discharged = record.visit_date.date() < self.today - timedelta(days=7)
+            admissions.append(Admission(
+                patient=accounts_patient_of[record.patient_id], ward=rng.choice(self.wards), bed_number=f"B{rng.randrange(1, 41):02d}",
+                admitted_at=admitted_at, reason=record.diagnosis, is_discharged=discharged,
+                discharged_at=admitted_at + timedelta(days=rng.randint(2, 7)) if discharged else None,
+            ))
+        self._bulk(Admission, admissions)
+        self._bulk(VitalSign, [
+            VitalSign(
+                admission=admission, nurse=rng.choice(self.staff['nurse']), recorded_at=admission.admitted_at + timedelta(hours=6 * n),
+                temperature=Decimal(rng.randrange(362, 392)) / 10, blood_pressure=f"{rng.randrange(100, 160)}/{rng.randrange(60, 100)}",
+                pulse_rate=rng.randrange(60, 110),
+            )
+            for admission in admissions for n in range(3)
+        ])
+
+        # Audit trail: sign-ins, chart views, payments
+        logs = [
+            self._log(user, 'Login', 'Signed in from 127.0.0.1', self._at(rng.randrange(self.days + 1), rng.randrange(7, 22)))
+            for user in users for _ in range(rng.randint(0, 3))
+        ]
+        logs += [
+            self._log(record.doctor, 'Viewed Patient Record', f"Opened chart {record.patient_id}", record.visit_date)
+            for record in records
+        ]
+        logs += [
+            self._log(payment.processed_by, 'Processed payment', f"{payment.payment_reference} GHS {payment.amount}", payment.transaction_date)
+            for payment in payments
+        ]
+        self._bulk(ActivityLog, logs)
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'storages',
     'crispy_forms',
     'crispy_bootstrap5',
+    'channels',
 
     # Hospital system apps
     'patients',
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 
 # 4. MIDDLEWARE
 MIDDLEWARE = [
+    'manager.middleware.RequestTimingMiddleware',  # first, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,6 +87,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hospital.wsgi.application'
+ASGI_APPLICATION = 'hospital.asgi.application'
 
 # 6. DATABASE (Switched to Local SQLite)
 # This removes the "Connection Refused" error because it doesn't need a Postgres server
@@ -117,4 +120,88 @@ LOGOUT_REDIRECT_URL = 'home'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
-CRISPY_TEMPLATE_PACK = "bootstrap5"
\ No newline at end of file
+CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+# 9. CACHING
+# The file cache is shared by every gunicorn worker on a host. For multi-node
+# deploys point CACHE_BACKEND at the database cache (run createcachetable).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+
+# 10. EMAIL
+# Views queue mail in manager.EmailLog; `python manage.py send_queued_emails --loop`
+# delivers it. Point EMAIL_HOST/EMAIL_PORT at a local SMTP sink for testing.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = 30
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@hms-core.com')
+ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@hms-core.com')
+# Attachments of queued mail (lab report PDFs) wait here, outside MEDIA_ROOT so
+# they are never served, and are deleted once the message is sent or given up on.
+EMAIL_OUTBOX_DIR = os.environ.get('EMAIL_OUTBOX_DIR', str(BASE_DIR / 'email_outbox'))
+
+# 11. PAYMENTS & OUTBOUND HTTP
+# Point PAYSTACK_BASE_URL at `python manage.py paystack_stub` to replay canned
+# Paystack responses locally.
+PAYSTACK_PUBLIC_KEY = os.environ.get('PAYSTACK_PUBLIC_KEY', '')
+PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', '')
+PAYSTACK_BASE_URL = os.environ.get('PAYSTACK_BASE_URL', 'https://api.paystack.co')
+# Charges in any other currency are refused rather than applied to a bill
+PAYSTACK_CURRENCY = os.environ.get('PAYSTACK_CURRENCY', 'GHS')
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+
+# 12. LIVE WORK QUEUES (Django Channels)
+# The in-memory layer only reaches sockets served by the same process, so run
+# HTTP and WebSockets from one ASGI server (daphne/uvicorn hospital.asgi:application).
+# Multi-process deploys set CHANNEL_REDIS_URL (requires channels_redis).
+CHANNEL_LAYERS = {
+    'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+}
+if os.environ.get('CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS['default'] = {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {'hosts': [os.environ['CHANNEL_REDIS_URL']]},
+    }
+
+# 13. PDF RENDERING
+# Receipts and reports are converted to PDF in a process pool, off the web
+# worker. Views wait up to PDF_RENDER_WAIT seconds, then hand back a job the
+# browser polls. Set PDF_RENDER_WORKERS=0 to render in-request instead.
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', 2))
+PDF_RENDER_QUEUE = int(os.environ.get('PDF_RENDER_QUEUE', 16))
+PDF_RENDER_WAIT = float(os.environ.get('PDF_RENDER_WAIT', 8))
+PDF_JOB_TTL = 60 * 60
+
+# 14. AUDIT LOG
+# log_action() buffers ActivityLog rows per worker and writes them in batches.
+# Each entry is journaled to AUDIT_JOURNAL_DIR first; journals of crashed
+# workers are replayed automatically (or with `manage.py replay_audit_journal`).
+AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', 200))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 5))
+AUDIT_JOURNAL_DIR = os.environ.get('AUDIT_JOURNAL_DIR', str(BASE_DIR / 'audit_journal'))
+
+# 15. ACTIVITY LOG RETENTION
+# `manage.py archive_activity_logs` (run it daily from cron) moves ActivityLog
+# rows older than ACTIVITY_RETENTION_DAYS into monthly gzip files under
+# ACTIVITY_ARCHIVE_DIR; `manage.py search_activity_archive` reads them back.
+ACTIVITY_RETENTION_DAYS = int(os.environ.get('ACTIVITY_RETENTION_DAYS', 365))
+ACTIVITY_ARCHIVE_DIR = os.environ.get('ACTIVITY_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'activity_logs'))
+ACTIVITY_ARCHIVE_CHUNK = 2000
+
+# 16. DASHBOARD CACHE
+# Dashboard KPI cards are cached per dashboard and role for DASHBOARD_CACHE_TTL
+# seconds, then served stale for up to DASHBOARD_CACHE_STALE more while one
+# worker refreshes them (see hospital/dashboard_cache.py). 0 disables caching.
+DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 30))
+DASHBOARD_CACHE_STALE = 300
+DASHBOARD_CACHE_WAIT = 5
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from accounts.views import user_login # Import your custom login view directly
 from allauth.account.views import PasswordChangeView
+from hospital.pdf import job_view as pdf_job
 
 urlpatterns = [
     # 1. Admin Portal
@@ -32,6 +33,9 @@ urlpatterns = [
     
 
     path('nurse/', include('nurses.urls')),
+
+    # 5. Background PDF jobs (polled by the pages that started them)
+    path('pdf-jobs/<str:job_id>/', pdf_job, name='pdf_job'),
 ]
 
 # Serve media and static files during development
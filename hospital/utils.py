@@ -1,6 +1,9 @@
 # hospital/utils.py (Adjusted for your project name)
+from datetime import datetime, time, timedelta
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import models
+from django.utils import timezone
 
 def check_stock_alerts():
     """Checks for medications below reorder level and notifies the manager."""
@@ -14,4 +17,31 @@ def check_stock_alerts():
             f"The following items are low in stock: {item_list}. Please restock immediately.",
             settings.DEFAULT_FROM_EMAIL,
             ['manager@yourhospital.com'],
-        )
\ No newline at end of file
+        )
+
+
+# --- Sargable date ranges ---
+# Lookups like transaction_date__date=today wrap the column in a function, so
+# the database cannot use an index on it. These helpers turn calendar days into
+# half-open [start, end) timestamp ranges in the current timezone instead:
+#     start, end = day_range()
+#     Payment.objects.filter(transaction_date__gte=start, transaction_date__lt=end)
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def date_range(start_day, end_day):
+    """Covers start_day through end_day inclusive."""
+    return _start_of(start_day), _start_of(end_day + timedelta(days=1))
+
+def day_range(day=None):
+    """Covers a single calendar day (today by default)."""
+    day = day or timezone.localdate()
+    return date_range(day, day)
+
+def month_range(day=None):
+    """Covers the calendar month containing day (this month by default)."""
+    day = day or timezone.localdate()
+    first = day.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return _start_of(first), _start_of(next_month)
@@ -2,4 +2,16 @@ from django.apps import AppConfig
 
 class LabsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'labs'
\ No newline at end of file
+    name = 'labs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from hospital.queues import WorkQueue, register
+        from accounts.models import LabRequest
+
+        # The lab dashboard's work list: paid tests without a result yet
+        register(WorkQueue(
+            'lab', LabRequest, 'lab/queue_row.html',
+            in_queue=lambda test: test.payment_status == 'paid' and not test.is_completed,
+            roles=['lab_tech', 'manager'], context_name='test',
+        ))
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labs', '0001_initial'),
+        ('patients', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labrequest',
+            index=models.Index(fields=['status', 'created_at'], name='labreq_status_created_idx'),
+        ),
+    ]
@@ -35,6 +35,11 @@ class LabRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='labreq_status_created_idx'),
+        ]
+
     def __str__(self):
         patient_name = self.patient.name if self.patient else "Unknown"
         return f"{self.test_name} - {patient_name}"
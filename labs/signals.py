@@ -0,0 +1,33 @@
+# labs/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import LabRequest as AccountsLabRequest
+from doctors.models import LabRequest as DoctorsLabRequest
+from .utils import LAB_REPORTS, LAB_SUMMARIES, LAB_RESULTS, lab_report_key
+
+# Which rendered-PDF caches hold documents for which LabRequest table
+ARTIFACT_CACHES = {
+    DoctorsLabRequest: (LAB_REPORTS, LAB_SUMMARIES),
+    AccountsLabRequest: (LAB_RESULTS,),
+}
+
+
+@receiver(post_save, sender=DoctorsLabRequest)
+@receiver(post_save, sender=AccountsLabRequest)
+def drop_stale_reports(sender, instance, raw=False, **kwargs):
+    # New findings mean a new digest; remove the PDFs rendered from old results
+    if raw:
+        return
+    try:
+        current = lab_report_key(instance)
+    except AttributeError:
+        current = None
+    for cache in ARTIFACT_CACHES[sender]:
+        cache.invalidate(instance.pk, keep=current)
+
+
+@receiver(post_delete, sender=DoctorsLabRequest)
+@receiver(post_delete, sender=AccountsLabRequest)
+def drop_deleted_reports(sender, instance, **kwargs):
+    for cache in ARTIFACT_CACHES[sender]:
+        cache.invalidate(instance.pk)
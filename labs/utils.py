@@ -2,6 +2,17 @@ import io
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
+from hospital.artifacts import ArtifactCache, digest
+
+# Rendered PDFs on disk, one file per version of a lab result
+LAB_REPORTS = ArtifactCache('lab_reports')
+LAB_SUMMARIES = ArtifactCache('lab_summaries')
+LAB_RESULTS = ArtifactCache('lab_results')
+
+
+def lab_report_key(test):
+    """Changes whenever the findings or the result timestamp change."""
+    return digest(test.findings, test.updated_at.isoformat() if test.updated_at else None)
 
 def generate_lab_pdf(test):
     """Returns raw PDF bytes for a Lab Investigation Report"""
@@ -50,4 +61,62 @@ def generate_lab_pdf(test):
     
     pdf_value = buffer.getvalue()
     buffer.close()
-    return pdf_value
\ No newline at end of file
+    return pdf_value
+
+
+def render_lab_report(test):
+    """Returns raw PDF bytes for the printable Laboratory Investigation Report"""
+    # Create a file-like buffer to receive PDF data.
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    # --- Header Section ---
+    p.setFont("Helvetica-Bold", 20)
+    p.drawCentredString(width/2, height - 50, "CITY GENERAL HOSPITAL")
+    p.setFont("Helvetica", 10)
+    p.drawCentredString(width/2, height - 65, "123 Medical Drive, Health City | Tel: +233 555 0123")
+    p.drawCentredString(width/2, height - 80, "Official Laboratory Investigation Report")
+    
+    p.line(50, height - 100, width - 50, height - 100)
+
+    # --- Patient & Test Info ---
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, height - 130, f"Patient Name: {test.medical_record.patient.user.get_full_name()}")
+    p.drawString(50, height - 150, f"Patient ID: #PT-{test.medical_record.patient.patient_id}")
+    p.drawString(350, height - 130, f"Date: {test.updated_at.strftime('%d %b %Y')}")
+    p.drawString(350, height - 150, f"Test Type: {test.test_name}")
+
+    p.line(50, height - 170, width - 50, height - 170)
+
+    # --- Results Section ---
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(50, height - 200, "INVESTIGATION FINDINGS")
+    
+    p.setFont("Helvetica", 12)
+    # Using textobject to handle multiline findings
+    text_object = p.beginText(50, height - 230)
+    text_object.setFont("Helvetica", 11)
+    text_object.setLeading(15)
+    
+    # Wrap text if findings are long
+    lines = test.findings.split('\n')
+    for line in lines:
+        text_object.textLine(line)
+    p.drawText(text_object)
+
+    # --- Footer / Signatures ---
+    p.line(50, 150, 200, 150)
+    p.setFont("Helvetica-Oblique", 9)
+    p.drawString(50, 135, "Lab Technician Signature")
+    
+    p.setFont("Helvetica", 8)
+    p.drawCentredString(width/2, 30, "This is a computer-generated report. No physical signature required.")
+
+    # Finalize PDF
+    p.showPage()
+    p.save()
+
+    pdf_value = buffer.getvalue()
+    buffer.close()
+    return pdf_value
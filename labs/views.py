@@ -5,13 +5,34 @@ from django.utils import timezone
 from django.db.models import Count
 from accounts.decorators import lab_tech_only
 from doctors.models import LabRequest
-from .utils import generate_lab_pdf
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from django.core.mail import EmailMessage
+from .utils import generate_lab_pdf, render_lab_report, lab_report_key, LAB_REPORTS, LAB_SUMMARIES
+from hospital.utils import month_range
+from hospital.dashboard_cache import dashboard_context
+from manager.models import EmailLog
 from django.template.loader import render_to_string
-from django.conf import settings
+
+def _monthly_stats():
+    # STATS: Monthly performance tracking
+    current_date = timezone.now()
+    month_start, month_end = month_range()
+    total_monthly_tests = LabRequest.objects.filter(
+        status='completed', 
+        updated_at__gte=month_start,
+        updated_at__lt=month_end
+    ).count()
+
+    # CHART DATA: Group tests by name for the bar chart
+    test_distribution = LabRequest.objects.filter(
+        updated_at__gte=month_start,
+        updated_at__lt=month_end
+    ).values('test_name').annotate(count=Count('id')).order_by('-count')[:5]
+
+    return {
+        'total_monthly_tests': total_monthly_tests,
+        'current_month_name': current_date.strftime('%B'),
+        'chart_labels': [item['test_name'] for item in test_distribution] or ['No Data'],
+        'chart_data': [item['count'] for item in test_distribution] or [0],
+    }
 
 @login_required
 @lab_tech_only
@@ -31,27 +52,12 @@ def lab_dashboard(request):
         'medical_record__patient__user'
     ).order_by('-updated_at')[:5]
     
-    # 3. STATS: Monthly performance tracking
-    current_date = timezone.now()
-    total_monthly_tests = LabRequest.objects.filter(
-        status='completed', 
-        updated_at__month=current_date.month,
-        updated_at__year=current_date.year
-    ).count()
-
-    # 4. CHART DATA: Group tests by name for the bar chart
-    test_distribution = LabRequest.objects.filter(
-        updated_at__month=current_date.month
-    ).values('test_name').annotate(count=Count('id')).order_by('-count')[:5]
-
     context = {
+        # 3-4. Monthly stats and chart data (cached; see hospital/dashboard_cache.py)
+        **dashboard_context('lab_overview', request.user.role, _monthly_stats),
         'queue': queue,
         'recent_completions': recent_completions,
         'waiting_count': queue.count(),
-        'total_monthly_tests': total_monthly_tests,
-        'current_month_name': current_date.strftime('%B'),
-        'chart_labels': [item['test_name'] for item in test_distribution] or ['No Data'],
-        'chart_data': [item['count'] for item in test_distribution] or [0],
     }
     return render(request, 'labs/dashboard.html', context)
 
@@ -86,60 +92,10 @@ def submit_lab_result(request, test_id):
 @lab_tech_only
 def print_lab_report(request, test_id):
     test = get_object_or_404(LabRequest, id=test_id)
-    
-    # Create a file-like buffer to receive PDF data.
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # --- Header Section ---
-    p.setFont("Helvetica-Bold", 20)
-    p.drawCentredString(width/2, height - 50, "CITY GENERAL HOSPITAL")
-    p.setFont("Helvetica", 10)
-    p.drawCentredString(width/2, height - 65, "123 Medical Drive, Health City | Tel: +233 555 0123")
-    p.drawCentredString(width/2, height - 80, "Official Laboratory Investigation Report")
-    
-    p.line(50, height - 100, width - 50, height - 100)
-
-    # --- Patient & Test Info ---
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(50, height - 130, f"Patient Name: {test.medical_record.patient.user.get_full_name()}")
-    p.drawString(50, height - 150, f"Patient ID: #PT-{test.medical_record.patient.patient_id}")
-    p.drawString(350, height - 130, f"Date: {test.updated_at.strftime('%d %b %Y')}")
-    p.drawString(350, height - 150, f"Test Type: {test.test_name}")
 
-    p.line(50, height - 170, width - 50, height - 170)
-
-    # --- Results Section ---
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, height - 200, "INVESTIGATION FINDINGS")
-    
-    p.setFont("Helvetica", 12)
-    # Using textobject to handle multiline findings
-    text_object = p.beginText(50, height - 230)
-    text_object.setFont("Helvetica", 11)
-    text_object.setLeading(15)
-    
-    # Wrap text if findings are long
-    lines = test.findings.split('\n')
-    for line in lines:
-        text_object.textLine(line)
-    p.drawText(text_object)
-
-    # --- Footer / Signatures ---
-    p.line(50, 150, 200, 150)
-    p.setFont("Helvetica-Oblique", 9)
-    p.drawString(50, 135, "Lab Technician Signature")
-    
-    p.setFont("Helvetica", 8)
-    p.drawCentredString(width/2, 30, "This is a computer-generated report. No physical signature required.")
-
-    # Finalize PDF
-    p.showPage()
-    p.save()
-
-    buffer.seek(0)
-    return FileResponse(buffer, as_attachment=False, filename=f"Lab_Report_{test.id}.pdf")
+    # Rendered once per version of the results; reprints are a file read
+    path, key = LAB_REPORTS.get_or_build(test.id, lab_report_key(test), lambda: render_lab_report(test))
+    return LAB_REPORTS.serve(request, path, key, f"Lab_Report_{test.id}.pdf")
 
 
 
@@ -154,30 +110,22 @@ def email_lab_report(request, test_id):
         return redirect('lab_dashboard')
 
     # Generate PDF using the helper
-    pdf_content = generate_lab_pdf(test)
+    pdf_content = LAB_SUMMARIES.read(test.id, lab_report_key(test), lambda: generate_lab_pdf(test))
 
-    # Prepare Email
+    # Queue the email; the send_queued_emails worker delivers it
     subject = f"Your Lab Results: {test.test_name}"
     message_body = render_to_string('labs/email_template.txt', {
         'patient_name': patient_user.get_full_name(),
         'test_name': test.test_name,
     })
 
-    email = EmailMessage(
-        subject,
-        message_body,
-        settings.DEFAULT_FROM_EMAIL,
-        [patient_user.email],
+    EmailLog.queue(
+        recipient=patient_user.email,
+        subject=subject,
+        body=message_body,
+        attachment=(f"Lab_Result_{test.id}.pdf", pdf_content),
     )
-    
-    # Attach the PDF
-    email.attach(f"Lab_Result_{test.id}.pdf", pdf_content, 'application/pdf')
-
-    try:
-        email.send()
-        messages.success(request, f"Email sent successfully to {patient_user.email}")
-    except Exception as e:
-        messages.error(request, "Failed to send email. Check SMTP settings.")
+    messages.success(request, f"Report queued for delivery to {patient_user.email}")
     
     return redirect('lab_dashboard')
 
@@ -7,5 +7,5 @@ def hospital_settings(request):
     This allows us to use {{ hospital_settings.hospital_name }} anywhere.
     """
     return {
-        'hospital_settings': HospitalSetting.load()
+        'hospital_settings': HospitalSetting.cached()
     }
\ No newline at end of file
@@ -0,0 +1,295 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import time as clock
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import resolve
+from django.utils import timezone
+from accounts.models import LabRequest as AccountsLabRequest, MedicalRecord as PharmacyQueueRecord, User
+from appointments.models import Appointment
+from doctors.models import Prescription
+from hospital.seeding import DIAGNOSES, DRUGS, HospitalSeeder, rebuild_derived
+from labs.models import LabRequest
+from manager.models import HospitalSetting
+from manager.timing import percentile
+from patients.models import Patient
+
+# The OPD journey, in order: (step, role that performs it)
+STEPS = [
+    ('book_appointment', 'patient'),
+    ('enter_vitals', 'nurse'),
+    ('open_consultation', 'doctor'),
+    ('save_consultation', 'doctor'),
+    ('pay_lab', 'cashier'),
+    ('submit_lab_result', 'lab_tech'),
+    ('dispense', 'pharmacist'),
+]
+
+# Steps whose queue rows the benchmark writes itself rather than an earlier
+# step's view, because no view in the journey creates them: pay_lab writes the
+# labs and accounts LabRequest rows that it and submit_lab_result act on, and
+# dispense writes the pharmacy queue row. Flagged in the report.
+SYNTHETIC = {'pay_lab', 'submit_lab_result', 'dispense'}
+
+
+class JourneyError(Exception):
+    pass
+
+
+class Journey:
+    """
+    One patient's visit, driven through the real URLs with one logged-in test
+    client per role. Each step is timed on its own; a step that does not
+    answer the way the page would for a browser (a 500, or a form shown again
+    instead of the redirect), or whose `check_<step>` finds that it changed
+    nothing, ends the journey.
+    """
+
+    def __init__(self, patient, doctor, n):
+        self.patient = patient
+        self.doctor = doctor
+        self.n = n
+
+    def run(self, clients, record):
+        for step, role in STEPS:
+            try:
+                method, path, data, expected = getattr(self, step)()
+            except Exception as e:
+                # Looking up or preparing the step's rows failed (e.g. the database is locked)
+                record(step, None, None, f"preparing: {type(e).__name__}: {e}")
+                raise JourneyError(step)
+            started = time.perf_counter()
+            try:
+                response = getattr(clients[role], method)(path, data)
+            except Exception as e:
+                record(step, path, None, f"{type(e).__name__}: {e}")
+                raise JourneyError(step)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != expected:
+                record(step, path, None, f"HTTP {response.status_code} (expected {expected})")
+                raise JourneyError(step)
+            check = getattr(self, f"check_{step}", None)
+            problem = check() if check else None
+            if problem:
+                record(step, path, None, problem)
+                raise JourneyError(step)
+            record(step, path, elapsed, None)
+
+    # --- steps: each returns (method, path, data, expected status) ---
+    def book_appointment(self):
+        return 'post', '/patients/book-appointment/', {
+            'doctor': self.doctor.pk, 'appointment_date': timezone.localdate().isoformat(),
+            'appointment_time': clock(8 + self.n % 9, 15 * (self.n % 4)).strftime('%H:%M'),
+            'reason': DIAGNOSES[self.n % len(DIAGNOSES)],
+        }, 302
+
+    def enter_vitals(self):
+        self.appointment = Appointment.objects.filter(patient=self.patient).latest('pk')
+        return 'post', f"/nurse/vitals/{self.appointment.pk}/", {
+            'temp': '37.4', 'bp': '128/84', 'pulse': '82', 'respiratory_rate': '18',
+        }, 302
+
+    def open_consultation(self):
+        return 'get', f"/doctors/appointment/{self.appointment.pk}/consult/", {}, 200
+
+    def save_consultation(self):
+        drugs = [DRUGS[(self.n + k) % len(DRUGS)][0] for k in range(2)]
+        data = {
+            'diagnosis': self.appointment.reason, 'clinical_notes': 'Febrile, otherwise well. Review in one week.',
+            'prescribed_medicines': 'on', 'ordered_tests': 'on',
+            'has_prescription': 'true', 'patient': self.patient.pk,
+            'items-TOTAL_FORMS': len(drugs), 'items-INITIAL_FORMS': 0, 'items-MIN_NUM_FORMS': 0, 'items-MAX_NUM_FORMS': 1000,
+        }
+        for k, drug in enumerate(drugs):
+            data.update({
+                f'items-{k}-medicine_name': drug, f'items-{k}-dosage': '1 tab', f'items-{k}-frequency': 'BD',
+                f'items-{k}-duration': '5 days', f'items-{k}-quantity': 10,
+            })
+        return 'post', f"/doctors/appointment/{self.appointment.pk}/consult/", data, 302
+
+    def pay_lab(self):
+        # The consultation writes doctors.LabRequest; the cashier's and the lab's
+        # queues read labs.LabRequest and accounts.LabRequest, which the front
+        # desk fills in from it. Do the same, outside the timings.
+        order = self.appointment.medical_record.lab_requests.get()
+        self.lab = LabRequest.objects.create(patient=self.patient, doctor=self.doctor, test_name=order.test_name)
+        self.lab_result = AccountsLabRequest.objects.create(
+            patient=self.patient, doctor=self.doctor, test_name=order.test_name, payment_status='paid',
+        )
+        return 'post', f"/cashier/mark-as-paid/{self.lab.pk}/", {}, 302
+
+    def submit_lab_result(self):
+        return 'post', f"/lab/submit/{self.lab_result.pk}/", {'findings': 'Within normal limits.'}, 302
+
+    def dispense(self):
+        # The pharmacy queue is accounts.MedicalRecord, which nothing in the
+        # journey writes; copy the consultation's prescription into it, as
+        # seed_hospital does, outside the timings.
+        prescription = Prescription.objects.get(medical_record__appointment=self.appointment)
+        self.queue_record = PharmacyQueueRecord.objects.create(
+            patient=self.patient.user,
+            prescription='\n'.join(f"{item.medicine_name} {item.dosage} {item.frequency} x {item.duration}" for item in prescription.items.all()),
+        )
+        return 'post', f"/pharmacy/dispense/{self.queue_record.pk}/", {}, 302
+
+    def check_dispense(self):
+        # A redirect alone proves nothing: a stub answers with one too
+        self.queue_record.refresh_from_db(fields=['pharmacy_status'])
+        if self.queue_record.pharmacy_status != 'completed':
+            return f"prescription still '{self.queue_record.pharmacy_status}' after dispensing"
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the OPD journey (book, vitals, consultation with prescription and lab order, lab payment, '
+        'lab result, dispensing) through the real views with the test client at a given concurrency, '
+        'and prints per-step p50/p95 latency and throughput as JSON. Writes to the configured database '
+        '(every run adds its visits): run it against a scratch copy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--journeys', type=int, default=50)
+        parser.add_argument(
+            '--concurrency', type=int,
+            help="Journeys in flight at once (one thread each). Defaults to 4, or 1 on SQLite, whose deferred "
+                 "transactions fail concurrent writers with 'database is locked'",
+        )
+        parser.add_argument('--patients', type=int, default=500, help='Patients to seed on the first run: background history, and the pool journeys draw from')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='opdbench', help='Prefix of the seeded rows (see seed_hospital); later runs reuse them')
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    def handle(self, *args, **options):
+        journeys, workers, prefix = options['journeys'], options['concurrency'], options['prefix']
+        if workers is None:
+            workers = 1 if connection.vendor == 'sqlite' else 4
+        if journeys < 1 or workers < 1:
+            raise CommandError('--journeys and --concurrency must be at least 1')
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(
+                "SQLite fails concurrent writers with 'database is locked' unless the database OPTIONS set "
+                "transaction_mode 'IMMEDIATE'; expect failed journeys otherwise."
+            )
+
+        # The same population every run, so reports from different releases compare
+        if not User.objects.filter(username__startswith=f"{prefix}-").exists():
+            self.stderr.write(f"Seeding {options['patients']} patients under '{prefix}'...")
+            HospitalSeeder(seed=options['seed'], prefix=prefix).run(options['patients'])
+            rebuild_derived()
+        available = Patient.objects.filter(user__username__startswith=f"{prefix}-p").count()
+        if available < journeys:
+            raise CommandError(f"Only {available} patients under '{prefix}'; every journey needs its own. Lower --journeys or use a new --prefix")
+        HospitalSetting.cached()
+        # Failed steps are in the report; do not also log a traceback for each
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                report = self._bench(journeys, workers, prefix)
+        finally:
+            request_logger.setLevel(level)
+
+        report.update({'prefix': prefix, 'patients': available})
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def _staff(self, prefix, role):
+        return User.objects.filter(username__startswith=f"{prefix}-{role}-").order_by('pk').first()
+
+    def _bench(self, journeys, workers, prefix):
+        staff = {role: self._staff(prefix, role) for role in ('nurse', 'doctor', 'cashier', 'lab_tech', 'pharmacist')}
+        patients = list(Patient.objects.filter(user__username__startswith=f"{prefix}-p").select_related('user').order_by('pk')[:journeys])
+        todo = queue.Queue()
+        for n, patient in enumerate(patients):
+            # Booked with the doctor whose session consults, or the consultation page is a 404
+            todo.put(Journey(patient, staff['doctor'], n))
+
+        samples = {step: [] for step, _ in STEPS}
+        views, errors = {}, []
+        finished = []
+        lock = threading.Lock()
+
+        def record(step, path, elapsed, error):
+            with lock:
+                if step not in views and path:
+                    view = resolve(path).func
+                    views[step] = f"{view.__module__}.{view.__name__}"
+                if error:
+                    errors.append({'step': step, 'path': path, 'error': error})
+                else:
+                    samples[step].append(elapsed)
+
+        def worker(clients):
+            try:
+                while True:
+                    try:
+                        journey = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        clients['patient'] = Client()
+                        clients['patient'].force_login(journey.patient.user)
+                        journey.run(clients, record)
+                    except JourneyError:
+                        continue
+                    except Exception as e:
+                        record(STEPS[0][0], None, None, f"signing in: {type(e).__name__}: {e}")
+                        continue
+                    with lock:
+                        finished.append(journey)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        # Staff sessions are set up before the clock starts; the patient's changes per journey
+        threads = []
+        for _ in range(workers):
+            clients = {}
+            for role, user in staff.items():
+                clients[role] = Client()
+                clients[role].force_login(user)
+            threads.append(threading.Thread(target=worker, args=(clients,)))
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+
+        steps = {}
+        for step, role in STEPS:
+            timings = sorted(samples[step])
+            steps[step] = {
+                'role': role,
+                'view': views.get(step),
+                # Its queue rows were written by the benchmark, not by an earlier step
+                'synthetic': step in SYNTHETIC,
+                'requests': len(timings),
+                'errors': sum(1 for error in errors if error['step'] == step),
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'max_ms': round(timings[-1], 2) if timings else 0.0,
+                'per_second': round(len(timings) / wall, 2),
+            }
+        return {
+            'vendor': connection.vendor,
+            'concurrency': workers,
+            'journeys': journeys,
+            'completed': len(finished),
+            'wall_s': round(wall, 3),
+            'journeys_per_second': round(len(finished) / wall, 2),
+            'steps': steps,
+            # The first few are enough to see what broke
+            'errors': errors[:20],
+        }
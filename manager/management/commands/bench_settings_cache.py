@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from manager.models import HospitalSetting
+
+
+class Command(BaseCommand):
+    help = 'Compares DB queries per request for HospitalSetting.load() vs HospitalSetting.cached()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+
+        # Each simulated request reads the settings twice, like the
+        # maintenance middleware plus the template context processor do.
+        for label, accessor in [('load()', HospitalSetting.load), ('cached()', HospitalSetting.cached)]:
+            HospitalSetting._cached = None
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                for _ in range(total):
+                    accessor()
+                    accessor()
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:<10} {len(ctx.captured_queries) / total:.3f} queries/request, "
+                f"{elapsed / total * 1000:.3f} ms/request"
+            )
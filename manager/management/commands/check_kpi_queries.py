@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from accounts import views as accounts_views
+from accounts.models import User
+from hospital import kpis
+from manager import views as manager_views
+from manager.models import HospitalSetting
+
+# Every KPI helper is one aggregate query, whatever the number of cards
+KPI_FUNCTIONS = [kpis.user_counts, kpis.bill_counts, kpis.payment_totals, kpis.appointment_counts, kpis.revenue_totals]
+
+# (view, role, most queries allowed), with the dashboard cache turned off
+DASHBOARDS = [
+    (accounts_views.manager_dashboard, 'manager', 3),
+    (accounts_views.cashier_dashboard, 'cashier', 4),
+    (accounts_views.lab_dashboard, 'lab_tech', 4),
+    (manager_views.manager_dashboard, 'manager', 4),
+]
+
+
+class Command(BaseCommand):
+    help = 'Fails if a KPI helper takes more than one query or a dashboard exceeds its query budget'
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic(), override_settings(DASHBOARD_CACHE_TTL=0):
+            for function in KPI_FUNCTIONS:
+                failures += self._check(f"kpis.{function.__name__}", 1, function)
+
+            HospitalSetting.cached()  # otherwise the first dashboard pays for creating the settings row
+            factory, users = RequestFactory(), {}
+            for view, role, budget in DASHBOARDS:
+                if role not in users:
+                    users[role] = User.objects.create(username=f"kpi-check-{role}", role=role)
+                request = factory.get('/')
+                request.user, request.session = users[role], {}
+                failures += self._check(f"{view.__module__}.{view.__name__}", budget, lambda: view(request))
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Over budget: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('KPI helpers and dashboards are within their query budgets.'))
+
+    def _check(self, label, budget, call):
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        used = len(queries)
+        self.stdout.write(f"[{'OK' if used <= budget else 'OVER'}] {label}: {used} queries (budget {budget})")
+        if used <= budget:
+            return []
+        for query in queries.captured_queries:
+            self.stdout.write(f"    {query['sql']}")
+        return [label]
@@ -0,0 +1,320 @@
+import logging
+import re
+import time
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from accounts.models import LabRequest as AccountsLabRequest, MedicalRecord as PharmacyQueueRecord, Profile, User
+from appointments.models import Appointment
+from cashier.models import Bill, Payment
+from doctors.models import Prescription
+from hospital.seeding import HospitalSeeder, rebuild_derived
+from labs.models import LabRequest
+from manager.models import HospitalSetting, Staff
+from patients.models import Patient
+from pharmacy.models import Prescription as PharmacyPrescription
+
+# Each page is rendered as every role a user can hold (most bounce the wrong ones)
+ROLES = [role for role, _ in User.ROLE_CHOICES]
+
+# Data sizes, in patients (each with about three visits' history; see hospital.seeding)
+SCALES = [100, 1000]
+
+# route -> (most queries any role may use, URL kwargs). Kwarg values name an
+# object from _fixtures(). A route missing here fails the check until it gets a
+# budget; None is for pages that never render yet (see KNOWN_ERRORS).
+ROUTES = {
+    '': (2, {}),
+    'accounts/login/': (2, {}),
+    'login/': (2, {}),
+    'register/': (2, {}),
+    'profile/': (4, {}),
+    'dashboard/': (2, {}),
+    'about/': (2, {}),
+    'contact/': (2, {}),
+    'services/': (2, {}),
+    'privacy-policy/': (2, {}),
+    'settings/': (2, {}),
+    'doctor/dashboard/': (2, {}),
+    'doctor/prescription/new/': (2, {}),
+    'doctor/request-test/': (2, {}),
+    'doctor/patient-history/<int:patient_id>/': (3, {'patient_id': 'patient_user'}),
+    'pharmacy/dashboard/': (5, {}),
+    'pharmacy/dispense/<int:record_id>/': (2, {'record_id': 'queue_record'}),
+    'pharmacy/add-stock/': (0, {}),
+    'cashier/dashboard/': (6, {}),
+    'cashier/bill/new/': (2, {}),
+    'cashier/bill/<int:bill_id>/': (6, {'bill_id': 'bill'}),
+    'cashier/pay/<int:bill_id>/': (2, {'bill_id': 'bill'}),
+    'lab/dashboard/': (5, {}),
+    'lab/upload/<int:test_id>/': (2, {'test_id': 'accounts_lab'}),
+    'lab/submit/<int:test_id>/': (0, {'test_id': 'accounts_lab'}),
+    'lab/print/<int:test_id>/': (3, {'test_id': 'accounts_lab'}),
+    'lab/result/<int:lab_id>/pdf/': (3, {'lab_id': 'accounts_lab'}),
+    'patient/dashboard/': (2, {}),
+    'patient/<int:patient_id>/order-lab/': (None, {'patient_id': 'patient'}),
+    'my-billing/': (None, {}),
+    'manager/dashboard/': (4, {}),
+    'manager/users/': (3, {}),
+    'manager/verify/<int:user_id>/': (5, {'user_id': 'patient_user'}),
+    'manager/user-status/<int:user_id>/<str:action>/': (9, {'user_id': 'patient_user', 'action': 'patient_role'}),
+    'manager/export-pdf/': (3, {}),
+    'manager/wards/': (3, {}),
+    'manager/settings/': (3, {}),
+    'doctors/dashboard/': (5, {}),
+    'doctors/patients/': (3, {}),
+    'doctors/patient/<int:patient_id>/': (4, {'patient_id': 'patient'}),
+    'doctors/appointment/<int:appointment_id>/consult/': (6, {'appointment_id': 'appointment'}),
+    'doctors/appointments/': (2, {}),
+    'doctors/appointment/<int:appointment_id>/update/': (3, {'appointment_id': 'appointment'}),
+    'doctors/prescription/<int:prescription_id>/pdf/': (8, {'prescription_id': 'prescription'}),
+    'patients/dashboard/': (2, {}),
+    'patients/book-appointment/': (2, {}),
+    'patients/appointments/': (2, {}),
+    'patients/medical-records/': (2, {}),
+    'patients/lookup/': (2, {}),
+    'cashier/create-bill/': (2, {}),
+    'cashier/bill/<int:bill_id>/process-payment/': (5, {'bill_id': 'bill'}),
+    'cashier/mark-as-paid/<int:lab_id>/': (3, {'lab_id': 'lab'}),
+    'cashier/prescription/<int:prescription_id>/pay/': (3, {'prescription_id': 'pharmacy_prescription'}),
+    'cashier/bills/': (3, {}),
+    'cashier/payments/': (3, {}),
+    'cashier/report/daily/': (4, {}),
+    'cashier/report/daily/receipts/': (3, {}),
+    'cashier/payment/<int:payment_id>/receipt/': (3, {'payment_id': 'payment'}),
+    'cashier/receipt/lab/<int:lab_id>/': (5, {'lab_id': 'lab'}),
+    'cashier/analytics/': (4, {}),
+    'manager/doctors/': (3, {}),
+    'manager/patients/': (3, {}),
+    'manager/reports/': (6, {}),
+    'manager/reports/export/payments/': (3, {}),
+    'manager/reports/export/bills/': (3, {}),
+    'manager/staff/dashboard/': (4, {}),
+    'manager/settings/general/': (3, {}),
+    'manager/settings/notifications/': (3, {}),
+    'manager/settings/security/': (2, {}),
+    'manager/settings/danger/': (0, {}),
+    'manager/settings/logs/': (3, {}),
+    'manager/settings/timings/': (2, {}),
+    'manager/inquiries/': (4, {}),
+    'nurse/dashboard/': (4, {}),
+    'nurse/vitals/<int:appointment_id>/': (None, {'appointment_id': 'appointment'}),
+}
+
+# Routes that cannot be rendered with a GET in a rolled-back transaction
+SKIP = {
+    'logout/': 'ends the session',
+    'accounts/password/change/': "allauth's view",
+    'cashier/verify-paystack/': 'calls Paystack',
+    'cashier/paystack/webhook/': 'signed POST from Paystack',
+    'pdf-jobs/<str:job_id>/': 'needs a queued PDF job',
+}
+
+# Pages that already fail to render for reasons unrelated to queries. Their
+# errors are reported but do not fail the check; take a route off this list
+# once it is fixed so its budget is enforced again.
+KNOWN_ERRORS = {
+    'doctor/dashboard/': 'template doctor/dashboard.html is missing',
+    'doctor/patient-history/<int:patient_id>/': 'template doctor/patient_history.html is missing',
+    'patient/dashboard/': 'template patient/dashboard.html is missing',
+    'patient/<int:patient_id>/order-lab/': 'create_lab_order returns nothing on GET',
+    'my-billing/': 'template patient/billing_history.html is missing',
+    'doctors/appointments/': 'template doctors/appointments_list.html is missing',
+    'nurse/vitals/<int:appointment_id>/': 'template extends a missing base.html',
+}
+
+# Third-party URL trees (allauth, admin) are not ours to budget
+SKIP_MODULES = ('allauth', 'django.contrib')
+
+
+def _routes():
+    """
+    Every named URL pattern of ours as its full route string. A pattern that
+    only differs from an earlier one in its kwarg names can never match, so it
+    is left out.
+    """
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                module = getattr(pattern.urlconf_name, '__name__', str(pattern.urlconf_name))
+                if module.startswith(SKIP_MODULES) or pattern.app_name == 'admin':
+                    continue
+                yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                yield prefix + str(pattern.pattern)
+    seen = set()
+    for route in walk(get_resolver().url_patterns):
+        shape = re.sub(r'<(\w+:)?\w+>', r'<\1>', route)
+        if shape not in seen:
+            seen.add(shape)
+            yield route
+
+
+def _path(route, kwargs):
+    return '/' + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: str(kwargs[match.group(1)]), route)
+
+
+def _statements(queries):
+    """The captured SQL, repeats (same statement with different literals) collapsed and counted."""
+    counts = Counter(re.sub(r"\b\d+\b|'[^']*'", '?', query['sql']) for query in queries)
+    return [f"{count:>4} x {sql}" for sql, count in counts.items()]
+
+
+class Command(BaseCommand):
+    help = 'Renders every named URL as every role at two data sizes; fails if a page exceeds its query budget or its query count grows with the data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs=2, default=SCALES, metavar=('SMALL', 'LARGE'))
+        parser.add_argument('--route', action='append', help='Only check this route (repeatable), e.g. pharmacy/dashboard/')
+        parser.add_argument('--seed', type=int, default=23)
+
+    def handle(self, *args, **options):
+        small, large = options['scales']
+        if not 0 < small < large:
+            raise CommandError('--scales must be two increasing sizes, e.g. 100 1000')
+
+        routes = [route for route in _routes() if route not in SKIP]
+        if options['route']:
+            routes = [route for route in routes if route in options['route']]
+        failures = [f"{route} (no budget)" for route in routes if route not in ROUTES]
+        routes = [route for route in routes if route in ROUTES]
+
+        # Pages on the KNOWN_ERRORS list would log a traceback for every role
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            self._run(routes, small, large, options['seed'], failures)
+        finally:
+            request_logger.setLevel(level)
+
+    def _run(self, routes, small, large, seed, failures):
+        with transaction.atomic(), override_settings(
+            DASHBOARD_CACHE_TTL=0,
+            ALLOWED_HOSTS=['testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            counts, timings = {}, {}
+            for n, scale in enumerate((small, large), 1):
+                self._seed(n, scale - (small if scale == large else 0), seed)
+                if n == 1:
+                    users = self._role_users()
+                fixtures = self._fixtures(users)
+                self.stdout.write(f"--- {scale} patients: {User.objects.count()} users, {Appointment.objects.count()} appointments, {Payment.objects.count()} payments")
+                for route in routes:
+                    budget, kwargs = ROUTES[route]
+                    values = {name: fixtures[key] for name, key in kwargs.items()}
+                    if None in values.values():
+                        continue
+                    path = _path(route, values)
+                    for role in ROLES:
+                        used, queries, error, elapsed = self._render(users[role], path)
+                        label = f"{route} as {role}"
+                        if error:
+                            if route in KNOWN_ERRORS:
+                                self.stdout.write(f"[KNOWN] {label}: {error}")
+                            else:
+                                failures.append(f"{label} ({error})")
+                                self.stdout.write(f"[ERROR] {label}: {error}")
+                            continue
+                        if budget is None:
+                            failures.append(f"{label} (renders now; give it a budget, it used {used})")
+                            continue
+                        before = counts.get((route, role))
+                        counts[(route, role)] = used
+                        if scale == large:
+                            timings[route] = max(timings.get(route, 0), elapsed)
+                        grew = scale == large and before is not None and used > before
+                        if used <= budget and not grew:
+                            continue
+                        reason = f"{used} queries at {scale} patients (budget {budget})"
+                        if grew:
+                            reason += f", up from {before} at {small} patients"
+                        failures.append(f"{label} ({reason})")
+                        self.stdout.write(f"[OVER] {label}: {reason}")
+                        for line in _statements(queries):
+                            self.stdout.write(f"    {line}")
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'route':<55} {'queries':>7} {'budget':>6} {'slowest at ' + str(large):>16}")
+        for route in routes:
+            used = [counts[key] for key in counts if key[0] == route]
+            if used:
+                self.stdout.write(f"{route:<55} {max(used):>7} {ROUTES[route][0]:>6} {timings.get(route, 0):>13.1f} ms")
+        if failures:
+            raise CommandError("Over budget:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(routes)} routes x {len(ROLES)} roles are within their query budgets at {small} and {large} patients."))
+
+    def _render(self, user, path):
+        client = Client()
+        client.force_login(user)
+        # The capture log is a bounded deque; once full, CaptureQueriesContext counts nothing
+        reset_queries()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            try:
+                response = client.get(path)
+                if getattr(response, 'streaming', False):
+                    b''.join(response.streaming_content)
+            except Exception as e:
+                return None, queries, f"{type(e).__name__}: {e}", None
+        return len(queries), queries.captured_queries, None, (time.perf_counter() - started) * 1000
+
+    # --- data ---
+    def _seed(self, scale, patients, seed):
+        """Adds `patients` patients and their history (hospital.seeding), then refills the derived tables."""
+        HospitalSeeder(seed=seed + scale, prefix=f"qb{scale}").run(patients)
+        rebuild_derived()
+
+    def _role_users(self):
+        """The first seeded user of each role, plus a staff user, the one role the generator does not staff, and a patient."""
+        users = {
+            role: User.objects.filter(role=role, username__startswith='qb').order_by('pk').first()
+            for role in ROLES if role not in ('staff', 'patient')
+        }
+        users['staff'] = User.objects.create(
+            username='budget-staff', role='staff', password='!', first_name='Budget', last_name='Staff',
+        )
+        # Registration gives every user a profile
+        Profile.objects.create(user=users['staff'], is_verified=True)
+        Staff.objects.create(
+            user=users['staff'], staff_id='BUDGET-STF', department='reception', position='Clerk',
+            salary=Decimal('2500.00'), joining_date=date(2024, 1, 1),
+        )
+        # A patient of the role doctor with a finished visit, a result and a receipt, so every page has something to show
+        patients = Patient.objects.filter(all_appointments__doctor=users['doctor'])
+        patient = (
+            patients.filter(lab_requests__is_completed=True, labrequest__is_completed=True, payments__status='success', prescriptions__isnull=False).first()
+            or patients.first()
+        )
+        users['patient'] = patient.user
+        HospitalSetting.cached()  # otherwise the first page rendered pays for reading it
+        return users
+
+    def _fixtures(self, users):
+        """One object per kwarg the ROUTES table can ask for, owned by the role users where that matters."""
+        patient = Patient.objects.get(user=users['patient'])
+
+        def latest(queryset, **related):
+            # The role users' own row where there is one, any row otherwise
+            row = queryset.filter(**related).order_by('-pk').first() or queryset.order_by('-pk').first()
+            return row.pk if row else None
+
+        return {
+            'patient': patient.pk,
+            'patient_user': users['patient'].pk,
+            'patient_role': 'patient',
+            'appointment': latest(Appointment.objects.all(), doctor=users['doctor'], patient=patient),
+            'prescription': latest(Prescription.objects.all(), patient=patient),
+            'pharmacy_prescription': latest(PharmacyPrescription.objects.all()),
+            'queue_record': latest(PharmacyQueueRecord.objects.all()),
+            'bill': latest(Bill.objects.all(), patient=patient),
+            'payment': latest(Payment.objects.filter(status='success'), patient=patient),
+            'lab': latest(LabRequest.objects.all(), patient=patient),
+            'accounts_lab': latest(AccountsLabRequest.objects.filter(is_completed=True), patient=patient),
+        }
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from accounts.models import ActivityLog, SearchDocument
+from appointments.models import Appointment
+from cashier.models import Bill, Payment
+from doctors.models import Prescription
+from labs.models import LabRequest
+from pharmacy.models import Prescription as PharmacyPrescription
+from hospital.utils import day_range, month_range
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot dashboard filters and fails if their index is not used'
+
+    def handle(self, *args, **options):
+        today_start, today_end = day_range()
+        month_start, month_end = month_range()
+
+        checks = [
+            ('payment_status_date_idx', Payment.objects.filter(
+                status='success', transaction_date__gte=today_start, transaction_date__lt=today_end)),
+            ('appt_doctor_status_time_idx', Appointment.objects.filter(
+                doctor_id=1, status='ready').order_by('appointment_time')),
+            ('labreq_status_created_idx', LabRequest.objects.filter(
+                status='pending', created_at__gte=month_start, created_at__lt=month_end)),
+            ('rx_status_created_idx', Prescription.objects.filter(
+                status='pending').order_by('-created_at')),
+            ('pharm_rx_status_created_idx', PharmacyPrescription.objects.filter(
+                status='pending').order_by('-created_at')),
+            ('bill_status_created_idx', Bill.objects.filter(status='pending')),
+            ('activitylog_timestamp_idx', ActivityLog.objects.order_by('-timestamp')[:50]),
+            ('activitylog_type_time_idx', ActivityLog.objects.filter(action_type='login').order_by('-timestamp')[:50]),
+            ('activitylog_sev_time_idx', ActivityLog.objects.filter(severity='danger').order_by('-timestamp')[:50]),
+        ]
+        if connection.vendor == 'postgresql':
+            # SQLite searches through its FTS5 table instead (see accounts.search)
+            checks.append(('accounts_searchdocument_trgm', SearchDocument.objects.filter(document__icontains='mensah')))
+
+        missing = []
+        for index_name, queryset in checks:
+            plan = queryset.explain()
+            used = index_name in plan
+            self.stdout.write(f"[{'OK' if used else 'MISS'}] {index_name}\n    {plan.replace(chr(10), chr(10) + '    ')}")
+            if not used:
+                missing.append(index_name)
+
+        if missing:
+            raise CommandError(f"Indexes not used by the planner: {', '.join(missing)}")
+        self.stdout.write(self.style.SUCCESS('All hot filters use their indexes.'))
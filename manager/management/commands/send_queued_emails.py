@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from manager.outbox import deliver_pending, purge_orphaned_attachments
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued EmailLog messages (the outbox) with batching, retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting when the outbox is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                continue  # More may be waiting; drain before sleeping
+
+            # Idle: clear out attachments left behind by rolled-back queue() calls
+            purge_orphaned_attachments()
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -1,14 +1,18 @@
 # manager/middleware.py
+import time
+from contextlib import ExitStack
+from django.db import connections
 from django.shortcuts import render
 from django.urls import resolve
 from .models import HospitalSetting
+from . import timing
 
 class MaintenanceModeMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        settings = HospitalSetting.load()
+        settings = HospitalSetting.cached()
         
         # 1. Check if maintenance mode is ON
         if settings.maintenance_mode:
@@ -20,4 +24,42 @@ class MaintenanceModeMiddleware:
                 if not any(path.startswith(p) for p in ['/accounts/login/', '/admin/', '/static/', '/media/']):
                     return render(request, 'shared/maintenance.html', status=503)
 
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
+
+class RequestTimingMiddleware:
+    """
+    Times every request: wall clock, DB queries and DB time, template render
+    time. Results are added as a Server-Timing header (visible in the browser
+    dev tools) and recorded per URL name for the manager's timings page.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        timing.install_template_timer()
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        query_timer = timing.QueryTimer()
+        template_token = timing.start_template_timer()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(query_timer))
+                response = self.get_response(request)
+        finally:
+            template_ms = timing.stop_template_timer(template_token)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        response['Server-Timing'] = (
+            f'app;dur={wall_ms:.1f}, '
+            f'db;dur={query_timer.ms:.1f};desc="{query_timer.count} queries", '
+            f'tpl;dur={template_ms:.1f}'
+        )
+        match = request.resolver_match
+        timing.record(
+            match.view_name if match else 'unresolved',
+            wall_ms=wall_ms,
+            db_ms=query_timer.ms,
+            template_ms=template_ms,
+            queries=query_timer.count,
+        )
+        return response
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:10
+
+import django.utils.timezone
+import manager.models
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_sent_at_to_created_at(apps, schema_editor):
+    # Rows logged before the outbox existed were created at send time
+    EmailLog = apps.get_model('manager', 'EmailLog')
+    EmailLog.objects.update(created_at=F('sent_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emaillog',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='emaillog',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_sent_at_to_created_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='emaillog',
+            name='from_email',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='html_body',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=manager.models.outbox_storage, upload_to=manager.models.outbox_path),
+        ),
+        migrations.AlterField(
+            model_name='emaillog',
+            name='status',
+            field=models.CharField(default='Pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='emaillog',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='emaillog_outbox_idx'),
+        ),
+    ]
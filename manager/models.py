@@ -1,4 +1,10 @@
-from django.db import models
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from django.utils import timezone
 from accounts.models import User
 
 class Staff(models.Model):
@@ -47,30 +53,117 @@ class HospitalSetting(models.Model):
     night_mode = models.BooleanField(default=False)
     email_notifications_enabled = models.BooleanField(default=True) # New Field
 
+    # Shared cache key holding the current settings version. Every worker keeps
+    # its own copy of the singleton and only re-reads the row when this changes.
+    VERSION_CACHE_KEY = 'hospital_settings:version'
+    _cached = None  # (version, instance) for this process
+
     def save(self, *args, **kwargs):
         # This ensures only one instance exists
         self.pk = 1
         super(HospitalSetting, self).save(*args, **kwargs)
+        # Bump the version once the row is committed so other workers reload it
+        transaction.on_commit(self.bump_version)
 
     @classmethod
     def load(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def bump_version(cls):
+        cache.set(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+    @classmethod
+    def current_version(cls):
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            # First worker to get here seeds the stamp; the rest pick up its value
+            cache.add(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(cls.VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def cached(cls):
+        """
+        Read-only settings for the current process. Costs a cache lookup per
+        call instead of a DB round trip; the row is re-read only after a save.
+        Use load() when you intend to modify and save the settings.
+        """
+        version = cls.current_version()
+        cached = cls._cached
+        if cached is None or cached[0] != version:
+            cached = (version, cls.load())
+            cls._cached = cached
+        return cached[1]
+
     def __str__(self):
         return "Global Hospital Settings"
 
 
 
+def outbox_storage():
+    return FileSystemStorage(location=settings.EMAIL_OUTBOX_DIR)
+
+
+def outbox_path(log, filename):
+    # A random directory per message, so names are neither guessable nor shared
+    return f"{uuid.uuid4().hex}/{filename}"
+
+
 class EmailLog(models.Model):
+    """
+    Outbound mail outbox and delivery record. Views queue rows inside their own
+    transaction; the send_queued_emails worker delivers them with retries.
+    """
+    STATUS_PENDING = 'Pending'
+    STATUS_SENDING = 'Sending'
+    STATUS_SUCCESS = 'Success'
+    STATUS_FAILED = 'Failed'
+
     recipient = models.EmailField()
     subject = models.CharField(max_length=255)
-    sent_at = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=20, default='Success')
+    from_email = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(null=True, blank=True)
+    attachment = models.FileField(upload_to=outbox_path, storage=outbox_storage, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
     error_message = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # The delivery worker polls: status='Pending' AND next_attempt_at <= now
+            models.Index(fields=['status', 'next_attempt_at'], name='emaillog_outbox_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.recipient} - {self.sent_at}"
+        return f"{self.recipient} - {self.sent_at or self.created_at}"
+
+    @classmethod
+    def queue(cls, recipient, subject, body, html_body=None, attachment=None, from_email=''):
+        """
+        Add a message to the outbox. Call it inside the same transaction as the
+        change that triggers it so the mail is sent only if that change commits.
+        attachment is an optional (filename, content) pair. It is written to
+        EMAIL_OUTBOX_DIR straight away; if the transaction rolls back, the file
+        is left for outbox.purge_orphaned_attachments() to remove.
+        """
+        log = cls(
+            recipient=recipient,
+            subject=subject[:255],
+            body=body,
+            html_body=html_body,
+            from_email=from_email,
+        )
+        if attachment:
+            filename, content = attachment
+            log.attachment.save(filename, ContentFile(content), save=False)
+        log.save()
+        return log
 
 
 
@@ -0,0 +1,150 @@
+# manager/outbox.py
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import EmailLog
+
+# A claimed batch that is not finished within this window (worker crashed
+# mid-send) becomes visible to other workers again.
+CLAIM_LEASE = timedelta(minutes=5)
+
+# An attachment file no row points at is only removed once it is this old, so
+# one written by a queue() whose transaction is still open is left alone.
+ORPHAN_AGE = timedelta(hours=1)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4, 8 ... minutes, capped at one hour."""
+    return timedelta(minutes=min(2 ** max(attempts - 1, 0), 60))
+
+
+def claim_batch(batch_size):
+    """
+    Marks up to batch_size due messages as 'Sending' and returns them. Rows are
+    locked with SKIP LOCKED where the database supports it, so several workers
+    can drain the outbox without sending the same mail twice.
+    """
+    now = timezone.now()
+    due = (
+        EmailLog.objects.filter(
+            status__in=[EmailLog.STATUS_PENDING, EmailLog.STATUS_SENDING],
+            next_attempt_at__lte=now,
+        )
+        .order_by('next_attempt_at', 'id')
+    )
+    with transaction.atomic():
+        batch = list(due.select_for_update(skip_locked=True)[:batch_size])
+        EmailLog.objects.filter(pk__in=[log.pk for log in batch]).update(
+            status=EmailLog.STATUS_SENDING,
+            next_attempt_at=now + CLAIM_LEASE,
+        )
+    for log in batch:
+        log.status = EmailLog.STATUS_SENDING
+    return batch
+
+
+def build_message(log, connection):
+    message = EmailMultiAlternatives(
+        log.subject,
+        log.body,
+        log.from_email or settings.DEFAULT_FROM_EMAIL,
+        [log.recipient],
+        connection=connection,
+    )
+    if log.html_body:
+        message.attach_alternative(log.html_body, 'text/html')
+    if log.attachment:
+        with log.attachment.open('rb') as f:
+            message.attach(log.attachment.name.rsplit('/', 1)[-1], f.read())
+    return message
+
+
+def finish(log, status):
+    """Marks a message sent or failed for good; its attachment is no longer needed."""
+    log.status = status
+    if log.attachment:
+        directory = os.path.dirname(log.attachment.path)
+        log.attachment.delete(save=False)
+        remove_if_empty(directory)
+
+
+def remove_if_empty(directory):
+    try:
+        os.rmdir(directory)
+    except OSError:
+        pass  # Not empty, or already gone
+
+
+def purge_orphaned_attachments(older_than=ORPHAN_AGE):
+    """
+    Deletes attachment files that no outbox row points at: those written by
+    EmailLog.queue() in a transaction that then rolled back. Returns the count.
+    """
+    storage = EmailLog._meta.get_field('attachment').storage
+    if not os.path.isdir(storage.location):
+        return 0
+    referenced = set(EmailLog.objects.exclude(attachment='').exclude(attachment=None).values_list('attachment', flat=True))
+    cutoff = timezone.now() - older_than
+    removed = 0
+    for directory in storage.listdir('')[0]:
+        for name in storage.listdir(directory)[1]:
+            path = f"{directory}/{name}"
+            if path not in referenced and storage.get_modified_time(path) < cutoff:
+                storage.delete(path)
+                removed += 1
+        if os.path.getmtime(storage.path(directory)) < cutoff.timestamp():
+            remove_if_empty(storage.path(directory))
+    return removed
+
+
+def deliver_pending(batch_size=50, max_attempts=5):
+    """
+    Sends one batch from the outbox over a single SMTP connection.
+    Returns (sent, failed) counts for the batch.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+        for log in batch:
+            log.attempts += 1
+            try:
+                build_message(log, connection).send()
+            except Exception as e:
+                log.error_message = str(e)
+                if log.attempts >= max_attempts:
+                    finish(log, EmailLog.STATUS_FAILED)
+                else:
+                    log.status = EmailLog.STATUS_PENDING
+                    log.next_attempt_at = timezone.now() + retry_delay(log.attempts)
+                failed += 1
+            else:
+                finish(log, EmailLog.STATUS_SUCCESS)
+                log.sent_at = timezone.now()
+                log.error_message = None
+                sent += 1
+            log.save(update_fields=['status', 'attempts', 'next_attempt_at', 'sent_at', 'error_message', 'attachment'])
+    except Exception as e:
+        # Could not reach the mail server at all: put the rest back with backoff
+        for log in batch:
+            if log.status == EmailLog.STATUS_SENDING:
+                log.attempts += 1
+                if log.attempts >= max_attempts:
+                    finish(log, EmailLog.STATUS_FAILED)
+                else:
+                    log.status = EmailLog.STATUS_PENDING
+                    log.next_attempt_at = timezone.now() + retry_delay(log.attempts)
+                log.error_message = str(e)
+                log.save(update_fields=['status', 'attempts', 'next_attempt_at', 'error_message', 'attachment'])
+                failed += 1
+    finally:
+        connection.close()
+
+    return sent, failed
@@ -0,0 +1,140 @@
+# manager/timing.py
+import threading
+import time
+from array import array
+from contextvars import ContextVar
+from django.template.backends.django import Template as DjangoTemplate
+
+# Samples kept per view and per worker; older samples are overwritten
+SAMPLES_PER_VIEW = 1024
+
+# Per-request accumulator for template render time (None outside a request)
+_template_ms = ContextVar('template_ms', default=None)
+
+
+class RingBuffer:
+    """Fixed-size float buffer: the last `size` samples of one metric."""
+
+    def __init__(self, size=SAMPLES_PER_VIEW):
+        self.values = array('f', bytes(4 * size))
+        self.size = size
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.count % self.size] = value
+        self.count += 1
+
+    def samples(self):
+        return self.values[:min(self.count, self.size)].tolist()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ViewTimings:
+    """Rolling wall/db/template timings and query counts for one URL name."""
+    METRICS = ('wall_ms', 'db_ms', 'template_ms', 'queries')
+
+    def __init__(self):
+        self.buffers = {metric: RingBuffer() for metric in self.METRICS}
+
+    def add(self, **sample):
+        for metric, buffer in self.buffers.items():
+            buffer.add(sample[metric])
+
+    def summary(self):
+        wall = sorted(self.buffers['wall_ms'].samples())
+        db = sorted(self.buffers['db_ms'].samples())
+        tpl = sorted(self.buffers['template_ms'].samples())
+        queries = self.buffers['queries'].samples()
+        return {
+            'requests': self.buffers['wall_ms'].count,
+            'p50': percentile(wall, 50),
+            'p95': percentile(wall, 95),
+            'p99': percentile(wall, 99),
+            'db_p95': percentile(db, 95),
+            'template_p95': percentile(tpl, 95),
+            'avg_queries': sum(queries) / len(queries) if queries else 0,
+            'max_queries': max(queries) if queries else 0,
+        }
+
+
+_lock = threading.Lock()
+_views = {}
+
+
+def record(view_name, **sample):
+    with _lock:
+        timings = _views.get(view_name)
+        if timings is None:
+            timings = _views[view_name] = ViewTimings()
+        timings.add(**sample)
+
+
+def snapshot():
+    """Per-view summaries for this worker, slowest p95 first."""
+    with _lock:
+        rows = [{'view': name, **timings.summary()} for name, timings in _views.items()]
+    return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+
+def reset():
+    with _lock:
+        _views.clear()
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.ms += (time.perf_counter() - start) * 1000
+
+
+def start_template_timer():
+    return _template_ms.set(0.0)
+
+
+def stop_template_timer(token):
+    elapsed = _template_ms.get() or 0.0
+    _template_ms.reset(token)
+    return elapsed
+
+
+_installed = False
+
+
+def install_template_timer():
+    """
+    Wraps the Django template backend's render() once per process so the
+    timing middleware can attribute render time. Nested {% include %}s render
+    inside the outer call and are not double counted.
+    """
+    global _installed
+    if _installed:
+        return
+    original_render = DjangoTemplate.render
+
+    def timed_render(self, context=None, request=None):
+        if _template_ms.get() is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            _template_ms.set(_template_ms.get() + (time.perf_counter() - start) * 1000)
+
+    DjangoTemplate.render = timed_render
+    _installed = True
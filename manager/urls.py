@@ -8,6 +8,8 @@ urlpatterns = [
     path('doctors/', views.manage_doctors, name='manage_doctors'),
     path('patients/', views.manage_patients, name='manage_patients'),
     path('reports/', views.financial_reports, name='financial_reports'),
+    path('reports/export/payments/', views.export_payments, name='export_payments'),
+    path('reports/export/bills/', views.export_bills, name='export_bills'),
     path('staff/dashboard/', views.staff_dashboard, name='staff_dashboard'),
 
     # Settings Group (All pointing to manager/views.py)
@@ -16,4 +18,5 @@ urlpatterns = [
     path('settings/security/', views.security_settings, name='settings_security'),
     path('settings/danger/', views.danger_zone, name='settings_danger'),
     path('settings/logs/', views.email_log_list, name='email_logs'),
+    path('settings/timings/', views.request_timings, name='request_timings'),
 ]
\ No newline at end of file
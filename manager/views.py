@@ -1,15 +1,48 @@
+import csv
+import itertools
+import json
+import os
 from django.shortcuts import render, redirect
+from django.http import StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Sum, Count, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from datetime import date, timedelta
 from accounts.models import User
 from patients.models import Patient
 from appointments.models import Appointment  # The new, correct path
 from doctors.models import Doctor
-from cashier.models import Bill, Payment
+from cashier.models import Bill, Payment, DailyRevenueSummary
 from .models import Staff
 from .models import HospitalSetting, EmailLog
+from . import timing
+from hospital.utils import date_range
+from hospital.pagination import KeysetPaginator
+from hospital.dashboard_cache import dashboard_context
+from hospital import kpis
+
+def _overview_stats():
+    users = kpis.user_counts()
+    appointments = kpis.appointment_counts()
+    revenue = kpis.revenue_totals()
+    return {
+        # User statistics
+        'total_users': users['total'],
+        'total_doctors': users['doctors'],
+        'total_patients': users['patient_profiles'],
+        'total_staff': users['staff'],
+        # Appointment statistics
+        'total_appointments': appointments['total'],
+        'today_appointments': appointments['today'],
+        'pending_appointments': appointments['pending'],
+        # Financial statistics
+        'total_revenue': revenue['total'],
+        'month_revenue': revenue['month'],
+        'pending_bills': kpis.bill_counts()['pending_amount'],
+    }
 
 @login_required
 def manager_dashboard(request):
@@ -18,48 +51,15 @@ def manager_dashboard(request):
         messages.error(request, 'Access denied. This area is for managers only.')
         return redirect('home')  # avoid redirect loop
     
-    # User statistics
-    total_users = User.objects.count()
-    total_doctors = User.objects.filter(role__iexact='doctor').count()
-    total_patients = Patient.objects.count()
-    total_staff = User.objects.filter(role__in=['cashier', 'staff']).count()
-    
-    # Appointment statistics
-    today = date.today()
-    total_appointments = Appointment.objects.count()
-    today_appointments = Appointment.objects.filter(appointment_date=today).count()
-    pending_appointments = Appointment.objects.filter(status='scheduled').count()
-    
-    # Financial statistics
-    this_month_start = today.replace(day=1)
-    total_revenue = Payment.objects.filter(status='success').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    month_revenue = Payment.objects.filter(
-        transaction_date__date__gte=this_month_start,
-        status='success'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    pending_bills = Bill.objects.filter(status='pending').aggregate(
-        total=Sum('total_amount')
-    )['total'] or 0
+    # KPI cards (cached; see hospital/dashboard_cache.py)
+    stats = dashboard_context('manager_overview', request.user.role, _overview_stats)
     
     # Recent activities
-    recent_appointments = Appointment.objects.all()[:5]
-    recent_payments = Payment.objects.filter(status='success')[:5]
+    recent_appointments = Appointment.objects.select_related('patient__user', 'doctor')[:5]
+    recent_payments = Payment.objects.filter(status='success').select_related('patient__user')[:5]
     
     context = {
-        'total_users': total_users,
-        'total_doctors': total_doctors,
-        'total_patients': total_patients,
-        'total_staff': total_staff,
-        'total_appointments': total_appointments,
-        'today_appointments': today_appointments,
-        'pending_appointments': pending_appointments,
-        'total_revenue': total_revenue,
-        'month_revenue': month_revenue,
-        'pending_bills': pending_bills,
+        **stats,
         'recent_appointments': recent_appointments,
         'recent_payments': recent_payments,
     }
@@ -72,8 +72,8 @@ def manage_users(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
     
-    users = User.objects.all().order_by('-created_at')
-    return render(request, 'manager/manage_users.html', {'users': users})
+    users = KeysetPaginator(User.objects.all(), '-created_at').page_from_request(request)
+    return render(request, 'manager/manage_users.html', {'users': users, 'page': users})
 
 @login_required
 def manage_doctors(request):
@@ -82,7 +82,7 @@ def manage_doctors(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
     
-    doctors = Doctor.objects.all()
+    doctors = Doctor.objects.select_related('user')
     return render(request, 'manager/manage_doctors.html', {'doctors': doctors})
 
 @login_required
@@ -92,8 +92,24 @@ def manage_patients(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
     
-    patients = Patient.objects.all()
-    return render(request, 'manager/manage_patients.html', {'patients': patients})
+    patients = KeysetPaginator(
+        Patient.objects.select_related('user'), '-id'
+    ).page_from_request(request)
+    return render(request, 'manager/manage_patients.html', {'patients': patients, 'page': patients})
+
+def _report_dates(request):
+    """start_date/end_date from the query string, defaulting to this month"""
+    # The local day, as DailyRevenueSummary buckets it
+    today = timezone.localdate()
+    try:
+        start_date = date.fromisoformat(request.GET.get('start_date', ''))
+    except ValueError:
+        start_date = today.replace(day=1)
+    try:
+        end_date = date.fromisoformat(request.GET.get('end_date', ''))
+    except ValueError:
+        end_date = today
+    return start_date, end_date
 
 @login_required
 def financial_reports(request):
@@ -103,27 +119,28 @@ def financial_reports(request):
         return redirect('dashboard')
     
     # Get date range from request or default to this month
-    today = date.today()
-    start_date = request.GET.get('start_date', today.replace(day=1))
-    end_date = request.GET.get('end_date', today)
+    start_date, end_date = _report_dates(request)
+    range_start, range_end = date_range(start_date, end_date)
     
     # Financial data
     payments = Payment.objects.filter(
         status='success',
-        transaction_date__date__gte=start_date,
-        transaction_date__date__lte=end_date
-    )
+        transaction_date__gte=range_start,
+        transaction_date__lt=range_end
+    ).select_related('bill__patient__user')
     
-    total_revenue = payments.aggregate(total=Sum('amount'))['total'] or 0
-    payment_methods = payments.values('payment_method').annotate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
+    # Totals come from the daily rollup rather than re-summing every payment
+    summaries = DailyRevenueSummary.objects.filter(day__gte=start_date, day__lte=end_date)
+    total_revenue = summaries.aggregate(total=Sum('total_amount'))['total'] or 0
+    payment_methods = summaries.values('payment_method').annotate(
+        total=Sum('total_amount'),
+        count=Sum('payment_count')
+    ).order_by('payment_method')
     
     bills = Bill.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date
-    )
+        created_at__gte=range_start,
+        created_at__lt=range_end
+    ).select_related('patient__user')
     
     context = {
         'total_revenue': total_revenue,
@@ -135,6 +152,89 @@ def financial_reports(request):
     }
     return render(request, 'manager/financial_reports.html', context)
 
+class _Echo:
+    """File-like object that hands back what csv.writer writes to it"""
+    def write(self, value):
+        return value
+
+def _stream_export(rows, columns, export_format, filename):
+    """
+    Streams rows (tuples) as CSV or NDJSON. Each row is written as soon as the
+    database cursor yields it, so memory stays flat whatever the date range.
+    """
+    if export_format == 'ndjson':
+        content = (
+            json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+            for row in rows
+        )
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        extension = 'ndjson'
+    else:
+        writer = csv.writer(_Echo())
+        content = itertools.chain([writer.writerow(columns)], (writer.writerow(row) for row in rows))
+        response = StreamingHttpResponse(content, content_type='text/csv')
+        extension = 'csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+EXPORT_CHUNK_SIZE = 2000
+
+@login_required
+def export_payments(request):
+    """Stream successful payments in the report period as CSV or NDJSON"""
+    if request.user.role != 'manager':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    start_date, end_date = _report_dates(request)
+    range_start, range_end = date_range(start_date, end_date)
+    columns = [
+        'transaction_date', 'payment_reference', 'bill_number', 'patient_id',
+        'patient_first_name', 'patient_last_name', 'amount', 'payment_method', 'status',
+    ]
+    rows = Payment.objects.filter(
+        status='success',
+        transaction_date__gte=range_start,
+        transaction_date__lt=range_end
+    ).order_by('transaction_date', 'id').values_list(
+        'transaction_date', 'payment_reference', 'bill__bill_number',
+        # Lab payments have no bill; their patient is on the payment itself
+        Coalesce('patient__patient_id', 'bill__patient__patient_id'),
+        Coalesce('patient__user__first_name', 'bill__patient__user__first_name'),
+        Coalesce('patient__user__last_name', 'bill__patient__user__last_name'),
+        'amount', 'payment_method', 'status',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    return _stream_export(
+        rows, columns, request.GET.get('format'), f"payments_{start_date}_{end_date}"
+    )
+
+@login_required
+def export_bills(request):
+    """Stream bills created in the report period as CSV or NDJSON"""
+    if request.user.role != 'manager':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    start_date, end_date = _report_dates(request)
+    range_start, range_end = date_range(start_date, end_date)
+    columns = [
+        'created_at', 'bill_number', 'patient_id', 'patient_first_name', 'patient_last_name',
+        'bill_type', 'amount', 'discount', 'total_amount', 'status',
+    ]
+    rows = Bill.objects.filter(
+        created_at__gte=range_start,
+        created_at__lt=range_end
+    ).order_by('created_at', 'id').values_list(
+        'created_at', 'bill_number', 'patient__patient_id',
+        'patient__user__first_name', 'patient__user__last_name',
+        'bill_type', 'amount', 'discount', 'total_amount', 'status',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    return _stream_export(
+        rows, columns, request.GET.get('format'), f"bills_{start_date}_{end_date}"
+    )
+
 @login_required
 def staff_dashboard(request):
     """Staff dashboard"""
@@ -199,7 +299,7 @@ def security_settings(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
         
-    settings = HospitalSetting.load()
+    settings = HospitalSetting.cached()
     return render(request, 'manager/settings_security.html', {'settings': settings})
 
 def danger_zone(request):
@@ -215,17 +315,38 @@ def email_log_list(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
         
-    # Get all logs, most recent first
-    logs = EmailLog.objects.all().order_by('-sent_at')
-    settings = HospitalSetting.load()
+    # Most recent first, one page at a time
+    logs = KeysetPaginator(EmailLog.objects.all(), '-created_at').page_from_request(request)
+    settings = HospitalSetting.cached()
     
     context = {
         'logs': logs,
+        'page': logs,
         'settings': settings,
     }
     return render(request, 'manager/email_logs.html', context)
 
 
+@login_required
+def request_timings(request):
+    """Per-view latency percentiles recorded by RequestTimingMiddleware in this worker"""
+    if request.user.role != 'manager':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        timing.reset()
+        messages.success(request, 'Timing samples cleared for this worker.')
+        return redirect('request_timings')
+
+    context = {
+        'timings': timing.snapshot(),
+        'samples_per_view': timing.SAMPLES_PER_VIEW,
+        'worker_pid': os.getpid(),
+    }
+    return render(request, 'manager/request_timings.html', context)
+
+
 
 @login_required
 def admission_dashboard(request):
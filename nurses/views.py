@@ -7,7 +7,7 @@ from .models import Vitals
 
 @login_required
 def nurse_dashboard(request):
-    pending_vitals = Appointment.objects.filter(status='pending').order_by('appointment_time')
+    pending_vitals = Appointment.objects.filter(status='pending').select_related('patient__user').order_by('appointment_time')
     return render(request, 'nurses/dashboard.html', {'pending_vitals': pending_vitals})
 
 @login_required
@@ -1,6 +1,10 @@
 from django import forms
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from appointments.models import Appointment
 from accounts.models import User
+from .models import Patient
 
 class AppointmentForm(forms.ModelForm):
     """Appointment booking form"""
@@ -28,4 +32,55 @@ class AppointmentForm(forms.ModelForm):
                 'rows': 4,
                 'placeholder': 'Describe your reason for visit'
             }),
-        }
\ No newline at end of file
+        }
+
+def patient_label(patient):
+    return f"{patient.user.get_full_name() or patient.user.username} ({patient.patient_id})"
+
+
+class PatientPicker(forms.Widget):
+    """
+    Typeahead in place of a <select> listing every patient. A hidden input
+    carries the chosen pk; the visible box queries the patient_lookup endpoint
+    (static/js/patient_picker.js). Rendering costs at most one query, for the
+    label of an already chosen patient, whatever the number of patients.
+    """
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        label = ''
+        if value is not None and str(value).isdigit():
+            patient = Patient.objects.select_related('user').filter(pk=value).first()
+            label = patient_label(patient) if patient else ''
+        return format_html(
+            '<div class="patient-picker position-relative" data-patient-picker data-lookup-url="{}">'
+            '<input type="hidden" name="{}" value="{}">'
+            '<input type="search" id="{}" class="{}" value="{}" placeholder="{}" autocomplete="off"{}>'
+            '<div class="dropdown-menu w-100 shadow-sm"></div>'
+            '</div>',
+            reverse('patient_lookup'), name, '' if value is None else value,
+            attrs.get('id', f'id_{name}'), attrs.get('class', 'form-control'), label,
+            attrs.get('placeholder', 'Type a name, patient ID or phone...'),
+            mark_safe(' required') if attrs.get('required') else '',
+        )
+
+
+class PatientChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField for a PatientPicker: the submitted pk is checked against `queryset`."""
+    widget = PatientPicker
+    default_error_messages = {
+        'invalid_choice': 'Choose a patient from the search results.',
+    }
+
+    def __init__(self, queryset=None, **kwargs):
+        super().__init__(queryset if queryset is not None else Patient.objects.all(), **kwargs)
+
+
+class PatientPickForm(forms.Form):
+    """Patient selection for pages that build the rest of their form by hand."""
+    patient = PatientChoiceField(widget=PatientPicker(attrs={'class': 'form-control rounded-3'}))
+
+    def __init__(self, *args, queryset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if queryset is not None:
+            self.fields['patient'].queryset = queryset
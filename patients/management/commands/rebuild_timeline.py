@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from patients.timeline import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds every patient timeline from the source tables (after deploying it, or after bulk imports, which skip signals)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} timeline events."))
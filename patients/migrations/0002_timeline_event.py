@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('visit', 'Visit'), ('prescription', 'Prescription'), ('lab_result', 'Lab Result'), ('vitals', 'Vitals'), ('admission', 'Admission'), ('payment', 'Payment')], max_length=20)),
+                ('occurred_at', models.DateTimeField()),
+                ('title', models.CharField(max_length=255)),
+                ('summary', models.TextField(blank=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('source', models.CharField(max_length=50)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to='patients.patient')),
+            ],
+            options={
+                'ordering': ['-occurred_at', '-id'],
+                'indexes': [models.Index(fields=['patient', 'occurred_at'], name='timeline_patient_time_idx'), models.Index(fields=['patient', 'kind', 'occurred_at'], name='timeline_patient_kind_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'source_id'), name='timeline_source_unique')],
+            },
+        ),
+    ]
@@ -28,3 +28,61 @@ class Vitals(models.Model):
 
     def __str__(self):
         return f"Vitals for {self.patient.user.get_full_name()} at {self.recorded_at}"
+
+
+class TimelineEvent(models.Model):
+    """
+    One row per event in a patient's history (visit, prescription, lab result,
+    vitals, admission, payment), copied from its source row by the signals in
+    patients/timeline.py. A chart reads this one indexed table, newest first,
+    a page at a time, instead of querying every source table in full.
+    """
+    KIND_CHOICES = (
+        ('visit', 'Visit'),
+        ('prescription', 'Prescription'),
+        ('lab_result', 'Lab Result'),
+        ('vitals', 'Vitals'),
+        ('admission', 'Admission'),
+        ('payment', 'Payment'),
+    )
+    KIND_ICONS = {
+        'visit': ('fa-stethoscope', 'primary'),
+        'prescription': ('fa-pills', 'danger'),
+        'lab_result': ('fa-microscope', 'info'),
+        'vitals': ('fa-heartbeat', 'success'),
+        'admission': ('fa-procedures', 'warning'),
+        'payment': ('fa-receipt', 'secondary'),
+    }
+
+    patient = models.ForeignKey('Patient', on_delete=models.CASCADE, related_name='timeline')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    occurred_at = models.DateTimeField()
+    title = models.CharField(max_length=255)
+    summary = models.TextField(blank=True)
+    # Small structured payload, e.g. the readings of a vitals event
+    data = models.JSONField(default=dict, blank=True)
+
+    # The row this event was copied from ('app_label.model', pk)
+    source = models.CharField(max_length=50)
+    source_id = models.PositiveBigIntegerField()
+
+    class Meta:
+        ordering = ['-occurred_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='timeline_source_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['patient', 'occurred_at'], name='timeline_patient_time_idx'),
+            models.Index(fields=['patient', 'kind', 'occurred_at'], name='timeline_patient_kind_idx'),
+        ]
+
+    @property
+    def icon(self):
+        return self.KIND_ICONS[self.kind][0]
+
+    @property
+    def color(self):
+        return self.KIND_ICONS[self.kind][1]
+
+    def __str__(self):
+        return f"{self.patient_id} {self.kind} at {self.occurred_at}"
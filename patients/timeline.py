@@ -0,0 +1,274 @@
+# patients/timeline.py
+from django.apps import apps
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from hospital.pagination import KeysetPaginator
+from .models import Patient, TimelineEvent
+
+# Events per chart page
+TIMELINE_PAGE = 25
+
+SUMMARY_LENGTH = 500
+
+
+# --- sources ---
+# Each describer turns one source row into (patient reference, event fields),
+# or None when the row should not be on the timeline (e.g. a lab request with
+# no result yet). The reference names the table the row's patient lives in,
+# because several source models point at accounts.Patient rather than
+# patients.Patient; see _resolve().
+
+def _clip(text):
+    text = text or ''
+    return text if len(text) <= SUMMARY_LENGTH else text[:SUMMARY_LENGTH - 1] + '…'
+
+
+def _visit(record):
+    return ('patient', record.patient_id), {
+        'kind': 'visit', 'occurred_at': record.visit_date, 'title': record.diagnosis,
+        'summary': _clip(record.clinical_notes), 'data': {'appointment_id': record.appointment_id},
+    }
+
+
+def _doctor_prescription(rx):
+    return ('patient', rx.patient_id), {
+        'kind': 'prescription', 'occurred_at': rx.created_at, 'title': f"Prescription RX#{rx.pk}",
+        'summary': _clip(rx.diagnosis), 'data': {'status': rx.status},
+    }
+
+
+def _pharmacy_prescription(rx):
+    return ('accounts_patient', rx.patient_id), {
+        'kind': 'prescription', 'occurred_at': rx.created_at, 'title': rx.medication_name,
+        'summary': f"{rx.dosage}, {rx.frequency} for {rx.duration}", 'data': {'status': rx.status},
+    }
+
+
+def _consultation_lab(lab):
+    # doctors.LabRequest reaches the patient through its medical record
+    if lab.status != 'completed':
+        return None
+    return ('medical_record', lab.medical_record_id), {
+        'kind': 'lab_result', 'occurred_at': lab.recorded_at or timezone.now(), 'title': lab.test_name,
+        'summary': _clip(lab.results), 'data': {},
+    }
+
+
+def _lab(lab):
+    # labs.LabRequest and accounts.LabRequest
+    if not (lab.is_completed or getattr(lab, 'status', None) == 'completed'):
+        return None
+    return ('patient', lab.patient_id), {
+        'kind': 'lab_result', 'occurred_at': lab.updated_at or timezone.now(), 'title': lab.test_name,
+        'summary': _clip(lab.findings), 'data': {'priority': lab.priority, 'has_attachment': bool(lab.attachment)},
+    }
+
+
+def _vitals(vitals):
+    readings = {
+        'bp': vitals.bp, 'temperature': str(vitals.temperature),
+        'pulse': vitals.pulse, 'weight': str(vitals.weight),
+    }
+    return ('patient', vitals.patient_id), {
+        'kind': 'vitals', 'occurred_at': vitals.recorded_at, 'title': 'Vitals',
+        'summary': f"BP {vitals.bp}, {vitals.temperature} °C, pulse {vitals.pulse} bpm, {vitals.weight} kg",
+        'data': readings,
+    }
+
+
+def _ward_round(sign):
+    return ('admission', sign.admission_id), {
+        'kind': 'vitals', 'occurred_at': sign.recorded_at, 'title': 'Ward round vitals',
+        'summary': _clip(f"BP {sign.blood_pressure}, {sign.temperature} °C, pulse {sign.pulse_rate} bpm. {sign.notes}".strip()),
+        'data': {'bp': sign.blood_pressure, 'temperature': str(sign.temperature), 'pulse': sign.pulse_rate},
+    }
+
+
+def _admission(admission):
+    discharged = admission.discharged_at.isoformat() if admission.discharged_at else None
+    return ('accounts_patient', admission.patient_id), {
+        'kind': 'admission', 'occurred_at': admission.admitted_at, 'title': f"Admitted, bed {admission.bed_number}",
+        'summary': _clip(admission.reason), 'data': {'discharged_at': discharged},
+    }
+
+
+def _payment(payment):
+    if payment.status != 'success' or not payment.patient_id:
+        return None
+    return ('patient', payment.patient_id), {
+        'kind': 'payment', 'occurred_at': payment.transaction_date, 'title': f"Payment {payment.payment_reference}",
+        'summary': f"GHS {payment.amount} by {payment.get_payment_method_display()}",
+        'data': {'amount': str(payment.amount), 'method': payment.payment_method},
+    }
+
+
+SOURCES = {
+    'doctors.MedicalRecord': _visit,
+    'doctors.Prescription': _doctor_prescription,
+    'pharmacy.Prescription': _pharmacy_prescription,
+    'doctors.LabRequest': _consultation_lab,
+    'labs.LabRequest': _lab,
+    'accounts.LabRequest': _lab,
+    'patients.Vitals': _vitals,
+    'inpatient.VitalSign': _ward_round,
+    'inpatient.Admission': _admission,
+    'cashier.Payment': _payment,
+}
+
+
+# Which table each source's rows name their patient through, as in the
+# describers' references; backfill_patient() finds a patient's rows by it
+REFERENCES = {
+    'doctors.MedicalRecord': 'patient',
+    'doctors.Prescription': 'patient',
+    'pharmacy.Prescription': 'accounts_patient',
+    'doctors.LabRequest': 'medical_record',
+    'labs.LabRequest': 'patient',
+    'accounts.LabRequest': 'patient',
+    'patients.Vitals': 'patient',
+    'inpatient.VitalSign': 'admission',
+    'inpatient.Admission': 'accounts_patient',
+    'cashier.Payment': 'patient',
+}
+
+
+def _source_label(model):
+    return model._meta.label_lower
+
+
+def _resolve(reference):
+    """patients.Patient pk for a describer's (table, pk) reference, or None."""
+    table, pk = reference
+    if pk is None:
+        return None
+    if table == 'patient':
+        return pk
+    lookup = {
+        'accounts_patient': 'user__accounts_patient_record',
+        'medical_record': 'patient_records',
+        'admission': 'user__accounts_patient_record__admission',
+    }[table]
+    return Patient.objects.filter(**{lookup: pk}).values_list('pk', flat=True).first()
+
+
+# --- keeping events current ---
+def record(instance):
+    """Writes, rewrites or removes the timeline event for one source row."""
+    label = _source_label(type(instance))
+    described = SOURCES[instance._meta.label](instance)
+    patient_id = _resolve(described[0]) if described else None
+    if patient_id is None:
+        TimelineEvent.objects.filter(source=label, source_id=instance.pk).delete()
+        return None
+    event, _ = TimelineEvent.objects.update_or_create(
+        source=label, source_id=instance.pk, defaults={'patient_id': patient_id, **described[1]},
+    )
+    return event
+
+
+def _saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record(instance)
+
+
+def _deleted(sender, instance, **kwargs):
+    TimelineEvent.objects.filter(source=_source_label(sender), source_id=instance.pk).delete()
+
+
+def connect():
+    for label in SOURCES:
+        model = apps.get_model(label)
+        post_save.connect(_saved, sender=model, dispatch_uid=f'timeline_saved_{label}')
+        post_delete.connect(_deleted, sender=model, dispatch_uid=f'timeline_deleted_{label}')
+
+
+def rebuild(chunk_size=2000):
+    """
+    Recreates every event from the source tables. Patient references are
+    resolved from maps built once per table, not one query per row.
+    Returns the number of events written.
+    """
+    from accounts.models import Patient as AccountsPatient
+    from doctors.models import MedicalRecord
+    from inpatient.models import Admission
+
+    by_user = dict(Patient.objects.values_list('user_id', 'pk'))
+    accounts_patients = {pk: by_user.get(user_id) for pk, user_id in AccountsPatient.objects.values_list('pk', 'user_id')}
+    maps = {
+        'accounts_patient': accounts_patients,
+        'medical_record': dict(MedicalRecord.objects.values_list('pk', 'patient_id')),
+        'admission': {pk: accounts_patients.get(patient_id) for pk, patient_id in Admission.objects.values_list('pk', 'patient_id')},
+    }
+
+    # Apps without migrations (nurses) may have no table yet
+    tables = set(connection.introspection.table_names())
+
+    TimelineEvent.objects.all().delete()
+    written = 0
+    for label, describe in SOURCES.items():
+        model = apps.get_model(label)
+        if model._meta.db_table not in tables:
+            continue
+        source, batch = _source_label(model), []
+        for instance in model.objects.order_by('pk').iterator(chunk_size=chunk_size):
+            described = describe(instance)
+            if not described:
+                continue
+            (table, pk), fields = described
+            patient_id = pk if table == 'patient' else maps[table].get(pk)
+            if patient_id is None:
+                continue
+            batch.append(TimelineEvent(patient_id=patient_id, source=source, source_id=instance.pk, **fields))
+            if len(batch) >= chunk_size:
+                written += len(TimelineEvent.objects.bulk_create(batch))
+                batch = []
+        written += len(TimelineEvent.objects.bulk_create(batch))
+    return written
+
+
+def backfill_patient(patient):
+    """
+    Writes one patient's events from the source tables and returns how many.
+    For history that predates the timeline when rebuild_timeline has not
+    been run since; rows already on the timeline are left as they are.
+    """
+    lookups = {
+        'patient': {'patient_id': patient.pk},
+        'accounts_patient': {'patient__user_id': patient.user_id},
+        'medical_record': {'medical_record__patient_id': patient.pk},
+        'admission': {'admission__patient__user_id': patient.user_id},
+    }
+    tables = set(connection.introspection.table_names())
+    events = []
+    for label, table in REFERENCES.items():
+        model = apps.get_model(label)
+        if model._meta.db_table not in tables:
+            continue
+        for instance in model.objects.filter(**lookups[table]):
+            described = SOURCES[label](instance)
+            if described:
+                events.append(TimelineEvent(patient=patient, source=_source_label(model), source_id=instance.pk, **described[1]))
+    # Two first views of the same chart may race; the unique source keeps one copy
+    return len(TimelineEvent.objects.bulk_create(events, ignore_conflicts=True))
+
+
+# --- reading ---
+def timeline_page(request, patient, kinds=None, per_page=TIMELINE_PAGE):
+    """
+    One cursor page of a patient's events, newest first (see hospital.pagination).
+    A patient with no events at all is backfilled from the source tables first.
+    """
+    events = TimelineEvent.objects.filter(patient=patient)
+    if kinds:
+        events = events.filter(kind__in=kinds)
+    paginator = KeysetPaginator(events, '-occurred_at', per_page)
+    page = paginator.page_from_request(request)
+    if not page and not request.GET.get(paginator.cursor_param):
+        if not TimelineEvent.objects.filter(patient=patient).exists() and backfill_patient(patient):
+            page = paginator.page_from_request(request)
+    return page
+
+
+def latest_events(patient, kind, limit=1):
+    return list(TimelineEvent.objects.filter(patient=patient, kind=kind).order_by('-occurred_at', '-id')[:limit])
@@ -6,4 +6,5 @@ urlpatterns = [
     path('book-appointment/', views.book_appointment, name='book_appointment'),
     path('appointments/', views.patient_appointments, name='patient_appointments'),
     path('medical-records/', views.patient_medical_records, name='patient_medical_records'),
+    path('lookup/', views.patient_lookup, name='patient_lookup'),
 ]
\ No newline at end of file
@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings as django_settings
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
 from .models import Patient
 from appointments.models import Appointment
-from doctors.models import MedicalRecord
-from .forms import AppointmentForm
+from .timeline import timeline_page
+from .forms import AppointmentForm, patient_label
+from accounts.search import search_patients
 from manager.models import HospitalSetting, EmailLog # Importing the global settings
 
 from django.utils import timezone
@@ -64,7 +67,7 @@ def patient_dashboard(request):
     return render(request, 'patients/dashboard.html', context)
 @login_required
 def book_appointment(request):
-    """Book appointment view with Global Toggle, HTML Email, and Audit Logging"""
+    """Book appointment view with Global Toggle and a queued HTML confirmation email"""
     if request.user.role != 'patient':
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
@@ -74,16 +77,17 @@ def book_appointment(request):
     if request.method == 'POST':
         form = AppointmentForm(request.POST)
         if form.is_valid():
-            appointment = form.save(commit=False)
-            appointment.patient = patient
-            appointment.save()
-            
-            # --- START EMAIL LOGIC WITH AUDIT TRAIL ---
-            sys_settings = HospitalSetting.load()
-            
-            if sys_settings.email_notifications_enabled:
-                subject = f"Confirmed: Appointment at {sys_settings.hospital_name}"
-                try:
+            sys_settings = HospitalSetting.cached()
+
+            # The confirmation is queued in the same transaction as the booking;
+            # the send_queued_emails worker delivers it outside the request.
+            with transaction.atomic():
+                appointment = form.save(commit=False)
+                appointment.patient = patient
+                appointment.save()
+
+                if sys_settings.email_notifications_enabled and request.user.email:
+                    subject = f"Confirmed: Appointment at {sys_settings.hospital_name}"
                     # Prepare context for the HTML template
                     context = {
                         'hospital_name': sys_settings.hospital_name,
@@ -96,37 +100,13 @@ def book_appointment(request):
 
                     # Render the HTML and Plain Text versions
                     html_message = render_to_string('emails/appointment_confirmed.html', context)
-                    plain_message = strip_tags(html_message)
-
-                    # Send the email
-                    send_mail(
-                        subject=subject,
-                        message=plain_message,
-                        from_email=django_settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[request.user.email],
-                        html_message=html_message,
-                        fail_silently=False,
-                    )
-
-                    # LOG SUCCESS TO DATABASE
-                    EmailLog.objects.create(
-                        recipient=request.user.email,
-                        subject=subject,
-                        status='Success'
-                    )
-                    messages.info(request, 'A confirmation email has been sent.')
-
-                except Exception as e:
-                    # LOG FAILURE TO DATABASE
-                    EmailLog.objects.create(
+                    EmailLog.queue(
                         recipient=request.user.email,
                         subject=subject,
-                        status='Failed',
-                        error_message=str(e)
+                        body=strip_tags(html_message),
+                        html_body=html_message,
                     )
-                    print(f"Mail Error: {e}")
-                    messages.warning(request, 'Appointment booked, but email notification failed.')
-            # --- END EMAIL LOGIC ---
+                    messages.info(request, 'A confirmation email will be sent shortly.')
 
             messages.success(request, 'Appointment booked successfully!')
             return redirect('patient_dashboard')
@@ -154,6 +134,41 @@ def patient_medical_records(request):
         return redirect('dashboard')
     
     patient = get_object_or_404(Patient, user=request.user)
-    medical_records = MedicalRecord.objects.filter(patient=patient).order_by('-visit_date')
+    page = timeline_page(request, patient)
     
-    return render(request, 'patients/medical_records.html', {'medical_records': medical_records})
\ No newline at end of file
+    return render(request, 'patients/medical_records.html', {'page': page})
+
+
+LOOKUP_LIMIT = 10
+LOOKUP_MAX = 25
+
+
+@login_required
+def patient_lookup(request):
+    """
+    JSON typeahead behind PatientPicker. ?q= matches name, patient ID, phone
+    or email through the search index (an exact patient ID comes first);
+    ?id= resolves one chosen patient. At most LOOKUP_MAX results.
+    """
+    if request.user.role == 'patient' and not request.user.is_superuser:
+        return JsonResponse({'results': []}, status=403)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', LOOKUP_LIMIT)), LOOKUP_MAX))
+    except ValueError:
+        limit = LOOKUP_LIMIT
+
+    pk = request.GET.get('id', '')
+    query = request.GET.get('q', '').strip()
+    if pk:
+        patients = list(Patient.objects.select_related('user').filter(pk=pk)) if pk.isdigit() else []
+    elif len(query) >= 2:
+        exact = Patient.objects.select_related('user').filter(patient_id=query).first()
+        patients = [exact] if exact else []
+        patients += [p for p in search_patients(query, limit) if p != exact][:limit - len(patients)]
+    else:
+        patients = []
+
+    return JsonResponse({'results': [
+        {'id': patient.pk, 'patient_id': patient.patient_id, 'label': patient_label(patient)}
+        for patient in patients
+    ]})
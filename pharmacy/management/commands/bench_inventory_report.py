@@ -0,0 +1,83 @@
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+from accounts.models import Medicine
+from pharmacy.reports import build_inventory_report, inventory_queryset
+
+CATEGORIES = ['Antibiotic', 'Analgesic', 'Antimalarial', 'Antihypertensive', 'Antidiabetic', 'Vitamin', 'Antiseptic']
+
+
+def build_single_table(output):
+    """The previous report: the whole formulary as one list and one Table."""
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    data = [['Medicine Name', 'Category', 'Price (GHS)', 'Stock', 'Status']]
+    for med in Medicine.objects.all().order_by('name'):
+        status = "LOW" if med.quantity <= med.reorder_level else "OK"
+        data.append([med.name, med.category, f"{med.price_per_unit:.2f}", med.quantity, status])
+    table = Table(data, colWidths=[150, 100, 80, 60, 80])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.dodgerblue),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    doc.build([table])
+
+
+class Command(BaseCommand):
+    help = 'Times the streaming inventory report (and optionally the single-table one) on N generated medicines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medicines', type=int, default=100_000)
+        parser.add_argument('--single-table', action='store_true',
+                            help='Also build the old one-Table report (slow and memory hungry at 100k rows)')
+        parser.add_argument('--memory', action='store_true',
+                            help='Trace peak Python memory (tracemalloc slows every run several times over)')
+
+    def handle(self, *args, **options):
+        total = options['medicines']
+        rng = random.Random(7)
+        today = timezone.localdate()
+
+        # Everything runs inside a transaction that is rolled back at the end
+        with transaction.atomic():
+            Medicine.objects.bulk_create((
+                Medicine(
+                    name=f"Bench {CATEGORIES[i % len(CATEGORIES)]} {i:06d}",
+                    category=CATEGORIES[i % len(CATEGORIES)],
+                    quantity=rng.randint(0, 500),
+                    reorder_level=rng.randint(5, 50),
+                    price_per_unit=rng.randint(100, 50000) / 100,
+                    expiry_date=today + timedelta(days=rng.randint(-30, 720)),
+                ) for i in range(total)
+            ), batch_size=5000)
+            self.stdout.write(f"{Medicine.objects.count()} medicines")
+
+            runs = [
+                ('streaming, all', lambda out: build_inventory_report(out, inventory_queryset())),
+                ('streaming, low stock', lambda out: build_inventory_report(out, inventory_queryset(low_stock=True))),
+                ('streaming, expiring 30d', lambda out: build_inventory_report(out, inventory_queryset(expiring_days=30))),
+            ]
+            if options['single_table']:
+                runs.append(('single table, all', build_single_table))
+
+            for label, build in runs:
+                if options['memory']:
+                    tracemalloc.start()
+                with tempfile.TemporaryFile() as out:
+                    start = time.perf_counter()
+                    build(out)
+                    elapsed = time.perf_counter() - start
+                    size = out.tell()
+                line = f"{label:<24} {elapsed:7.1f} s, {size / 2**20:6.1f} MiB PDF"
+                if options['memory']:
+                    line += f", peak {tracemalloc.get_traced_memory()[1] / 2**20:7.1f} MiB"
+                    tracemalloc.stop()
+                self.stdout.write(line)
+            transaction.set_rollback(True)
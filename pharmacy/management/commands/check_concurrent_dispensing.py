@@ -0,0 +1,78 @@
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from accounts.models import Medicine
+from pharmacy.models import DispensingLog
+from pharmacy.stock import dispense_medicine
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs many parallel dispensers against one Medicine row and checks that stock '
+        'never goes negative, no decrement is lost and every dispense is logged once'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=25, help='Dispense attempts per worker')
+        parser.add_argument('--quantity', type=int, default=1, help='Units taken per attempt')
+
+    def handle(self, *args, **options):
+        stock, quantity = options['stock'], options['quantity']
+        counts = {'dispensed': 0, 'refused': 0, 'errors': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(options['workers'])
+        medicine = marker = None
+
+        def worker():
+            start.wait()
+            try:
+                for _ in range(options['attempts']):
+                    try:
+                        ok = dispense_medicine(medicine, quantity, None, 'Concurrency Check', notes=marker)
+                        key = 'dispensed' if ok else 'refused'
+                    except OperationalError:
+                        # e.g. SQLite "database is locked" under heavy write contention
+                        key = 'errors'
+                    with lock:
+                        counts[key] += 1
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        try:
+            # Created in here so a failed run still removes it
+            medicine = Medicine.objects.create(
+                name='__concurrency_check__', category='test', quantity=stock, price_per_unit=0,
+            )
+            marker = f"concurrency-check-{medicine.pk}"
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            medicine.refresh_from_db()
+            logged = DispensingLog.objects.filter(notes=marker).count()
+        finally:
+            if medicine is not None:
+                DispensingLog.objects.filter(notes=marker).delete()
+                Medicine.objects.filter(pk=medicine.pk).delete()
+
+        self.stdout.write(
+            f"dispensed={counts['dispensed']} refused={counts['refused']} errors={counts['errors']} "
+            f"remaining={medicine.quantity} logged={logged}"
+        )
+
+        attempts = options['workers'] * options['attempts'] - counts['errors']
+        problems = []
+        if medicine.quantity != stock - counts['dispensed'] * quantity:
+            problems.append('lost update: remaining stock does not match successful dispenses')
+        if logged != counts['dispensed']:
+            problems.append('DispensingLog rows do not match successful dispenses')
+        if counts['dispensed'] != min(attempts, stock // quantity):
+            problems.append('dispenses were refused while stock was still available')
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Stock stayed consistent under concurrent dispensing.'))
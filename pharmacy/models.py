@@ -23,6 +23,11 @@ class Prescription(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='pharm_rx_status_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.medication_name} - {self.status}"
 
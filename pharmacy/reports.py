@@ -0,0 +1,125 @@
+# pharmacy/reports.py
+from datetime import timedelta
+from itertools import islice
+from django.db.models import F
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, TableStyle
+from accounts.models import Medicine
+
+HEADER = ['Medicine Name', 'Category', 'Price (GHS)', 'Stock', 'Reorder', 'Expiry', 'Status']
+COL_WIDTHS = [170, 100, 60, 50, 50, 65, 45]
+ROW_HEIGHT = 16
+NAME_CHARS = 38
+# Matches the 'expiring soon' window of the stock alerts page
+EXPIRING_DAYS = 30
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.dodgerblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('ALIGN', (2, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f6fa')]),
+])
+
+
+def inventory_queryset(category=None, low_stock=False, expiring_days=None):
+    """Medicines for the report, as plain tuples; filters combine with AND."""
+    medicines = Medicine.objects.all()
+    if category:
+        medicines = medicines.filter(category__iexact=category)
+    if low_stock:
+        medicines = medicines.filter(quantity__lte=F('reorder_level'))
+    if expiring_days is not None:
+        medicines = medicines.filter(expiry_date__lte=timezone.localdate() + timedelta(days=expiring_days))
+    return medicines.order_by('name', 'id').values_list(
+        'name', 'category', 'price_per_unit', 'quantity', 'reorder_level', 'expiry_date'
+    )
+
+
+def _row(values, today, expiring_by):
+    name, category, price, quantity, reorder_level, expiry = values
+    if expiry and expiry <= today:
+        status = "EXPIRED"
+    elif quantity <= reorder_level:
+        status = "LOW"
+    elif expiry and expiry <= expiring_by:
+        status = "EXPIRING"
+    else:
+        status = "OK"
+    if len(name) > NAME_CHARS:
+        name = name[:NAME_CHARS - 1] + '…'
+    return [name, category[:20], f"{price:.2f}", quantity, reorder_level, expiry.isoformat() if expiry else '-', status]
+
+
+class _FlowableFeed(list):
+    """
+    The flowable list handed to doc.build(). build() drains it from the front;
+    whenever it runs empty it pulls the next page table from the generator, so
+    only one page of rows exists as Python objects at any time.
+    """
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def __len__(self):
+        if not super().__len__():
+            page = next(self.pages, None)
+            if page is not None:
+                self.append(page)
+        return super().__len__()
+
+
+def build_inventory_report(output, medicines, title="Pharmacy Inventory Report", subtitle=''):
+    """
+    Writes the inventory PDF to `output` (a file object) one page at a time.
+
+    `medicines` is a values_list queryset from inventory_queryset(); it is read
+    with .iterator() so the full formulary is never loaded at once. The title
+    is drawn by the page callbacks, leaving every page the same frame height,
+    so each chunk is exactly one page of rows under its own header.
+    """
+    doc = SimpleDocTemplate(output, pagesize=letter, leftMargin=36, rightMargin=36, topMargin=72, bottomMargin=40)
+    generated = timezone.localtime().strftime('%Y-%m-%d %H:%M')
+    # Frame padding is 6pt top and bottom; one row of each page is the header
+    rows_per_page = int((doc.height - 12) // ROW_HEIGHT) - 1
+
+    def first_page(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica-Bold', 15)
+        canvas.drawString(doc.leftMargin, doc.pagesize[1] - 40, f"HMS CORE - {title.upper()}")
+        canvas.setFont('Helvetica', 9)
+        canvas.drawString(doc.leftMargin, doc.pagesize[1] - 56, f"Generated on: {generated}  {subtitle}")
+        later_pages(canvas, doc)
+        canvas.restoreState()
+
+    def later_pages(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(doc.leftMargin, 20, f"{title} - {generated}")
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 20, f"Page {doc.page}")
+        canvas.restoreState()
+
+    today = timezone.localdate()
+    expiring_by = today + timedelta(days=EXPIRING_DAYS)
+
+    def pages():
+        rows = (_row(values, today, expiring_by) for values in medicines.iterator(chunk_size=2000))
+        while True:
+            chunk = list(islice(rows, rows_per_page))
+            if not chunk:
+                return
+            # LongTable still splits (repeating the header) should a page ever overflow
+            table = LongTable([HEADER] + chunk, colWidths=COL_WIDTHS, rowHeights=ROW_HEIGHT, repeatRows=1)
+            table.setStyle(TABLE_STYLE)
+            yield table
+
+    feed = _FlowableFeed(pages())
+    if not len(feed):
+        feed.append(Paragraph("No medicines match this report's filters.", getSampleStyleSheet()['Normal']))
+    doc.build(feed, onFirstPage=first_page, onLaterPages=later_pages)
@@ -0,0 +1,51 @@
+# pharmacy/stock.py
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from accounts.models import Medicine, Reagent
+from .models import DispensingLog
+
+
+def take_stock(queryset, field, quantity, **extra):
+    """
+    Conditionally decrements `field` by `quantity` in a single statement:
+
+        UPDATE ... SET field = field - n WHERE ... AND field >= n
+
+    The database applies the check and the write atomically, so concurrent
+    dispensers can neither oversell nor overwrite each other's decrement, and
+    no row lock is held beyond the statement itself. Returns True when a row
+    was updated, False when stock was insufficient (or the row is gone).
+    """
+    if quantity <= 0:
+        raise ValueError("Quantity to take must be positive.")
+    updated = queryset.filter(**{f'{field}__gte': quantity}).update(
+        **{field: F(field) - quantity}, **extra
+    )
+    return updated > 0
+
+
+def dispense_medicine(medicine, quantity, pharmacist, patient_name, notes=''):
+    """
+    Takes `quantity` units of a Medicine and writes the DispensingLog entry in
+    the same transaction. Returns True when dispensed, False on insufficient stock.
+    """
+    with transaction.atomic():
+        dispensed = take_stock(
+            Medicine.objects.filter(pk=medicine.pk), 'quantity', quantity,
+            last_updated=timezone.now(),  # update() skips auto_now
+        )
+        if dispensed:
+            DispensingLog.objects.create(
+                pharmacist=pharmacist,
+                patient_name=patient_name,
+                medication_name=medicine.name,
+                quantity_dispensed=quantity,
+                notes=notes,
+            )
+    return dispensed
+
+
+def consume_reagent(reagent, quantity=1):
+    """Takes `quantity` units of a lab Reagent. Returns False when out of stock."""
+    return take_stock(Reagent.objects.filter(pk=reagent.pk), 'stock_quantity', quantity)
@@ -1,23 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import F, Sum
+from django.db.models import F, Q, Sum
 from django.utils import timezone
 from django.http import FileResponse
 from django.db import transaction
-import io
+import tempfile
 
 # PDF Imports
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
 from .models import DispensingLog
+from . import stock
+from .reports import build_inventory_report, inventory_queryset
 
 # Model Imports
 from doctors.models import Prescription
 from accounts.models import Medicine  # Ensure this path is correct for your project
+from hospital.utils import day_range
+from hospital.pagination import KeysetPaginator
 
 @login_required
 @user_passes_test(lambda u: u.role == 'pharmacist')
@@ -41,10 +41,11 @@ def pharmacy_dashboard(request):
     pending_count = Prescription.objects.filter(status='pending').count()
     
     # Calculate Today's Sales
-    today = timezone.now().date()
+    today_start, today_end = day_range()
     today_sales = Prescription.objects.filter(
         status='dispensed', 
-        updated_at__date=today
+        updated_at__gte=today_start,
+        updated_at__lt=today_end
     ).aggregate(total=Sum('price'))['total'] or 0.00
 
     context = {
@@ -68,39 +69,35 @@ def update_prescription_status(request, record_id):
         prescription = get_object_or_404(Prescription, id=record_id)
         medicine = Medicine.objects.filter(name__iexact=prescription.medication_name).first()
         qty_to_deduct = getattr(prescription, 'quantity', 1) 
+        patient_name = prescription.patient.get_full_name() if hasattr(prescription.patient, 'get_full_name') else str(prescription.patient)
 
         try:
             with transaction.atomic():
-                if medicine:
-                    if medicine.expiry_date and medicine.expiry_date <= timezone.now().date():
-                        messages.error(request, f"DISPENSING BLOCKED: {medicine.name} expired!")
-                        return redirect('pharmacy_dashboard')
-
-                    if medicine.quantity >= qty_to_deduct:
-                        medicine.quantity -= qty_to_deduct
-                        medicine.save()
-                        
-                        prescription.status = 'dispensed'
-                        prescription.save()
-
-                        # --- ADD AUDIT LOG HERE ---
-                        DispensingLog.objects.create(
-                            pharmacist=request.user,
-                            patient_name=prescription.patient.get_full_name() if hasattr(prescription.patient, 'get_full_name') else str(prescription.patient),
-                            medication_name=medicine.name,
-                            quantity_dispensed=qty_to_deduct,
-                            notes=f"Prescription ID: {prescription.id}"
-                        )
-                        # -------------------------
+                if medicine and medicine.expiry_date and medicine.expiry_date <= timezone.now().date():
+                    messages.error(request, f"DISPENSING BLOCKED: {medicine.name} expired!")
+                    return redirect('pharmacy_dashboard')
+
+                # Claim the prescription so two pharmacists cannot dispense it twice
+                claimed = Prescription.objects.filter(id=prescription.id).exclude(status='dispensed').update(status='dispensed')
+                if not claimed:
+                    messages.info(request, "This prescription has already been dispensed.")
+                    return redirect('pharmacy_dashboard')
+                # update() sends no signals; save the claimed row so post_save
+                # receivers (the patient timeline) see the new status
+                prescription.refresh_from_db()
+                prescription.save(update_fields=['status'])
 
+                if medicine:
+                    # Conditional UPDATE ... WHERE quantity >= n, logged in the same transaction
+                    if stock.dispense_medicine(medicine, qty_to_deduct, request.user, patient_name,
+                                               notes=f"Prescription ID: {prescription.id}"):
                         messages.success(request, f"Dispensed {qty_to_deduct} unit(s) of {medicine.name} and logged.")
                     else:
+                        transaction.set_rollback(True)
+                        medicine.refresh_from_db(fields=['quantity'])
                         messages.error(request, f"Insufficient stock! Available: {medicine.quantity}")
                         return redirect('pharmacy_dashboard')
                 else:
-                    prescription.status = 'dispensed'
-                    prescription.save()
-                    
                     # Optional: Log even if medicine isn't in inventory
                     DispensingLog.objects.create(
                         pharmacist=request.user,
@@ -132,30 +129,30 @@ def add_medicine_stock(request):
 
 @login_required
 def generate_inventory_report(request):
-    """Generates the PDF report"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    
-    styles = getSampleStyleSheet()
-    elements.append(Paragraph("HMS CORE - PHARMACY INVENTORY REPORT", styles['Title']))
-    elements.append(Paragraph(f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Paragraph("<br/><br/>", styles['Normal']))
-
-    data = [['Medicine Name', 'Category', 'Price (GHS)', 'Stock', 'Status']]
-    for med in Medicine.objects.all().order_by('name'):
-        status = "LOW" if med.quantity <= med.reorder_level else "OK"
-        data.append([med.name, med.category, f"{med.price_per_unit:.2f}", med.quantity, status])
-
-    table = Table(data, colWidths=[150, 100, 80, 60, 80])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.dodgerblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ]))
-    elements.append(table)
-    doc.build(elements)
+    """
+    Generates the PDF report. Optional filters: ?category=Antibiotic,
+    ?low_stock=1, ?expiring=<days> (expired or expiring within that many days).
+    """
+    category = request.GET.get('category', '').strip()
+    low_stock = request.GET.get('low_stock') == '1'
+    try:
+        expiring_days = int(request.GET['expiring']) if request.GET.get('expiring') else None
+    except ValueError:
+        expiring_days = None
+
+    filters = []
+    if category:
+        filters.append(f"Category: {category}")
+    if low_stock:
+        filters.append("Low stock only")
+    if expiring_days is not None:
+        filters.append(f"Expiring within {expiring_days} days")
+
+    # Spills to a temp file past 8 MB instead of growing in memory
+    buffer = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    build_inventory_report(
+        buffer, inventory_queryset(category, low_stock, expiring_days), subtitle=' | '.join(filters),
+    )
     buffer.seek(0)
     return FileResponse(buffer, as_attachment=True, filename='Inventory_Report.pdf')
 
@@ -182,13 +179,15 @@ def pharmacy_audit_logs(request):
     query = request.GET.get('q')
     if query:
         logs = logs.filter(
-            models.Q(patient_name__icontains=query) | 
-            models.Q(medication_name__icontains=query) |
-            models.Q(pharmacist__last_name__icontains=query)
+            Q(patient_name__icontains=query) |
+            Q(medication_name__icontains=query) |
+            Q(pharmacist__last_name__icontains=query)
         )
 
+    logs = KeysetPaginator(logs, '-timestamp', per_page=100).page_from_request(request)
     context = {
-        'logs': logs[:100], # Limit to last 100 for performance
+        'logs': logs,
+        'page': logs,
     }
     return render(request, 'pharmacy/audit_logs.html', context)
 
@@ -0,0 +1,113 @@
+/*
+ * Patient picker typeahead.
+ *
+ * Every [data-patient-picker] holds a hidden input (the chosen patient pk,
+ * which is what the form submits and the server validates) and a search box.
+ * Typing queries data-lookup-url?q=...; choosing a result fills both inputs.
+ * Editing the text again clears the hidden pk, so a stale choice is never sent.
+ */
+(function () {
+    'use strict';
+
+    var DELAY_MS = 200;
+    var MIN_CHARS = 2;
+
+    function setup(picker) {
+        if (picker.dataset.ready) return;
+        picker.dataset.ready = '1';
+
+        var hidden = picker.querySelector('input[type="hidden"]');
+        var box = picker.querySelector('input[type="search"]');
+        var menu = picker.querySelector('.dropdown-menu');
+        var url = picker.dataset.lookupUrl;
+        var timer = null;
+        var latest = 0;
+
+        function close() {
+            menu.classList.remove('show');
+            menu.innerHTML = '';
+        }
+
+        function choose(result) {
+            hidden.value = result.id;
+            box.value = result.label;
+            box.setCustomValidity('');
+            close();
+            hidden.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+
+        function show(results) {
+            menu.innerHTML = '';
+            if (!results.length) {
+                var empty = document.createElement('span');
+                empty.className = 'dropdown-item-text text-muted small';
+                empty.textContent = 'No matching patients';
+                menu.appendChild(empty);
+            }
+            results.forEach(function (result) {
+                var item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'dropdown-item';
+                item.textContent = result.label;
+                item.addEventListener('mousedown', function (event) {
+                    event.preventDefault();  // keep focus so blur does not close first
+                    choose(result);
+                });
+                menu.appendChild(item);
+            });
+            menu.classList.add('show');
+        }
+
+        function search() {
+            var query = box.value.trim();
+            if (query.length < MIN_CHARS) { close(); return; }
+            var request = ++latest;
+            fetch(url + '?q=' + encodeURIComponent(query), {
+                headers: {'Accept': 'application/json'},
+                credentials: 'same-origin'
+            }).then(function (response) {
+                return response.ok ? response.json() : {results: []};
+            }).then(function (data) {
+                if (request === latest) show(data.results);  // ignore out-of-order replies
+            }).catch(close);
+        }
+
+        box.addEventListener('input', function () {
+            hidden.value = '';
+            clearTimeout(timer);
+            timer = setTimeout(search, DELAY_MS);
+        });
+        box.addEventListener('keydown', function (event) {
+            var first = menu.querySelector('button.dropdown-item');
+            if (event.key === 'Enter' && menu.classList.contains('show')) {
+                event.preventDefault();
+                if (first) first.dispatchEvent(new MouseEvent('mousedown'));
+            } else if (event.key === 'Escape') {
+                close();
+            }
+        });
+        box.addEventListener('blur', close);
+
+        // The browser checks the visible box; make it fail while no patient is chosen
+        var form = box.form;
+        if (form) {
+            form.addEventListener('submit', function (event) {
+                if (box.required && !hidden.value) {
+                    box.setCustomValidity('Choose a patient from the search results.');
+                    box.reportValidity();
+                    event.preventDefault();
+                }
+            });
+        }
+    }
+
+    function init() {
+        document.querySelectorAll('[data-patient-picker]').forEach(setup);
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
@@ -0,0 +1,82 @@
+/*
+ * Live work queues.
+ *
+ * Any <tbody data-queue="name"> on the page subscribes to ws/queues/<name>/.
+ * The server pushes {queue, key, html}: html replaces or appends the row with
+ * data-queue-key=key, a null html removes it. Counters marked
+ * data-queue-count="name" follow the number of rows.
+ */
+(function () {
+    'use strict';
+
+    function csrfToken() {
+        var input = document.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (input) return input.value;
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    // Rows are rendered server-side without a request, so forms arrive without a token
+    function addCsrf(row) {
+        row.querySelectorAll('form[method="post"], form[method="POST"]').forEach(function (form) {
+            if (form.querySelector('input[name="csrfmiddlewaretoken"]')) return;
+            var input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = 'csrfmiddlewaretoken';
+            input.value = csrfToken();
+            form.appendChild(input);
+        });
+    }
+
+    function refresh(tbody, name) {
+        var rows = tbody.querySelectorAll('tr[data-queue-key]').length;
+        var empty = tbody.querySelector('tr[data-queue-empty]');
+        if (empty) empty.classList.toggle('d-none', rows > 0);
+        document.querySelectorAll('[data-queue-count="' + name + '"]').forEach(function (el) {
+            el.textContent = rows;
+        });
+    }
+
+    function apply(tbody, message) {
+        var current = tbody.querySelector('tr[data-queue-key="' + message.key + '"]');
+        if (message.html === null) {
+            if (current) current.remove();
+        } else {
+            var template = document.createElement('template');
+            template.innerHTML = '<table><tbody>' + message.html + '</tbody></table>';
+            var row = template.content.querySelector('tr');
+            addCsrf(row);
+            if (current) {
+                current.replaceWith(row);
+            } else {
+                tbody.appendChild(row);
+            }
+        }
+        refresh(tbody, message.queue);
+    }
+
+    function connect(tbody, name, delay, reconnecting) {
+        var scheme = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
+        var socket = new WebSocket(scheme + window.location.host + '/ws/queues/' + name + '/');
+        var opened = false;
+        socket.onopen = function () {
+            // Changes made while disconnected were missed: resync once
+            if (reconnecting) window.location.reload();
+            opened = true;
+        };
+        socket.onmessage = function (event) { apply(tbody, JSON.parse(event.data)); };
+        socket.onclose = function () {
+            // Back off up to 30s; the page still works without the socket
+            var wait = opened ? 1000 : delay;
+            setTimeout(function () { connect(tbody, name, Math.min(wait * 2, 30000), reconnecting || opened); }, wait);
+        };
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('tbody[data-queue]').forEach(function (tbody) {
+            var name = tbody.getAttribute('data-queue');
+            refresh(tbody, name);
+            connect(tbody, name, 1000, false);
+        });
+    });
+})();